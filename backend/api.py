@@ -3,41 +3,177 @@ Logical Minesweeper Web API
 FastAPIを使用したマインスイーパーのWeb API実装
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import json
 import uuid
+from functools import partial
 import os
 from pathlib import Path
 
+try:
+    import resource  # Unix系のみ（/healthのメモリ統計用）
+except ImportError:
+    resource = None
+
 from minesweeper import MinesweeperBoard, GameState, CellState
+from compact_board import CompactMinesweeperBoard
+from game_manager import DIFFICULTY_PRESETS
+from board_pool import BoardPool
+from no_guess import NoGuessGenerator
+from session_store import SessionStore
+from session_backend import SQLiteSessionBackend, SessionConflictError, SessionBusyError
+from solver.solver_manager import SolverManager
+from solver.solver_command import SolverAction
 
 app = FastAPI(title="Logical Minesweeper API", version="1.0.0")
 
-# ゲームセッション管理
-game_sessions: Dict[str, MinesweeperBoard] = {}
+# セッション保管庫の設定（環境変数で上書き可能）
+SESSION_MAX_SIZE = int(os.environ.get("MINESWEEPER_SESSION_MAX_SIZE", "10000"))
+SESSION_IDLE_TTL = float(os.environ.get("MINESWEEPER_SESSION_IDLE_TTL", "3600"))        # 秒
+SESSION_SWEEP_INTERVAL = float(os.environ.get("MINESWEEPER_SESSION_SWEEP_INTERVAL", "60"))  # 秒
+# ワーカープロセス数（2以上ならセッションをSQLiteで共有する）
+WORKERS = int(os.environ.get("MINESWEEPER_WORKERS", "1"))
+DEFAULT_SESSION_DB_PATH = "sessions.db"
+# 設定するとセッションをSQLiteに保存し、再起動後も復元する
+SESSION_DB_PATH = os.environ.get("MINESWEEPER_SESSION_DB") or (DEFAULT_SESSION_DB_PATH if WORKERS > 1 else None)
+SESSION_FLUSH_INTERVAL = float(os.environ.get("MINESWEEPER_SESSION_FLUSH_INTERVAL", "0.5"))  # 秒
+# 難易度のプリセットごとに前もって生成しておく地雷配置の数（0ならプールしない）
+BOARD_POOL_SIZE = int(os.environ.get("MINESWEEPER_BOARD_POOL_SIZE", "32"))
+BOARD_POOL_REFILL_INTERVAL = float(os.environ.get("MINESWEEPER_BOARD_POOL_REFILL_INTERVAL", "0.5"))  # 秒
+# 推測なしの盤面を探すワーカープロセス数（0ならuvicornのワーカーごとにコア数を等分）と、最初の一手で探す時間の上限
+NO_GUESS_WORKERS = int(os.environ.get("MINESWEEPER_NO_GUESS_WORKERS", "0")) or max((os.cpu_count() or 1) // WORKERS, 1)
+NO_GUESS_TIMEOUT = float(os.environ.get("MINESWEEPER_NO_GUESS_TIMEOUT", "2.0"))  # 秒
+# 1なら盤面をNumPy配列で持つ省メモリ版（CompactMinesweeperBoard、1マス3バイト）で作る
+COMPACT_BOARD = os.environ.get("MINESWEEPER_COMPACT_BOARD", "0") == "1"
+
+# ソルバーの1手実行用（WebSocketのsolver_stepで使うゲームだけ作成）
+solver_managers: Dict[str, SolverManager] = {}
+
+def _on_session_evicted(game_id: str):
+    """追い出された・期限切れになったセッションの付随データを解放"""
+    solver_managers.pop(game_id, None)
+
+# セッションの永続化（1ワーカーならflushタスクでまとめて、複数ワーカーならその場で書き込む）
+session_backend = SQLiteSessionBackend(
+    SESSION_DB_PATH, idle_ttl=SESSION_IDLE_TTL, shared=WORKERS > 1
+) if SESSION_DB_PATH else None
+
+# ゲームセッション管理（最大数・放置期限つき）
+game_sessions = SessionStore(
+    max_size=SESSION_MAX_SIZE,
+    idle_ttl=SESSION_IDLE_TTL,
+    on_evict=_on_session_evicted,
+    backend=session_backend
+)
+
+# 最初の一手用の地雷配置のプール（補充はバックグラウンドタスクから別スレッドで行う）
+board_pool = BoardPool(DIFFICULTY_PRESETS.values(), capacity=BOARD_POOL_SIZE) if BOARD_POOL_SIZE > 0 else None
+
+# 推測なしで解ける盤面のシードの生成（ワーカープロセスは最初に使うときに起動する。
+# 1プロセスでも探索はプロセスプールで行い、イベントループのスレッドとGILを取り合わない）
+no_guess_generator = NoGuessGenerator(workers=NO_GUESS_WORKERS, in_process=False)
+
+async def sweep_sessions_periodically():
+    """放置期限切れのセッションを定期的に削除するバックグラウンドタスク（失敗しても次の周期で続ける）"""
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL)
+        try:
+            game_sessions.sweep()
+        except Exception as e:
+            print(f"セッションの掃除に失敗しました: {e}")
+
+async def flush_sessions():
+    """
+    書き込み待ちのセッションを保存
+
+    スナップショット化は盤面を変更するイベントループ上で行い、
+    ディスクへの書き込みだけを別スレッドに逃がして要求処理を止めない
+    """
+    snapshots = session_backend.take_pending()
+    if snapshots:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, session_backend.write_snapshots, snapshots)
+
+async def flush_sessions_periodically():
+    """書き込み待ちのセッションを定期的に保存するバックグラウンドタスク（失敗した分は次の周期で再試行する）"""
+    while True:
+        await asyncio.sleep(SESSION_FLUSH_INTERVAL)
+        try:
+            await flush_sessions()
+        except Exception as e:
+            print(f"セッションの保存に失敗しました: {e}")
+
+async def refill_board_pool_periodically():
+    """地雷配置のプールを定期的に補充するバックグラウンドタスク（生成は別スレッドで行い要求処理を止めない）"""
+    loop = asyncio.get_running_loop()
+    while True:
+        if board_pool.needs_refill():
+            await loop.run_in_executor(None, board_pool.refill)
+        await asyncio.sleep(BOARD_POOL_REFILL_INTERVAL)
+
+@app.on_event("startup")
+async def start_session_sweeper():
+    """起動時にセッション掃除タスク（と保存タスク・プールの補充タスク）を開始"""
+    app.state.session_sweeper = asyncio.create_task(sweep_sessions_periodically())
+    if session_backend is not None:
+        app.state.session_flusher = asyncio.create_task(flush_sessions_periodically())
+    if board_pool is not None:
+        app.state.board_pool_refiller = asyncio.create_task(refill_board_pool_periodically())
+
+@app.on_event("shutdown")
+async def stop_session_sweeper():
+    """終了時にセッション掃除タスクを止め、書き込み待ちを保存"""
+    app.state.session_sweeper.cancel()
+    if board_pool is not None:
+        app.state.board_pool_refiller.cancel()
+    no_guess_generator.close()
+    if session_backend is not None:
+        app.state.session_flusher.cancel()
+        session_backend.flush()
+
+def get_process_memory() -> dict:
+    """プロセスの常駐メモリ量（バイト）を取得"""
+    # ru_maxrssはLinuxではKiB単位のピーク値
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 if resource else None
+    try:
+        with open("/proc/self/statm") as statm:
+            rss = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        rss = None
+    return {"rss_bytes": rss, "peak_rss_bytes": peak_rss}
 
 # Pydanticモデル
 class GameSettings(BaseModel):
     height: int
     width: int
     mines: int
+    seed: Optional[int] = None      # 指定すると同じ最初の一手なら同じ地雷配置になる（再現・デバッグ用）
+    no_guess: bool = False          # 推測なしで解ける盤面にする
 
 class DigRequest(BaseModel):
     game_id: str
     row: int
     col: int
+    delta: bool = False             # Trueなら変化したマスだけを返す
+    version: Optional[int] = None   # クライアントが持っている盤面の版番号
 
 class FlagRequest(BaseModel):
     game_id: str
     row: int
     col: int
+    delta: bool = False
+    version: Optional[int] = None
 
 class GameResponse(BaseModel):
     game_id: str
-    board_data: list
+    board_data: Optional[list] = None      # 全体スナップショット（差分応答のときはNone）
+    changed_cells: Optional[list] = None   # 差分応答のときの変化したマス
+    version: int = 0
     game_state: str
     remaining_mines: int
     message: str = ""
@@ -68,6 +204,146 @@ def convert_board_data_for_api(board: MinesweeperBoard) -> list:
     
     return board_data
 
+def convert_changed_cells_for_api(board: MinesweeperBoard, cells: List[Tuple[int, int]]) -> list:
+    """変化したマスだけを座標付きでAPI用に変換"""
+    changed_cells = []
+    for row, col in cells:
+        converted_cell = convert_cell_data_for_api(board.get_cell_info(row, col))
+        converted_cell['row'] = row
+        converted_cell['col'] = col
+        changed_cells.append(converted_cell)
+    return changed_cells
+
+def create_move_response(game_id: str, board: MinesweeperBoard, request_delta: bool,
+                         client_version: Optional[int], previous_version: int,
+                         changed: List[Tuple[int, int]], message: str) -> GameResponse:
+    """
+    一手ごとのレスポンスを作成
+
+    差分が要求され、クライアントの版番号がこの手の直前の版と一致する場合だけ変化したマスを返す。
+    版がずれている（取りこぼしがある）場合は全体スナップショットを返す
+    """
+    use_delta = request_delta and client_version == previous_version
+
+    return GameResponse(
+        game_id=game_id,
+        board_data=None if use_delta else convert_board_data_for_api(board),
+        changed_cells=convert_changed_cells_for_api(board, changed) if use_delta else None,
+        version=board.get_version(),
+        game_state=board.get_game_state().name,
+        remaining_mines=board.get_remaining_mines(),
+        message=message
+    )
+
+async def prepare_no_guess_board(board: MinesweeperBoard, row: int, col: int) -> str:
+    """
+    推測なしのゲームの最初の一手の前に、その位置から推測なしで解ける盤面のシードを探して設定する
+
+    探索はプロセスプールで行い、待つ間もイベントループは止めない。
+    時間内に見つからなければシードを設定せず、通常の盤面で続ける
+
+    Returns:
+        メッセージに付け加える注記（なければ空文字列）
+    """
+    if not (board.no_guess and board.first_click and board.seed is None) \
+            or board.cell_states[row][col] != CellState.HIDDEN:
+        return ""
+
+    loop = asyncio.get_running_loop()
+    seed = await loop.run_in_executor(
+        None, partial(no_guess_generator.find_seed, board.height, board.width, board.mine_count, row, col,
+                      timeout=NO_GUESS_TIMEOUT))
+
+    # 探している間に別の要求で最初の一手が打たれていれば何もしない
+    if not (board.first_click and board.seed is None):
+        return ""
+    if seed is None:
+        return "（推測なしで解ける盤面が時間内に見つからなかったため、通常の盤面です）"
+    board.seed = seed
+    return ""
+
+def perform_dig(board: MinesweeperBoard, row: int, col: int) -> Tuple[List[Tuple[int, int]], str]:
+    """
+    セルを掘る
+
+    Returns:
+        (変化したマスのリスト, メッセージ)のタプル
+    """
+    # 最初の一手では、プールに使える地雷配置があれば生成・計算の代わりにそれを使う
+    # （シード指定のゲームは再現できるよう、シードから生成する）
+    if board.first_click and board.seed is None and board_pool is not None \
+            and board.cell_states[row][col] == CellState.HIDDEN:
+        layout = board_pool.take(board.height, board.width, board.mine_count, row, col)
+        if layout is not None:
+            board.apply_mine_layout(*layout)
+
+    success = board.dig(row, col)
+
+    # メッセージ生成
+    message = ""
+    if board.get_game_state() == GameState.WON:
+        message = "🎉 おめでとうございます！勝利しました！ 🎉"
+    elif board.get_game_state() == GameState.LOST:
+        message = "💀 残念...地雷を踏んでしまいました 💀"
+    elif success:
+        message = f"位置 ({row}, {col}) を掘りました"
+    else:
+        message = "何も起こりませんでした"
+
+    return board.get_last_revealed_cells(), message
+
+def perform_flag(board: MinesweeperBoard, row: int, col: int) -> Tuple[List[Tuple[int, int]], str]:
+    """
+    フラグを切り替える
+
+    Returns:
+        (変化したマスのリスト, メッセージ)のタプル
+    """
+    # フラグ切り替え前の状態確認
+    cell_info = board.get_cell_info(row, col)
+    was_flagged = cell_info['is_flagged']
+
+    # フラグ切り替え
+    previous_version = board.get_version()
+    board.toggle_flag(row, col)
+    changed = [(row, col)] if board.get_version() != previous_version else []
+
+    # メッセージ生成
+    if was_flagged:
+        message = f"位置 ({row}, {col}) のフラグを外しました"
+    else:
+        message = f"位置 ({row}, {col}) にフラグを立てました"
+
+    return changed, message
+
+def perform_solver_step(game_id: str, board: MinesweeperBoard) -> Tuple[List[Tuple[int, int]], str]:
+    """
+    論理ソルバーで1手進める
+
+    Returns:
+        (変化したマスのリスト, メッセージ)のタプル
+    """
+    if game_id not in solver_managers:
+        solver_managers[game_id] = SolverManager()
+    manager = solver_managers[game_id]
+
+    if board.first_click or board.is_game_over():
+        return [], "ソルバーは最初の一手の後、ゲーム中のみ使えます"
+
+    manager.analyze_board(board)
+    previous_version = board.get_version()
+    success, command = manager.execute_step(board)
+
+    if command.action == SolverAction.NO_MOVE:
+        return [], "論理的に確定する手がありません"
+
+    if command.action == SolverAction.DIG:
+        changed = board.get_last_revealed_cells()
+    else:
+        changed = [(command.row, command.col)] if board.get_version() != previous_version else []
+
+    return changed, f"ソルバー: {command}"
+
 @app.post("/api/new-game", response_model=GameResponse)
 async def create_new_game(settings: GameSettings):
     """新しいゲームを開始"""
@@ -79,23 +355,40 @@ async def create_new_game(settings: GameSettings):
         max_mines = settings.height * settings.width - 9  # 最初のクリック周辺を除く
         if not (1 <= settings.mines <= max_mines):
             raise HTTPException(status_code=400, detail=f"地雷数は1-{max_mines}の範囲で指定してください")
+
+        # シードはスナップショットに64ビットで保存する
+        if settings.seed is not None and not (0 <= settings.seed < 2 ** 63):
+            raise HTTPException(status_code=400, detail="シードは0以上2^63未満で指定してください")
+        # 推測なしの盤面はシードを探して決めるので、シードと同時には指定できない
+        if settings.seed is not None and settings.no_guess:
+            raise HTTPException(status_code=400, detail="シードと推測なしは同時に指定できません")
+        # 地雷の密度が高いと推測なしの盤面はほとんどなく、探しても時間切れになるだけなので難易度のプリセットに限る
+        if settings.no_guess and (settings.height, settings.width, settings.mines) not in DIFFICULTY_PRESETS.values():
+            raise HTTPException(status_code=400, detail="推測なしは初級・中級・上級の盤面でのみ指定できます")
         
         # 新しいゲームボードを作成
         game_id = str(uuid.uuid4())
-        board = MinesweeperBoard(settings.height, settings.width, settings.mines)
+        board_class = CompactMinesweeperBoard if COMPACT_BOARD else MinesweeperBoard
+        board = board_class(settings.height, settings.width, settings.mines, seed=settings.seed,
+                            no_guess=settings.no_guess)
         game_sessions[game_id] = board
         
         # レスポンス作成
         return GameResponse(
             game_id=game_id,
             board_data=convert_board_data_for_api(board),
+            version=board.get_version(),
             game_state=board.get_game_state().name,
             remaining_mines=board.get_remaining_mines(),
             message="新しいゲームが開始されました！最初のマスをクリックしてください"
         )
         
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except SessionBusyError:
+        raise HTTPException(status_code=503, detail="セッションの保存先が混み合っています。しばらくしてから再試行してください")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"ゲーム作成エラー: {str(e)}")
 
@@ -103,40 +396,34 @@ async def create_new_game(settings: GameSettings):
 async def dig_cell(request: DigRequest):
     """セルを掘る"""
     try:
-        # ゲームセッション確認
-        if request.game_id not in game_sessions:
+        # ゲームセッション確認（共有時の保存済みの版番号の確認も1回で済ませる）
+        board = game_sessions.get(request.game_id)
+        if board is None:
             raise HTTPException(status_code=404, detail="ゲームセッションが見つかりません")
         
-        board = game_sessions[request.game_id]
-        
         # 座標の検証
         if not (0 <= request.row < board.height and 0 <= request.col < board.width):
             raise HTTPException(status_code=400, detail="無効な座標です")
         
         # 掘る
-        success = board.dig(request.row, request.col)
+        previous_version = board.get_version()
+        note = await prepare_no_guess_board(board, request.row, request.col)
+        changed, message = perform_dig(board, request.row, request.col)
+        message += note
+        if changed:
+            game_sessions.mark_dirty(request.game_id)
         
-        # メッセージ生成
-        message = ""
-        if board.get_game_state() == GameState.WON:
-            message = "🎉 おめでとうございます！勝利しました！ 🎉"
-        elif board.get_game_state() == GameState.LOST:
-            message = "💀 残念...地雷を踏んでしまいました 💀"
-        elif success:
-            message = f"位置 ({request.row}, {request.col}) を掘りました"
-        else:
-            message = "何も起こりませんでした"
-        
-        return GameResponse(
-            game_id=request.game_id,
-            board_data=convert_board_data_for_api(board),
-            game_state=board.get_game_state().name,
-            remaining_mines=board.get_remaining_mines(),
-            message=message
+        return create_move_response(
+            request.game_id, board, request.delta, request.version, previous_version,
+            changed, message
         )
         
     except HTTPException:
         raise
+    except SessionConflictError:
+        raise HTTPException(status_code=409, detail="別の接続で盤面が更新されました。盤面を取得し直してください")
+    except SessionBusyError:
+        raise HTTPException(status_code=503, detail="セッションの保存先が混み合っています。しばらくしてから再試行してください")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"掘削エラー: {str(e)}")
 
@@ -144,39 +431,32 @@ async def dig_cell(request: DigRequest):
 async def toggle_flag(request: FlagRequest):
     """フラグを切り替える"""
     try:
-        # ゲームセッション確認
-        if request.game_id not in game_sessions:
+        # ゲームセッション確認（共有時の保存済みの版番号の確認も1回で済ませる）
+        board = game_sessions.get(request.game_id)
+        if board is None:
             raise HTTPException(status_code=404, detail="ゲームセッションが見つかりません")
         
-        board = game_sessions[request.game_id]
-        
         # 座標の検証
         if not (0 <= request.row < board.height and 0 <= request.col < board.width):
             raise HTTPException(status_code=400, detail="無効な座標です")
         
-        # フラグ切り替え前の状態確認
-        cell_info = board.get_cell_info(request.row, request.col)
-        was_flagged = cell_info['is_flagged']
-        
         # フラグ切り替え
-        board.toggle_flag(request.row, request.col)
+        previous_version = board.get_version()
+        changed, message = perform_flag(board, request.row, request.col)
+        if changed:
+            game_sessions.mark_dirty(request.game_id)
         
-        # メッセージ生成
-        if was_flagged:
-            message = f"位置 ({request.row}, {request.col}) のフラグを外しました"
-        else:
-            message = f"位置 ({request.row}, {request.col}) にフラグを立てました"
-        
-        return GameResponse(
-            game_id=request.game_id,
-            board_data=convert_board_data_for_api(board),
-            game_state=board.get_game_state().name,
-            remaining_mines=board.get_remaining_mines(),
-            message=message
+        return create_move_response(
+            request.game_id, board, request.delta, request.version, previous_version,
+            changed, message
         )
         
     except HTTPException:
         raise
+    except SessionConflictError:
+        raise HTTPException(status_code=409, detail="別の接続で盤面が更新されました。盤面を取得し直してください")
+    except SessionBusyError:
+        raise HTTPException(status_code=503, detail="セッションの保存先が混み合っています。しばらくしてから再試行してください")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"フラグ操作エラー: {str(e)}")
 
@@ -184,14 +464,14 @@ async def toggle_flag(request: FlagRequest):
 async def get_game_state(game_id: str):
     """ゲーム状態を取得"""
     try:
-        if game_id not in game_sessions:
+        board = game_sessions.get(game_id)
+        if board is None:
             raise HTTPException(status_code=404, detail="ゲームセッションが見つかりません")
         
-        board = game_sessions[game_id]
-        
         return GameResponse(
             game_id=game_id,
             board_data=convert_board_data_for_api(board),
+            version=board.get_version(),
             game_state=board.get_game_state().name,
             remaining_mines=board.get_remaining_mines(),
             message="ゲーム状態を取得しました"
@@ -199,6 +479,8 @@ async def get_game_state(game_id: str):
         
     except HTTPException:
         raise
+    except SessionBusyError:
+        raise HTTPException(status_code=503, detail="セッションの保存先が混み合っています。しばらくしてから再試行してください")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"状態取得エラー: {str(e)}")
 
@@ -210,13 +492,112 @@ async def delete_game(game_id: str):
             raise HTTPException(status_code=404, detail="ゲームセッションが見つかりません")
         
         del game_sessions[game_id]
+        solver_managers.pop(game_id, None)
         return {"message": "ゲームセッションを削除しました"}
         
     except HTTPException:
         raise
+    except SessionBusyError:
+        raise HTTPException(status_code=503, detail="セッションの保存先が混み合っています。しばらくしてから再試行してください")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"削除エラー: {str(e)}")
 
+@app.websocket("/ws/game/{game_id}")
+async def game_channel(websocket: WebSocket, game_id: str):
+    """
+    ゲームごとのWebSocketチャネル
+
+    受信: {"type": "dig" | "flag", "row": 行, "col": 列} または {"type": "solver_step"}
+    送信: 接続直後に {"type": "snapshot", ...全体の盤面...}、
+          以降は1手ごとに {"type": "update", "changed_cells": [...], "version": 版番号, ...}
+    """
+    await websocket.accept()
+
+    try:
+        board = game_sessions.get(game_id)
+    except SessionBusyError:
+        await websocket.send_json({"type": "error", "detail": "セッションの保存先が混み合っています"})
+        await websocket.close(code=1013)
+        return
+    if board is None:
+        await websocket.send_json({"type": "error", "detail": "ゲームセッションが見つかりません"})
+        await websocket.close(code=4404)
+        return
+    await websocket.send_json({
+        "type": "snapshot",
+        "board_data": convert_board_data_for_api(board),
+        "version": board.get_version(),
+        "game_state": board.get_game_state().name,
+        "remaining_mines": board.get_remaining_mines()
+    })
+
+    try:
+        while True:
+            # JSONでないテキストやオブジェクトでない値はエラーを返し、接続は閉じない
+            try:
+                request = json.loads(await websocket.receive_text())
+                if not isinstance(request, dict):
+                    raise ValueError("JSONオブジェクトではありません")
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "detail": f"無効なメッセージ: {str(e)}"})
+                continue
+            message_type = request.get("type")
+
+            # 接続中に追い出し・再読み込みされても最新の盤面を使う
+            try:
+                board = game_sessions.get(game_id)
+            except SessionBusyError:
+                await websocket.send_json({"type": "error", "detail": "セッションの保存先が混み合っています"})
+                continue
+            if board is None:
+                await websocket.send_json({"type": "error", "detail": "ゲームセッションが見つかりません"})
+                await websocket.close(code=4404)
+                return
+
+            try:
+                if message_type in ("dig", "flag"):
+                    row, col = int(request["row"]), int(request["col"])
+                    if not (0 <= row < board.height and 0 <= col < board.width):
+                        await websocket.send_json({"type": "error", "detail": "無効な座標です"})
+                        continue
+
+                    if message_type == "dig":
+                        note = await prepare_no_guess_board(board, row, col)
+                        changed, message = perform_dig(board, row, col)
+                        message += note
+                    else:
+                        changed, message = perform_flag(board, row, col)
+                elif message_type == "solver_step":
+                    changed, message = perform_solver_step(game_id, board)
+                else:
+                    await websocket.send_json({"type": "error", "detail": f"不明なメッセージ: {message_type}"})
+                    continue
+            except (KeyError, TypeError, ValueError) as e:
+                await websocket.send_json({"type": "error", "detail": f"無効なメッセージ: {str(e)}"})
+                continue
+
+            if changed:
+                try:
+                    game_sessions.mark_dirty(game_id)
+                except SessionConflictError:
+                    await websocket.send_json({"type": "error", "detail": "別の接続で盤面が更新されました"})
+                    continue
+                except SessionBusyError:
+                    await websocket.send_json({"type": "error", "detail": "セッションの保存先が混み合っています"})
+                    continue
+
+            await websocket.send_json({
+                "type": "update",
+                "changed_cells": convert_changed_cells_for_api(board, changed),
+                "version": board.get_version(),
+                "game_state": board.get_game_state().name,
+                "remaining_mines": board.get_remaining_mines(),
+                "message": message
+            })
+
+    except WebSocketDisconnect:
+        pass
+
 # ヘルスチェック
 @app.get("/health")
 async def health_check():
@@ -224,6 +605,10 @@ async def health_check():
     return {
         "status": "healthy",
         "active_games": len(game_sessions),
+        "sessions": game_sessions.get_stats(),
+        "board_pool": board_pool.get_stats() if board_pool is not None else None,
+        "no_guess": no_guess_generator.get_stats(),
+        "memory": get_process_memory(),
         "message": "Logical Minesweeper API is running!"
     }
 
@@ -247,10 +632,16 @@ if __name__ == "__main__":
     print("API ドキュメント: http://localhost:8000/docs")
     print("ヘルスチェック: http://localhost:8000/health")
     
+    if WORKERS > 1:
+        # ワーカーはこのプロセスの環境変数を引き継ぐので、共有するデータベースをそろえておく
+        os.environ["MINESWEEPER_SESSION_DB"] = SESSION_DB_PATH
+        print(f"ワーカー数: {WORKERS}（セッション共有: {SESSION_DB_PATH}）")
+
     uvicorn.run(
         "api:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        reload=WORKERS == 1,  # reloadと複数ワーカーは併用できない
+        workers=WORKERS,
         log_level="info"
     )
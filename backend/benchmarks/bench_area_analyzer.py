@@ -0,0 +1,102 @@
+"""
+AreaAnalyzerのメモリ使用量・制約1つあたりの処理時間のベンチマーク
+上級の盤面を最後まで進め（論理的に確定しなくなったら、実際の地雷位置を見て安全なマスを1つ開ける）、
+その間の制約の追加（境界の連結成分のAreaAnalyzerへの追加）の時間・マージ数と、
+エリアリストの大きさ・メモリ使用量を計測する
+
+使い方:
+    cd backend
+    python benchmarks/bench_area_analyzer.py --games 20
+"""
+
+import sys
+import os
+import argparse
+import random
+import time
+import tracemalloc
+
+# 親ディレクトリのminesweeperモジュールをインポートするための設定
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from minesweeper import MinesweeperBoard, CellState
+from solver.solver_manager import SolverManager
+from solver.logical_solver import LogicalSolver
+
+
+def timed(frontier, latencies: list, merge_counts: list):
+    """add_constraintの呼び出しごとの時間（秒）とマージ数を記録するラッパー"""
+    func = frontier.add_constraint
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        latencies.append(time.perf_counter() - start)
+        merge_counts.append(frontier.last_merge_count)
+        return result
+    return wrapper
+
+
+def play_full_game(height: int, width: int, mines: int, seed: int, latencies: list, merge_counts: list) -> int:
+    """
+    1ゲームを最後まで進める
+
+    Returns:
+        ゲーム中のエリアリストの最大長（全成分の合計、削除済みエリアを含む）
+    """
+    random.seed(seed)
+    board = MinesweeperBoard(height, width, mines)
+    board.dig(height // 2, width // 2)
+
+    solver = LogicalSolver(use_area_analyzer=True)
+    frontier = solver.frontier
+    frontier.add_constraint = timed(frontier, latencies, merge_counts)
+    manager = SolverManager(solver)
+
+    max_area_list = 0
+    while not board.is_game_over():
+        manager.solve_until_manual_needed(board)
+        area_list = sum(len(component.analyzer.areas) for component in frontier.components.values())
+        max_area_list = max(max_area_list, area_list)
+        if board.is_game_over():
+            break
+
+        # 論理的に確定しない場合は、安全なマスを1つ開けて続ける
+        safe_cells = [(row, col) for row in range(height) for col in range(width)
+                      if board.cell_states[row][col] == CellState.HIDDEN and not board.mines[row][col]]
+        board.dig(*random.choice(safe_cells))
+
+    return max_area_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AreaAnalyzerのメモリ・処理時間のベンチマーク")
+    parser.add_argument("--games", type=int, default=20, help="ゲーム数")
+    args = parser.parse_args()
+    height, width, mines = 16, 30, 99
+
+    latencies = []
+    merge_counts = []
+    max_area_list = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    for seed in range(args.games):
+        max_area_list = max(max_area_list, play_full_game(height, width, mines, seed, latencies, merge_counts))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    mean_us = sum(latencies) / len(latencies) * 1e6
+    p99_us = latencies[int(len(latencies) * 0.99)] * 1e6
+    max_us = latencies[-1] * 1e6
+
+    print(f"=== AreaAnalyzerベンチマーク (上級 {height}x{width}, 地雷{mines}個, {args.games}ゲーム) ===")
+    print(f"制約の追加: {len(latencies)}回, 平均 {mean_us:8.1f} us, 99% {p99_us:8.1f} us, 最大 {max_us:8.1f} us")
+    print(f"マージ数: 平均 {sum(merge_counts) / len(merge_counts):8.1f}, 最大 {max(merge_counts)}")
+    print(f"エリアリストの最大長: {max_area_list}, ピークメモリ {peak / 1024:8.1f} KiB")
+    print(f"1ゲームあたり {elapsed / args.games * 1000:8.2f} ms（tracemalloc込み）")
+
+
+if __name__ == "__main__":
+    main()
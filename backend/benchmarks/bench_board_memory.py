@@ -0,0 +1,75 @@
+"""
+盤面の格納方式ごとのメモリ使用量・全体スキャン速度・1マスずつ掘る速度のベンチマーク
+
+使い方:
+    cd backend
+    python benchmarks/bench_board_memory.py
+"""
+
+import sys
+import os
+import random
+import time
+import timeit
+import tracemalloc
+
+# 親ディレクトリのminesweeperモジュールをインポートするための設定
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from minesweeper import MinesweeperBoard
+from compact_board import CompactMinesweeperBoard
+
+
+def measure_board_memory(board_class, height: int, width: int, mine_count: int, games: int) -> float:
+    """1ゲームあたりのメモリ使用量（バイト）を計測"""
+    random.seed(0)
+    tracemalloc.start()
+    boards = []
+    for _ in range(games):
+        board = board_class(height, width, mine_count)
+        board.dig(height // 2, width // 2)
+        boards.append(board)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / games
+
+
+def measure_scan_time(board_class, height: int, width: int, mine_count: int, repeat: int) -> float:
+    """全体スキャン（未発見の安全マス数 + フラグ数の集計）1回あたりの時間（マイクロ秒）"""
+    random.seed(0)
+    board = board_class(height, width, mine_count)
+    board.dig(height // 2, width // 2)
+
+    return timeit.timeit(board._scan_counters, number=repeat) / repeat * 1e6
+
+
+def measure_dig_all_time(board_class, height: int, width: int, mine_count: int, games: int) -> float:
+    """最初の一手の後、安全なマスを全て1マスずつ掘る時間（ミリ秒、1ゲームあたり）"""
+    total = 0.0
+    for seed in range(games):
+        board = board_class(height, width, mine_count, seed=seed)
+        board.dig(height // 2, width // 2)
+        safe_cells = [(row, col) for row in range(height) for col in range(width) if not board.mines[row][col]]
+
+        start = time.perf_counter()
+        for row, col in safe_cells:
+            board.dig(row, col)
+        total += time.perf_counter() - start
+    return total / games * 1000
+
+
+def main():
+    height, width, mine_count = 50, 50, 500
+    games = 200
+
+    print(f"=== 盤面メモリベンチマーク ({height}x{width}, 地雷{mine_count}個, {games}ゲーム) ===")
+    for board_class in (MinesweeperBoard, CompactMinesweeperBoard):
+        per_game = measure_board_memory(board_class, height, width, mine_count, games)
+        scan_us = measure_scan_time(board_class, height, width, mine_count, 200)
+        dig_all_ms = measure_dig_all_time(board_class, height, width, mine_count, 20)
+        print(f"{board_class.__name__:>24}: {per_game / 1024:8.1f} KiB/ゲーム, 全体スキャン {scan_us:8.1f} us, "
+              f"全マスを掘る {dig_all_ms:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+最初の一手のベンチマーク
+地雷の生成・周囲の地雷数の計算をその場で行う場合と、BoardPoolの抽出から配置を作って設定する場合で、
+APIと同じMinesweeperBoardの最初のdigにかかる時間を比較する。
+プールのヒット率は、APIと同じ間隔で補充しながら毎秒一定数の最初の一手が続く場合で計測する
+
+使い方:
+    cd backend
+    python benchmarks/bench_first_click.py --clicks 200 --rates 10 50 200
+"""
+
+import sys
+import os
+import argparse
+import random
+import time
+
+# 親ディレクトリのminesweeperモジュールをインポートするための設定
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from minesweeper import MinesweeperBoard
+from game_manager import DIFFICULTY_PRESETS
+from board_pool import BoardPool
+
+# プリセットに加えて、APIで作れる最大の盤面
+BOARD_SIZES = dict(DIFFICULTY_PRESETS, 最大=(50, 50, 500))
+
+# APIの補充間隔（MINESWEEPER_BOARD_POOL_REFILL_INTERVALの既定値）
+REFILL_INTERVAL = 0.5
+
+
+def first_click_with_pool(pool: BoardPool, height: int, width: int, mine_count: int, row: int, col: int):
+    """APIのperform_digと同じく、プールに抽出があればそれで配置してから掘る"""
+    board = MinesweeperBoard(height, width, mine_count)
+    layout = pool.take(height, width, mine_count, row, col)
+    if layout is not None:
+        board.apply_mine_layout(*layout)
+    board.dig(row, col)
+
+
+def sustained_hit_rate(size, clicks, capacity: int, rate: float) -> float:
+    """
+    毎秒rate回の最初の一手が続くときのヒット率
+
+    時刻は実時間ではなくクリック数から決め、REFILL_INTERVALごとに補充する
+    """
+    height, width, mine_count = size
+    pool = BoardPool([size], capacity=capacity)
+    pool.refill()
+    next_refill = REFILL_INTERVAL
+    for index, (row, col) in enumerate(clicks):
+        if index / rate >= next_refill:
+            pool.refill()
+            next_refill += REFILL_INTERVAL
+        pool.take(height, width, mine_count, row, col)
+    return pool.get_stats()["hit_rate"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="最初の一手のベンチマーク")
+    parser.add_argument("--clicks", type=int, default=200, help="盤面サイズごとの最初の一手の回数")
+    parser.add_argument("--capacity", type=int, default=32, help="プールの大きさ")
+    parser.add_argument("--rates", type=float, nargs="+", default=[10, 50, 200],
+                        help="ヒット率を計測する毎秒の最初の一手の数")
+    args = parser.parse_args()
+
+    print(f"=== 最初の一手のベンチマーク ({args.clicks}回ずつ, プール{args.capacity}個, "
+          f"補充間隔{REFILL_INTERVAL}秒) ===")
+    rate_headers = " ".join(f"{f'{rate:g}回/秒':>10}" for rate in args.rates)
+    print(f"{'盤面':>10} {'その場(ms)':>12} {'プール(ms)':>12} {'高速化':>8} {rate_headers}")
+
+    rng = random.Random(0)
+    for name, size in BOARD_SIZES.items():
+        height, width, mine_count = size
+        clicks = [(rng.randrange(height), rng.randrange(width)) for _ in range(args.clicks)]
+
+        start = time.perf_counter()
+        for row, col in clicks:
+            MinesweeperBoard(height, width, mine_count).dig(row, col)
+        inline_ms = (time.perf_counter() - start) / args.clicks * 1000
+
+        # 時間は全てヒットする大きさのプールで計測する（補充は要求処理の外なので計測から除く）
+        pool = BoardPool([size], capacity=args.clicks)
+        pool.refill()
+        start = time.perf_counter()
+        for row, col in clicks:
+            first_click_with_pool(pool, height, width, mine_count, row, col)
+        pooled_ms = (time.perf_counter() - start) / args.clicks * 1000
+
+        hit_rates = " ".join(f"{sustained_hit_rate(size, clicks, args.capacity, rate):10.1%}"
+                             for rate in args.rates)
+        label = f"{name} {height}x{width}"
+        print(f"{label:>10} {inline_ms:12.3f} {pooled_ms:12.3f} {inline_ms / pooled_ms:7.1f}x {hit_rates}")
+
+
+if __name__ == "__main__":
+    main()
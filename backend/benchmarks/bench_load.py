@@ -0,0 +1,160 @@
+"""
+REST APIとWebSocketチャネルの負荷テストクライアント
+起動中のサーバーに対して、同時に複数のゲームを進めながら
+1手あたりの往復レイテンシと毎秒の手数を計測する
+
+httpxは負荷をかけるクライアント側だけで使う開発用の依存で、requirements.txtには含めていない
+（websocketsはサーバーのWebSocketチャネルでも使うのでrequirements.txtに含まれている）
+
+使い方:
+    pip install httpx
+    cd backend
+    python api.py                       # 別ターミナルでサーバーを起動
+    python benchmarks/bench_load.py --games 20 --moves 200
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import Counter
+from typing import List
+
+import httpx
+import websockets
+
+BOARD_SETTINGS = {"height": 16, "width": 30, "mines": 99}
+
+
+def summarize(name: str, latencies: List[float], elapsed: float, errors: Counter):
+    """レイテンシの統計と毎秒の手数（成功した手のみ）、競合・混雑で失敗した手の数を表示"""
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    p95 = latencies_ms[int(len(latencies_ms) * 0.95) - 1]
+    print(f"{name:>10}: {len(latencies_ms):6}手, "
+          f"p50 {statistics.median(latencies_ms):7.2f} ms, p95 {p95:7.2f} ms, "
+          f"{len(latencies_ms) / elapsed:8.1f} 手/秒, "
+          f"競合 {errors['conflict']}, 混雑 {errors['busy']}, その他のエラー {errors['error']}")
+
+
+def move_sequence(rng: random.Random) -> List[tuple]:
+    """全マスをランダムな順に掘る手順（ゲームが終わったら新しいゲームで続ける）"""
+    cells = [(row, col) for row in range(BOARD_SETTINGS["height"]) for col in range(BOARD_SETTINGS["width"])]
+    rng.shuffle(cells)
+    return cells
+
+
+async def new_game(client: httpx.AsyncClient) -> str:
+    response = await client.post("/api/new-game", json=BOARD_SETTINGS)
+    response.raise_for_status()
+    return response.json()["game_id"]
+
+
+async def rest_player(client: httpx.AsyncClient, moves: int, seed: int, delta: bool,
+                      errors: Counter) -> List[float]:
+    """
+    REST APIでmoves回の手を打つ
+
+    競合（409）・混雑（503）で失敗した手はerrorsに数え、盤面を取得し直して同じマスをもう一度掘る
+
+    Returns:
+        成功した手のレイテンシ（秒）のリスト
+    """
+    rng = random.Random(seed)
+    latencies = []
+    game_id, version, cells = await new_game(client), 0, move_sequence(rng)
+
+    for _ in range(moves):
+        if not cells:
+            game_id, version, cells = await new_game(client), 0, move_sequence(rng)
+        row, col = cells.pop()
+
+        start = time.perf_counter()
+        response = await client.post("/api/dig", json={
+            "game_id": game_id, "row": row, "col": col, "delta": delta, "version": version})
+        if response.status_code in (409, 503):
+            errors["conflict" if response.status_code == 409 else "busy"] += 1
+            cells.append((row, col))
+            state = await client.get(f"/api/game/{game_id}")
+            if state.status_code == 200:
+                version = state.json()["version"]
+            continue
+        response.raise_for_status()
+        data = response.json()
+        latencies.append(time.perf_counter() - start)
+
+        version = data["version"]
+        if data["game_state"] != "PLAYING":
+            cells = []
+    return latencies
+
+
+async def websocket_player(base_url: str, client: httpx.AsyncClient, moves: int, seed: int,
+                           errors: Counter) -> List[float]:
+    """
+    WebSocketチャネルでmoves回の手を打つ
+
+    エラーの返信はerrorsに数え、そのゲームを終えて次のゲームに移る
+
+    Returns:
+        成功した手のレイテンシ（秒）のリスト
+    """
+    rng = random.Random(seed)
+    latencies = []
+    attempts = 0
+    ws_url = base_url.replace("http", "ws", 1)
+
+    while attempts < moves:
+        game_id, cells = await new_game(client), move_sequence(rng)
+        async with websockets.connect(f"{ws_url}/ws/game/{game_id}") as websocket:
+            await websocket.recv()  # 最初のスナップショット
+            while cells and attempts < moves:
+                row, col = cells.pop()
+                attempts += 1
+
+                start = time.perf_counter()
+                await websocket.send(json.dumps({"type": "dig", "row": row, "col": col}))
+                data = json.loads(await websocket.recv())
+                if data.get("type") == "error":
+                    errors["error"] += 1
+                    break
+                latencies.append(time.perf_counter() - start)
+
+                if data.get("game_state") != "PLAYING":
+                    break
+    return latencies
+
+
+async def run_scenario(name: str, base_url: str, games: int, moves: int, mode: str):
+    """同時にgamesゲームを進めて計測"""
+    errors = Counter()
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as client:
+        start = time.perf_counter()
+        if mode == "websocket":
+            tasks = [websocket_player(base_url, client, moves, seed, errors) for seed in range(games)]
+        else:
+            tasks = [rest_player(client, moves, seed, delta=(mode == "rest-delta"), errors=errors)
+                     for seed in range(games)]
+        results = await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    summarize(name, [latency for latencies in results for latency in latencies], elapsed, errors)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Logical Minesweeper 負荷テスト")
+    parser.add_argument("--url", default="http://localhost:8000", help="サーバーのURL")
+    parser.add_argument("--games", type=int, default=20, help="同時に進めるゲーム数")
+    parser.add_argument("--moves", type=int, default=200, help="1ゲーム（接続）あたりの手数")
+    args = parser.parse_args()
+
+    print(f"=== 負荷テスト ({args.url}, 同時{args.games}ゲーム x {args.moves}手, "
+          f"{BOARD_SETTINGS['height']}x{BOARD_SETTINGS['width']}) ===")
+    await run_scenario("REST全体", args.url, args.games, args.moves, "rest")
+    await run_scenario("REST差分", args.url, args.games, args.moves, "rest-delta")
+    await run_scenario("WebSocket", args.url, args.games, args.moves, "websocket")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+"""
+周囲の地雷数計算のベンチマーク
+MinesweeperBoard._calculate_mine_numbers（マスごとのループ）と
+count_adjacent_mines（パディング+シフト加算による一括計算）を比較する
+
+使い方:
+    cd backend
+    python benchmarks/bench_mine_numbers.py
+"""
+
+import sys
+import os
+import random
+import time
+
+import numpy as np
+
+# 親ディレクトリのminesweeperモジュールをインポートするための設定
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from minesweeper import MinesweeperBoard
+from compact_board import count_adjacent_mines
+
+# (高さ, 幅, 計測回数)
+BOARD_SIZES = [
+    (9, 9, 200),
+    (16, 16, 100),
+    (16, 30, 100),
+    (100, 100, 5),
+    (1000, 1000, 1),
+]
+MINE_DENSITY = 0.2
+
+
+def make_loop_board(mine_mask: np.ndarray) -> MinesweeperBoard:
+    """地雷マスクを設定したリスト版盤面を作成"""
+    height, width = mine_mask.shape
+    board = MinesweeperBoard(height, width, int(mine_mask.sum()))
+    board.mines = mine_mask.tolist()
+    return board
+
+
+def time_call(func, repeat: int) -> float:
+    """1回あたりの実行時間（ミリ秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    print(f"=== 周囲の地雷数計算ベンチマーク (地雷密度 {MINE_DENSITY:.0%}) ===")
+    print(f"{'盤面':>10} {'ループ(ms)':>12} {'一括(ms)':>12} {'高速化':>8}")
+
+    rng = random.Random(0)
+    for height, width, repeat in BOARD_SIZES:
+        mine_mask = np.array([[rng.random() < MINE_DENSITY for _ in range(width)]
+                              for _ in range(height)])
+        board = make_loop_board(mine_mask)
+
+        loop_ms = time_call(board._calculate_mine_numbers, repeat)
+        vector_ms = time_call(lambda: count_adjacent_mines(mine_mask), repeat)
+
+        # 結果が一致することを確認
+        assert (count_adjacent_mines(mine_mask) == np.array(board.mine_numbers)).all()
+
+        size = f"{height}x{width}"
+        print(f"{size:>10} {loop_ms:12.3f} {vector_ms:12.3f} {loop_ms / vector_ms:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
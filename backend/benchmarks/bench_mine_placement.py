@@ -0,0 +1,74 @@
+"""
+地雷配置の生成のベンチマーク
+除外しないマスの(row, col)のリストを作ってrandom.sampleする方式と、
+generate_mine_indices（通し番号の非復元抽出+除外マスの分のずらし）を比較し、
+CompactMinesweeperBoardの最初の一手（配置の書き込み・周囲の地雷数の計算を含む）の時間も計測する
+
+使い方:
+    cd backend
+    python benchmarks/bench_mine_placement.py
+"""
+
+import sys
+import os
+import random
+import time
+
+# 親ディレクトリのminesweeperモジュールをインポートするための設定
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from minesweeper import generate_mine_indices
+from compact_board import CompactMinesweeperBoard
+
+# (高さ, 幅, 計測回数)
+BOARD_SIZES = [
+    (9, 9, 1000),
+    (16, 30, 1000),
+    (100, 100, 100),
+    (300, 300, 10),
+    (1000, 1000, 3),
+]
+MINE_DENSITY = 0.2
+
+
+def list_sample(height: int, width: int, mine_count: int, first_click_row: int, first_click_col: int):
+    """従来の方式: 除外しないマスの座標のリストを作ってrandom.sampleする"""
+    excluded_positions = {(first_click_row + dr, first_click_col + dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1)}
+    available_positions = [(row, col) for row in range(height) for col in range(width)
+                           if (row, col) not in excluded_positions]
+    return random.sample(available_positions, mine_count)
+
+
+def time_call(func, repeat: int) -> float:
+    """1回あたりの実行時間（ミリ秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def first_click(height: int, width: int, mine_count: int):
+    """CompactMinesweeperBoardで最初の一手を掘る（地雷の生成から展開まで）"""
+    board = CompactMinesweeperBoard(height, width, mine_count, seed=0)
+    board.dig(height // 2, width // 2)
+
+
+def main():
+    print(f"=== 地雷配置の生成ベンチマーク (地雷密度 {MINE_DENSITY:.0%}) ===")
+    print(f"{'盤面':>10} {'リスト(ms)':>12} {'通し番号(ms)':>14} {'高速化':>8} {'最初の一手(ms)':>16}")
+
+    random.seed(0)
+    for height, width, repeat in BOARD_SIZES:
+        mine_count = int(height * width * MINE_DENSITY)
+        row, col = height // 2, width // 2
+
+        list_ms = time_call(lambda: list_sample(height, width, mine_count, row, col), repeat)
+        index_ms = time_call(lambda: generate_mine_indices(height, width, mine_count, row, col), repeat)
+        click_ms = time_call(lambda: first_click(height, width, mine_count), max(repeat // 10, 1))
+
+        size = f"{height}x{width}"
+        print(f"{size:>10} {list_ms:12.3f} {index_ms:14.3f} {list_ms / index_ms:7.1f}x {click_ms:16.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+近傍テーブルのマイクロベンチマーク
+呼び出しごとにリストを作る従来の近傍計算と、共有テーブル（neighbor_table）を比較する
+
+使い方:
+    cd backend
+    python benchmarks/bench_neighbors.py
+"""
+
+import sys
+import os
+import random
+import time
+import tracemalloc
+
+# 親ディレクトリのminesweeperモジュールをインポートするための設定
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from minesweeper import MinesweeperBoard
+from neighbor_table import get_neighbor_table
+
+
+class LegacyNeighbors:
+    """呼び出しごとに近傍リストを作る従来の近傍計算（比較用）"""
+
+    def __init__(self, height: int, width: int):
+        self.height = height
+        self.width = width
+
+    def neighbors(self, row, col):
+        neighbors = []
+        for dr in [-1, 0, 1]:
+            for dc in [-1, 0, 1]:
+                if dr == 0 and dc == 0:
+                    continue
+                new_row, new_col = row + dr, col + dc
+                if 0 <= new_row < self.height and 0 <= new_col < self.width:
+                    neighbors.append((new_row, new_col))
+        return neighbors
+
+
+class LegacyNeighborBoard(MinesweeperBoard):
+    """従来の近傍計算を使う盤面（比較用）"""
+
+    def __init__(self, height: int, width: int, mine_count: int):
+        super().__init__(height, width, mine_count)
+        self._neighbor_table = LegacyNeighbors(height, width)
+
+
+def bytes_per_call(get_neighbors, cells, repeat: int = 3) -> float:
+    """1回の近傍取得で新たに確保されるメモリ（バイト）"""
+    results = []
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for _ in range(repeat):
+        for row, col in cells:
+            results.append(get_neighbors(row, col))
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # 結果を保持するリスト自体の分（1要素8バイト）は除く
+    return (after - before) / len(results) - 8
+
+
+def ns_per_call(get_neighbors, cells, repeat: int = 20) -> float:
+    """1回の近傍取得にかかる時間（ナノ秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for row, col in cells:
+            get_neighbors(row, col)
+    return (time.perf_counter() - start) / (repeat * len(cells)) * 1e9
+
+
+def first_move_stats(board_class, height: int, width: int, mine_count: int, games: int):
+    """初手（地雷生成 + 周囲の地雷数計算 + 展開）1回あたりの時間（ミリ秒）と一時メモリのピーク（バイト）"""
+    total_time = 0.0
+    max_peak = 0
+    for seed in range(games):
+        random.seed(seed)
+        board = board_class(height, width, mine_count)
+
+        tracemalloc.start()
+        base, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        board.dig(height // 2, width // 2)
+        total_time += time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        max_peak = max(max_peak, peak - base)
+    return total_time / games * 1000, max_peak
+
+
+def main():
+    height, width, mine_count = 16, 30, 99
+    cells = [(r, c) for r in range(height) for c in range(width)]
+
+    legacy_board = LegacyNeighborBoard(height, width, mine_count)
+    table = get_neighbor_table(height, width)
+    table_board = MinesweeperBoard(height, width, mine_count)
+    for row, col in cells:
+        table.neighbors(row, col)  # キャッシュを温めておく
+
+    print(f"=== 近傍取得マイクロベンチマーク ({height}x{width}) ===")
+    for name, func in (("従来（毎回リスト作成）", legacy_board._get_neighbors),
+                       ("共有テーブル", table_board._get_neighbors)):
+        print(f"{name:>16}: {ns_per_call(func, cells):7.0f} ns/回, "
+              f"{bytes_per_call(func, cells):7.1f} バイト/回")
+
+    print(f"\n=== 初手の比較 ({height}x{width}, 地雷{mine_count}個, 50ゲーム平均) ===")
+    for board_class in (LegacyNeighborBoard, MinesweeperBoard):
+        ms, peak = first_move_stats(board_class, height, width, mine_count, games=50)
+        print(f"{board_class.__name__:>20}: {ms:7.3f} ms/手, 一時メモリのピーク {peak / 1024:7.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+推測なしで解ける盤面の生成のベンチマーク
+難易度ごとに、ランダムな最初の一手に対して解けるシードが見つかるまでの時間と調べた候補の数を計測し、
+ワーカープロセス数による違いと、キャッシュ済みの位置からの取り出しの時間を比較する
+
+使い方:
+    cd backend
+    python benchmarks/bench_no_guess.py --boards 20
+"""
+
+import sys
+import os
+import argparse
+import random
+import statistics
+import time
+
+# 親ディレクトリのminesweeperモジュールをインポートするための設定
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_manager import DIFFICULTY_PRESETS
+from no_guess import NoGuessGenerator
+from simulation import SOLVERS
+
+
+def percentile(values, ratio: float) -> float:
+    """分位点（最近傍）"""
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * ratio), len(ordered) - 1)]
+
+
+def reset_stats(generator: NoGuessGenerator):
+    """プロセスプールとキャッシュはそのままに、統計だけを0に戻す"""
+    generator.cache_hit_count = generator.found_count = generator.timeout_count = generator.candidate_count = 0
+    generator.search_time = 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="推測なしで解ける盤面の生成のベンチマーク")
+    parser.add_argument("--boards", type=int, default=20, help="難易度ごとに生成する盤面の数")
+    parser.add_argument("--solver", choices=list(SOLVERS), default="area", help="解けるかを調べるソルバー")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1],
+                        help="比較するワーカープロセス数")
+    args = parser.parse_args()
+
+    print(f"=== 推測なしの盤面の生成 ({args.boards}盤面ずつ, ソルバー {args.solver}) ===")
+    print(f"{'難易度':>6} {'ワーカー':>8} {'平均(ms)':>10} {'p90(ms)':>10} {'最大(ms)':>10} "
+          f"{'候補/盤面':>10} {'キャッシュ(ms)':>14}")
+
+    for name, (height, width, mine_count) in DIFFICULTY_PRESETS.items():
+        for workers in dict.fromkeys(args.workers):
+            rng = random.Random(0)
+            generator = NoGuessGenerator(args.solver, workers)
+            try:
+                # プロセスの起動は計測から除く
+                generator.find_seed(height, width, mine_count, 0, 0)
+                reset_stats(generator)
+
+                times = []
+                for _ in range(args.boards):
+                    row, col = rng.randrange(height), rng.randrange(width)
+                    start = time.perf_counter()
+                    generator.find_seed(height, width, mine_count, row, col, base_seed=rng.getrandbits(62))
+                    times.append((time.perf_counter() - start) * 1000)
+                stats = generator.get_stats()
+
+                # キャッシュに溜めておいた位置からの取り出し
+                generator.warm(height, width, mine_count, 0, 0, count=1)
+                start = time.perf_counter()
+                generator.find_seed(height, width, mine_count, 0, 0)
+                cached_ms = (time.perf_counter() - start) * 1000
+            finally:
+                generator.close()
+
+            candidates = stats["candidates"] / args.boards
+            print(f"{name:>6} {workers:>8} {statistics.mean(times):10.1f} {percentile(times, 0.9):10.1f} "
+                  f"{max(times):10.1f} {candidates:10.1f} {cached_ms:14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+地雷確率エンジンのベンチマーク
+上級の盤面を、確実な手がなくなるたびに地雷の確率が最も低いマスを推測で掘って最後まで進め、
+推測のための確率の計算1回あたりの時間と勝率を計測する
+
+使い方:
+    cd backend
+    python benchmarks/bench_probability.py --games 50
+"""
+
+import sys
+import os
+import argparse
+import random
+import time
+
+# 親ディレクトリのminesweeperモジュールをインポートするための設定
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from minesweeper import MinesweeperBoard, GameState
+from solver.solver_manager import SolverManager
+from solver.exact_solver import ExactSolver
+
+# 1回の計算時間の目標（ミリ秒）
+TARGET_MS = 50.0
+
+
+def timed(engine, latencies: list, inexact: list):
+    """analyze_viewの呼び出しごとの時間（秒）と、概算を含むかを記録するラッパー"""
+    func = engine.analyze_view
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        latencies.append(time.perf_counter() - start)
+        inexact.append(not result.exact)
+        return result
+    return wrapper
+
+
+def play_game(height: int, width: int, mines: int, seed: int, latencies: list, inexact: list) -> tuple:
+    """
+    1ゲームを推測ありで最後まで進める
+
+    Returns:
+        (勝ったか, 推測の回数)のタプル
+    """
+    random.seed(seed)
+    board = MinesweeperBoard(height, width, mines)
+    board.dig(height // 2, width // 2)
+
+    manager = SolverManager(ExactSolver(), allow_guess=True)
+    manager.probability_engine.analyze_view = timed(manager.probability_engine, latencies, inexact)
+    manager.solve_until_manual_needed(board)
+    return board.get_game_state() == GameState.WON, manager.guess_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="地雷確率エンジンのベンチマーク")
+    parser.add_argument("--games", type=int, default=50, help="ゲーム数")
+    args = parser.parse_args()
+    height, width, mines = 16, 30, 99
+
+    latencies = []
+    inexact = []
+    wins = 0
+    guesses = 0
+    start = time.perf_counter()
+    for seed in range(args.games):
+        won, guess_count = play_game(height, width, mines, seed, latencies, inexact)
+        wins += won
+        guesses += guess_count
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    mean_ms = sum(latencies) / len(latencies) * 1000
+    p99_ms = latencies[int(len(latencies) * 0.99)] * 1000
+    max_ms = latencies[-1] * 1000
+
+    print(f"=== 地雷確率エンジンのベンチマーク (上級 {height}x{width}, 地雷{mines}個, {args.games}ゲーム) ===")
+    print(f"確率の計算: {len(latencies)}回, 平均 {mean_ms:7.2f} ms, 99% {p99_ms:7.2f} ms, 最大 {max_ms:7.2f} ms"
+          f"（概算を含む {sum(inexact)}回）")
+    print(f"勝率 {wins / args.games:6.1%}, 1ゲームあたりの推測 {guesses / args.games:5.1f}回, "
+          f"1ゲームあたり {elapsed / args.games * 1000:8.2f} ms")
+    status = "OK" if p99_ms <= TARGET_MS else "NG"
+    print(f"99%の計算時間 {p99_ms:.2f} ms / 目標 {TARGET_MS:.0f} ms: {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+一括シミュレーションの並列化のベンチマーク
+同じゲームの組をワーカー数を変えて解き、1秒あたりのゲーム数と1ワーカーに対する速度向上を計測する
+
+使い方:
+    cd backend
+    python benchmarks/bench_simulation.py --games 400 --preset 中級
+"""
+
+import sys
+import os
+import argparse
+import time
+
+# 親ディレクトリのモジュールをインポートするための設定
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_manager import DIFFICULTY_PRESETS
+from simulation import run_simulation, summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description="一括シミュレーションの並列化のベンチマーク")
+    parser.add_argument("--games", type=int, default=400, help="ゲーム数")
+    parser.add_argument("--preset", choices=list(DIFFICULTY_PRESETS), default="中級", help="難易度")
+    args = parser.parse_args()
+
+    cpu_count = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cpu_count} & set(range(1, cpu_count + 1)))
+
+    print(f"=== 一括シミュレーションの並列化 ({args.preset}, {args.games}ゲーム, コア数{cpu_count}) ===")
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        stats = summarize(run_simulation([args.preset], args.games, workers=workers))
+        elapsed = time.perf_counter() - start
+        games_per_second = args.games / elapsed
+        baseline = baseline or games_per_second
+        print(f"ワーカー {workers:3d}: {games_per_second:8.1f} ゲーム/秒, 速度向上 {games_per_second / baseline:5.2f}倍, "
+              f"勝率 {stats[args.preset].win_rate:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+論理ソルバーの解ける割合のベンチマーク
+同じ盤面の組に対して、従来の2つの規則・AreaAnalyzerモード・完全列挙ソルバーで
+推測なしにどこまで解けるか（クリア率・発見率）と1盤面あたりの時間を比べる
+
+使い方:
+    cd backend
+    python benchmarks/bench_solve_rate.py --boards 100
+    python benchmarks/bench_solve_rate.py --boards 100 --presets 中級 上級
+"""
+
+import sys
+import os
+import argparse
+import random
+import time
+
+# 親ディレクトリのminesweeperモジュールをインポートするための設定
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from minesweeper import MinesweeperBoard, GameState, CellState
+from solver.solver_manager import SolverManager
+from solver.logical_solver import LogicalSolver
+from solver.exact_solver import ExactSolver
+
+DIFFICULTIES = {
+    "初級": (9, 9, 10),
+    "中級": (16, 16, 40),
+    "上級": (16, 30, 99),
+}
+
+SOLVERS = {
+    "従来の規則": LogicalSolver,
+    "エリア解析": lambda: LogicalSolver(use_area_analyzer=True),
+    "完全列挙": ExactSolver,
+}
+
+
+def play_board(height: int, width: int, mines: int, seed: int, solver_factory):
+    """
+    1盤面を中央から開けて、ソルバーで解けるところまで進める
+
+    Returns:
+        (ゲーム状態, 発見した安全なマスの割合)のタプル
+    """
+    random.seed(seed)
+    board = MinesweeperBoard(height, width, mines)
+    board.dig(height // 2, width // 2)
+
+    manager = SolverManager(solver_factory())
+    manager.solve_until_manual_needed(board)
+
+    revealed = sum(1 for row in board.cell_states for state in row if state == CellState.REVEALED)
+    return board.get_game_state(), revealed / (height * width - mines)
+
+
+def run(name: str, height: int, width: int, mines: int, boards: int, mode: str):
+    """boards個の盤面で計測して1行にまとめて表示"""
+    won = lost = 0
+    revealed_total = 0.0
+    start = time.perf_counter()
+    for seed in range(boards):
+        state, revealed = play_board(height, width, mines, seed, SOLVERS[mode])
+        won += state == GameState.WON
+        lost += state == GameState.LOST
+        revealed_total += revealed
+    elapsed = time.perf_counter() - start
+
+    print(f"{name} {mode:>6}: クリア率 {won / boards:6.1%}, 発見率 {revealed_total / boards:6.1%}, "
+          f"地雷を踏んだ盤面 {lost}, {elapsed / boards * 1000:8.2f} ms/盤面")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="論理ソルバーの解ける割合のベンチマーク")
+    parser.add_argument("--boards", type=int, default=100, help="難易度ごとの盤面数")
+    parser.add_argument("--presets", nargs="+", choices=list(DIFFICULTIES), default=list(DIFFICULTIES),
+                        help="計測する難易度")
+    args = parser.parse_args()
+
+    print(f"=== 論理ソルバーの解ける割合 ({args.boards}盤面ずつ, 推測なし) ===")
+    for name in args.presets:
+        height, width, mines = DIFFICULTIES[name]
+        for mode in SOLVERS:
+            run(name, height, width, mines, args.boards, mode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+ワーカー数ごとのスループット計測
+1〜Nワーカーでサーバーを順に起動し、同じ負荷（REST差分応答でのdig）をかけて毎秒の手数を比べる
+複数ワーカーのときはセッションを一時ディレクトリのSQLiteで共有する
+
+httpxは負荷をかけるクライアント側だけで使う開発用の依存で、requirements.txtには含めていない
+（websocketsはサーバーのWebSocketチャネルでも使うのでrequirements.txtに含まれている）
+
+使い方:
+    pip install httpx
+    cd backend
+    python benchmarks/bench_workers.py --max-workers 4 --games 64 --moves 100
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Tuple
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from bench_load import rest_player
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(workers: int, port: int, db_path: str) -> subprocess.Popen:
+    """指定したワーカー数でサーバーを起動"""
+    env = dict(os.environ, MINESWEEPER_WORKERS=str(workers), MINESWEEPER_SESSION_DB=db_path)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env)
+
+
+def wait_until_ready(base_url: str, timeout: float = 30.0):
+    """/healthが応答するまで待つ"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("サーバーが起動しませんでした")
+
+
+async def measure_throughput(base_url: str, games: int, moves: int) -> Tuple[float, Counter]:
+    """
+    gamesゲームを同時に進めたときの毎秒の手数
+
+    Returns:
+        (成功した手の毎秒の数, 競合・混雑で失敗した手の数)のタプル
+    """
+    errors = Counter()
+    limits = httpx.Limits(max_connections=games)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0, limits=limits) as client:
+        start = time.perf_counter()
+        results = await asyncio.gather(*[rest_player(client, moves, seed, delta=True, errors=errors)
+                                         for seed in range(games)])
+        elapsed = time.perf_counter() - start
+    return sum(len(latencies) for latencies in results) / elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ワーカー数ごとのスループット計測")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="最大ワーカー数")
+    parser.add_argument("--games", type=int, default=64, help="同時に進めるゲーム数")
+    parser.add_argument("--moves", type=int, default=100, help="1ゲームあたりの手数")
+    parser.add_argument("--port", type=int, default=8765, help="サーバーのポート")
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    print(f"=== ワーカー数ごとのスループット (同時{args.games}ゲーム x {args.moves}手, "
+          f"CPU {os.cpu_count()}コア) ===")
+
+    baseline = None
+    for workers in range(1, args.max_workers + 1):
+        with tempfile.TemporaryDirectory() as directory:
+            server = start_server(workers, args.port, os.path.join(directory, "sessions.db"))
+            try:
+                wait_until_ready(base_url)
+                throughput, errors = asyncio.run(measure_throughput(base_url, args.games, args.moves))
+            finally:
+                server.terminate()
+                server.wait()
+
+        baseline = baseline or throughput
+        print(f"{workers:2}ワーカー: {throughput:8.1f} 手/秒 (1ワーカー比 x{throughput / baseline:.2f}, "
+              f"競合 {errors['conflict']}, 混雑 {errors['busy']})")
+
+
+if __name__ == "__main__":
+    main()
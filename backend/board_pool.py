@@ -0,0 +1,130 @@
+"""
+地雷配置の事前生成プール
+よく使われる盤面サイズについて、地雷配置の乱数（除外しないマスの番号の非復元抽出）を前もって
+上限つきで溜めておき、最初の一手ではクリック位置の周囲3x3を飛ばして盤面に置くだけで済ませる
+"""
+
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Set, Tuple
+
+import numpy as np
+
+from compact_board import count_adjacent_mines
+from minesweeper import first_click_window, skip_excluded
+
+# 盤面サイズ (高さ, 幅, 地雷数)
+BoardSize = Tuple[int, int, int]
+
+# 地雷配置 (地雷のbool配列, 周囲の地雷数のuint8配列)
+MineLayout = Tuple[np.ndarray, np.ndarray]
+
+
+def window_sizes(height: int, width: int) -> Set[int]:
+    """盤面で最初のクリック位置の周囲3x3（端で切り詰める）が取りうるマス数（角・辺・内側）"""
+    return {min(row + 2, height) * min(col + 2, width) for row in (0, min(1, height - 1))
+            for col in (0, min(1, width - 1))}
+
+
+class BoardPool:
+    """盤面サイズごとの、最初の一手の前の地雷配置の乱数のプール
+
+    周囲3x3のマス数（角4・辺6・内側9）ごとに「除外しないマスに0から振った番号から地雷数個を
+    一様に非復元抽出したもの」を溜めておく。この抽出はクリック位置によらないので、取り出すときに
+    generate_mine_indicesと同じずらし方で周囲3x3を飛ばして盤面の通し番号にすれば、
+    「周囲3x3を除いて一様に選んだ配置」そのものになり、クリック位置のせいで捨てる抽出もない。
+    周囲の地雷数はクリック位置が決まってから計算する。
+
+    生成（refill）は要求処理の外（別スレッドなど）で呼ぶ前提で、取り出しとはロックで排他する
+    """
+
+    def __init__(self, sizes: Iterable[BoardSize], capacity: int = 32):
+        """
+        Args:
+            sizes: プールする盤面サイズ
+            capacity: 盤面サイズと周囲3x3のマス数ごとに溜めておく抽出の最大数
+        """
+        if capacity < 1:
+            raise ValueError("capacity は1以上にしてください")
+
+        self.capacity = capacity
+        # 盤面サイズ → 周囲3x3のマス数 → 抽出のキュー（地雷数が多すぎて置けない周囲の大きさは除く）
+        self._pools: Dict[BoardSize, Dict[int, Deque[np.ndarray]]] = {
+            (height, width, mine_count): {window: deque() for window in sorted(window_sizes(height, width))
+                                          if mine_count <= height * width - window}
+            for height, width, mine_count in sizes
+        }
+        self._lock = threading.Lock()
+        self._rng = np.random.default_rng()
+
+        self.hit_count = 0        # プールの抽出を使えた数
+        self.miss_count = 0       # プールが空だった数
+        self.unpooled_count = 0   # プールしていない盤面サイズの要求数
+        self.generated_count = 0  # 生成した抽出の数
+
+    def has_size(self, height: int, width: int, mine_count: int) -> bool:
+        """盤面サイズをプールしているか"""
+        return (height, width, mine_count) in self._pools
+
+    def take(self, height: int, width: int, mine_count: int, row: int, col: int) -> Optional[MineLayout]:
+        """
+        クリック位置(row, col)の周囲3x3に地雷がない配置を作る
+
+        Returns:
+            (地雷のbool配列, 周囲の地雷数のuint8配列)のタプル、使える抽出がなければNone
+        """
+        pools = self._pools.get((height, width, mine_count))
+        if pools is None:
+            self.unpooled_count += 1
+            return None
+
+        excluded = first_click_window(height, width, row, col)
+        pool = pools.get(excluded.size)
+        with self._lock:
+            if not pool:
+                self.miss_count += 1
+                return None
+            samples = pool.popleft()
+            self.hit_count += 1
+
+        mines = np.zeros(height * width, dtype=np.bool_)
+        mines[skip_excluded(samples, excluded)] = True
+        mines = mines.reshape(height, width)
+        return mines, count_adjacent_mines(mines)
+
+    def needs_refill(self) -> bool:
+        """上限まで溜まっていないプールがあるか"""
+        return any(len(pool) < self.capacity for pools in self._pools.values() for pool in pools.values())
+
+    def refill(self) -> int:
+        """
+        全てのプールを上限まで生成する（要求処理の外で呼ぶ）
+
+        Returns:
+            生成した抽出の数
+        """
+        generated = 0
+        for (height, width, mine_count), pools in self._pools.items():
+            for window, pool in pools.items():
+                while len(pool) < self.capacity:
+                    samples = self._rng.choice(height * width - window, size=mine_count, replace=False,
+                                               shuffle=False)
+                    with self._lock:
+                        pool.append(samples)
+                    generated += 1
+        self.generated_count += generated
+        return generated
+
+    def get_stats(self) -> dict:
+        """プールの統計情報を取得"""
+        requests = self.hit_count + self.miss_count
+        return {
+            "pooled": {f"{height}x{width}/{mines}": {str(window): len(pool) for window, pool in pools.items()}
+                       for (height, width, mines), pools in self._pools.items()},
+            "capacity": self.capacity,
+            "hits": self.hit_count,
+            "misses": self.miss_count,
+            "hit_rate": self.hit_count / requests if requests else None,
+            "unpooled_sizes": self.unpooled_count,
+            "generated": self.generated_count
+        }
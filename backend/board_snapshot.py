@@ -0,0 +1,135 @@
+"""
+盤面のバイナリスナップショット
+地雷配置・セル状態・初手フラグなどを詰めたバイト列と盤面を相互変換する
+
+形式（リトルエンディアン）:
+    ヘッダ  : マジック"LMSB", 形式バージョン, 高さ, 幅, 地雷数, フラグ, ゲーム状態, 盤面の版番号,
+              地雷配置のシード（形式バージョン2から、シードなしなら0）
+    地雷    : 1マス1ビット（np.packbits）
+    セル状態: 1マス2ビット（4マスで1バイト）
+周囲の地雷数は地雷配置から復元時に計算し直すので保存しない
+"""
+
+import struct
+
+import numpy as np
+
+from minesweeper import MinesweeperBoard, CellState, GameState
+from compact_board import CompactMinesweeperBoard
+
+MAGIC = b"LMSB"
+FORMAT_VERSION = 2
+
+_HEADERS = {
+    1: struct.Struct("<4sBHHIBBI"),
+    2: struct.Struct("<4sBHHIBBIq"),
+}
+_HEADER = _HEADERS[FORMAT_VERSION]
+
+# フラグのビット
+_FLAG_FIRST_CLICK = 0x01         # まだ最初の一手を打っていない
+_FLAG_COMPACT = 0x02             # CompactMinesweeperBoardで復元する
+_FLAG_LABEL_ZERO_REGIONS = 0x04  # 0の領域のラベル付けを有効にする
+_FLAG_SEED = 0x08                # 地雷配置のシードがある（最初の一手の前に復元しても同じ盤面になる）
+_FLAG_NO_GUESS = 0x10            # 推測なしで解ける盤面にする
+
+_CELL_STATES = tuple(CellState)
+
+
+def _board_arrays(board: MinesweeperBoard):
+    """盤面から (地雷のbool配列, 状態のuint8配列) を取り出す"""
+    if isinstance(board, CompactMinesweeperBoard):
+        return board._mines, board._states
+
+    mines = np.array(board.mines, dtype=np.bool_)
+    states = np.array([[state.value for state in row] for row in board.cell_states], dtype=np.uint8)
+    return mines, states
+
+
+def encode_board(board: MinesweeperBoard) -> bytes:
+    """盤面をスナップショットのバイト列に変換"""
+    flags = 0
+    if board.first_click:
+        flags |= _FLAG_FIRST_CLICK
+    if isinstance(board, CompactMinesweeperBoard):
+        flags |= _FLAG_COMPACT
+        if board.label_zero_regions:
+            flags |= _FLAG_LABEL_ZERO_REGIONS
+    if board.seed is not None:
+        flags |= _FLAG_SEED
+    if board.no_guess:
+        flags |= _FLAG_NO_GUESS
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, board.height, board.width, board.mine_count,
+                          flags, board.game_state.value, board.version, board.seed or 0)
+
+    mines, states = _board_arrays(board)
+    packed_mines = np.packbits(mines.ravel())
+
+    # 2ビットずつ4マス分を1バイトに詰める
+    flat_states = states.ravel()
+    padded = np.zeros(-(-flat_states.size // 4) * 4, dtype=np.uint8)
+    padded[:flat_states.size] = flat_states
+    packed_states = padded[0::4] | (padded[1::4] << 2) | (padded[2::4] << 4) | (padded[3::4] << 6)
+
+    return header + packed_mines.tobytes() + packed_states.tobytes()
+
+
+def snapshot_version(data: bytes) -> int:
+    """スナップショットを復元せずに盤面の版番号だけを読む"""
+    return _header(data).unpack_from(data)[7]
+
+
+def _header(data: bytes) -> struct.Struct:
+    """スナップショットの形式バージョンに対応するヘッダの形式を取得"""
+    if len(data) < 5:
+        raise ValueError("スナップショットが短すぎます")
+    if data[:4] != MAGIC:
+        raise ValueError("スナップショットの形式が不正です")
+    if data[4] not in _HEADERS:
+        raise ValueError(f"未対応のスナップショット形式です: {data[4]}")
+    return _HEADERS[data[4]]
+
+
+def decode_board(data: bytes) -> MinesweeperBoard:
+    """スナップショットのバイト列から盤面を復元"""
+    header = _header(data)
+    if len(data) < header.size:
+        raise ValueError("スナップショットが短すぎます")
+
+    magic, format_version, height, width, mine_count, flags, game_state, version, *rest = \
+        header.unpack_from(data)
+    seed = rest[0] if flags & _FLAG_SEED else None
+
+    cell_count = height * width
+    mines_size = -(-cell_count // 8)
+    states_size = -(-cell_count // 4)
+    if len(data) != header.size + mines_size + states_size:
+        raise ValueError("スナップショットのサイズが盤面と一致しません")
+
+    offset = header.size
+    mines = np.unpackbits(np.frombuffer(data, dtype=np.uint8, count=mines_size, offset=offset),
+                          count=cell_count).astype(np.bool_).reshape(height, width)
+    offset += mines_size
+    packed_states = np.frombuffer(data, dtype=np.uint8, count=states_size, offset=offset)
+    states = np.stack([(packed_states >> shift) & 0b11 for shift in (0, 2, 4, 6)], axis=1)
+    states = states.ravel()[:cell_count].reshape(height, width)
+
+    if flags & _FLAG_COMPACT:
+        board = CompactMinesweeperBoard(height, width, mine_count,
+                                        label_zero_regions=bool(flags & _FLAG_LABEL_ZERO_REGIONS), seed=seed,
+                                        no_guess=bool(flags & _FLAG_NO_GUESS))
+        board._mines[...] = mines
+        board._states[...] = states
+    else:
+        board = MinesweeperBoard(height, width, mine_count, seed, bool(flags & _FLAG_NO_GUESS))
+        board.mines = mines.tolist()
+        board.cell_states = [[_CELL_STATES[value] for value in row] for row in states.tolist()]
+
+    board.first_click = bool(flags & _FLAG_FIRST_CLICK)
+    if not board.first_click:
+        board._calculate_mine_numbers()
+    board._hidden_safe_count, board._flag_count = board._scan_counters()
+    board.game_state = GameState(game_state)
+    board.version = version
+    return board
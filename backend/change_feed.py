@@ -0,0 +1,108 @@
+"""
+マスの状態変化の配信
+盤面（やソルバービュー）が変化を追記し、購読者はそれぞれ前回読んだ位置以降だけを受け取る
+"""
+
+from typing import Dict, Generic, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class ChangeFeed(Generic[T]):
+    """購読者ごとの読み取り位置つきの変化記録
+
+    - 購読者がいない間は何も記録しない
+    - 全購読者が読み終えた分は捨てるので、記録は最も遅い購読者の未読分だけになる
+    - 未読分が max_entries を超えたら古いものから捨て、取りこぼした購読者の read は
+      None を返す（購読者は全体を読み直して追いつく）
+    """
+
+    def __init__(self, max_entries: int = 100_000):
+        """
+        Args:
+            max_entries: 保持する未読の変化の最大数
+        """
+        self.max_entries = max_entries
+        self._entries: List[T] = []
+        self._start = 0  # _entries[0] の通し番号
+        self._cursors: Dict[int, int] = {}  # 購読者ID → 次に読む通し番号
+        self._next_subscriber_id = 0
+
+    @property
+    def end(self) -> int:
+        """次に追記される変化の通し番号"""
+        return self._start + len(self._entries)
+
+    def append(self, change: T):
+        """変化を1件追記"""
+        if not self._cursors:
+            return
+        self._entries.append(change)
+        self._enforce_limit()
+
+    def extend(self, changes: Iterable[T]):
+        """変化をまとめて追記"""
+        if not self._cursors:
+            return
+        self._entries.extend(changes)
+        self._enforce_limit()
+
+    def subscribe(self) -> int:
+        """
+        購読を開始（これ以降に追記された変化から読める）
+
+        Returns:
+            購読者ID
+        """
+        subscriber_id = self._next_subscriber_id
+        self._next_subscriber_id += 1
+        self._cursors[subscriber_id] = self.end
+        return subscriber_id
+
+    def unsubscribe(self, subscriber_id: int):
+        """購読をやめる"""
+        self._cursors.pop(subscriber_id, None)
+        self._trim()
+
+    def read(self, subscriber_id: int) -> Optional[List[T]]:
+        """
+        前回読んだ位置以降の変化を取得
+
+        Returns:
+            変化のリスト、取りこぼしがあった場合はNone（どちらの場合も位置は末尾に進む）
+        """
+        cursor = self._cursors[subscriber_id]
+        self._cursors[subscriber_id] = self.end
+        if cursor < self._start:
+            self._trim()
+            return None
+
+        changes = self._entries[cursor - self._start:]
+        self._trim()
+        return changes
+
+    def invalidate(self):
+        """記録を捨て、全購読者の次のreadを取りこぼし扱いにする（盤面を丸ごと差し替えたとき用）"""
+        self._start = self.end
+        self._entries = []
+        for subscriber_id in self._cursors:
+            self._cursors[subscriber_id] = -1
+
+    def pending_count(self) -> int:
+        """保持している未読の変化の数"""
+        return len(self._entries)
+
+    def _trim(self):
+        """全購読者が読み終えた分を捨てる"""
+        oldest = min(self._cursors.values(), default=self.end)
+        drop = min(oldest, self.end) - self._start
+        if drop > 0:
+            del self._entries[:drop]
+            self._start += drop
+
+    def _enforce_limit(self):
+        """上限を超えた古い変化を捨てる"""
+        overflow = len(self._entries) - self.max_entries
+        if overflow > 0:
+            del self._entries[:overflow]
+            self._start += overflow
@@ -0,0 +1,421 @@
+"""
+省メモリ版マインスイーパー盤面
+NumPyのuint8配列で盤面を保持し、盤面全体のスキャンをベクトル演算で行う
+"""
+
+from typing import Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from minesweeper import MinesweeperBoard, CellState, GameState
+
+# uint8の値 → CellState の逆引き表（CellStateの値は0始まりの連番）
+_CELL_STATES = tuple(CellState)
+
+_HIDDEN = CellState.HIDDEN.value
+_REVEALED = CellState.REVEALED.value
+_FLAGGED = CellState.FLAGGED.value
+
+
+def count_adjacent_mines(mines: np.ndarray) -> np.ndarray:
+    """地雷マスクから各マスの周囲8マスの地雷数を一括計算
+
+    周囲を0で1マス分パディングした配列を8方向にずらして足し合わせるので、
+    マスごとの近傍リスト作成なしに1パスで全マスの数字が求まる。
+    地雷マス自身の値は0とする（MinesweeperBoard._calculate_mine_numbersと同じ）
+
+    Args:
+        mines: 地雷位置のbool配列 (height, width)
+
+    Returns:
+        周囲の地雷数のuint8配列 (height, width)
+    """
+    height, width = mines.shape
+    padded = np.zeros((height + 2, width + 2), dtype=np.uint8)
+    padded[1:-1, 1:-1] = mines
+
+    counts = np.zeros((height, width), dtype=np.uint8)
+    for dr in (0, 1, 2):
+        for dc in (0, 1, 2):
+            if dr == 1 and dc == 1:
+                continue
+            counts += padded[dr:dr + height, dc:dc + width]
+
+    counts[mines] = 0
+    return counts
+
+
+def label_zero_regions(zero_mask: np.ndarray) -> np.ndarray:
+    """周囲の地雷数が0のマスを8近傍の連結成分ごとにラベル付け
+
+    各マスのラベルを「同じ成分内の最小の一次元インデックス」に収束させる。
+    近傍の最小値を取る伝播と、ラベルが指すマスのラベルを辿るポインタジャンプを
+    交互に繰り返すので、細長い領域でも少ない反復回数で収束する。
+
+    Args:
+        zero_mask: 周囲の地雷数が0の（かつ地雷でない）マスのbool配列
+
+    Returns:
+        int64のラベル配列。0のマスでないところは -1
+    """
+    height, width = zero_mask.shape
+    cell_count = height * width
+    no_label = cell_count  # 最小値を取るときに選ばれない番兵値
+
+    flat_zero = zero_mask.ravel()
+    labels = np.where(flat_zero, np.arange(cell_count), no_label)
+
+    padded = np.full((height + 2, width + 2), no_label, dtype=np.int64)
+    while True:
+        padded[1:-1, 1:-1] = labels.reshape(height, width)
+        propagated = labels.reshape(height, width).copy()
+        for dr in (0, 1, 2):
+            for dc in (0, 1, 2):
+                np.minimum(propagated, padded[dr:dr + height, dc:dc + width], out=propagated)
+        propagated = np.where(flat_zero, propagated.ravel(), no_label)
+
+        # ポインタジャンプ: ラベルが指すマスのラベルの方が小さければそちらを採用
+        labelled = propagated < no_label
+        propagated[labelled] = propagated[propagated[labelled]]
+
+        if np.array_equal(propagated, labels):
+            break
+        labels = propagated
+
+    labels[~flat_zero] = -1
+    return labels.reshape(height, width)
+
+
+class CellStateRow:
+    """状態配列の1行をCellStateのリストのように見せるビュー"""
+
+    __slots__ = ('_row',)
+
+    def __init__(self, row: np.ndarray):
+        self._row = row
+
+    def __getitem__(self, col: Union[int, slice]) -> Union[CellState, List[CellState]]:
+        if isinstance(col, slice):
+            return [_CELL_STATES[value] for value in self._row[col].tolist()]
+        return _CELL_STATES[self._row[col]]
+
+    def __setitem__(self, col: int, state: CellState):
+        self._row[col] = state.value
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    def __iter__(self) -> Iterator[CellState]:
+        return (_CELL_STATES[value] for value in self._row.tolist())
+
+
+class CellStateGrid:
+    """uint8の状態配列を cell_states[row][col] 形式で読み書きできるようにするビュー
+
+    既存コード（SolverBoardViewやCLI）は List[List[CellState]] を前提にしているので、
+    実データを複製せずに同じ書き方でアクセスできるようにしておく
+    """
+
+    __slots__ = ('_states',)
+
+    def __init__(self, states: np.ndarray):
+        self._states = states
+
+    def __getitem__(self, row: int) -> CellStateRow:
+        return CellStateRow(self._states[row])
+
+    def __len__(self) -> int:
+        return self._states.shape[0]
+
+    def __iter__(self) -> Iterator[CellStateRow]:
+        return (CellStateRow(row) for row in self._states)
+
+
+class CompactMinesweeperBoard(MinesweeperBoard):
+    """uint8配列で盤面を保持するマインスイーパー盤面
+
+    1マスあたり 地雷1バイト + 状態1バイト + 周囲の地雷数1バイト の計3バイトで済み、
+    全体スキャン（カウンタの検証など）はベクトル演算で行う。
+    公開メソッド（dig, toggle_flag, get_cell_info, get_board_data）の挙動は
+    MinesweeperBoardと同じ。
+
+    label_zero_regions=True にすると、地雷生成時に0の領域を連結成分として一度だけラベル付けし、
+    0のマスを掘ったときの展開を事前計算した範囲の一括更新で済ませる
+    （ラベル分の配列が1マスあたり約4バイト増える）。
+    """
+
+    def __init__(self, height: int, width: int, mine_count: int, label_zero_regions: bool = False,
+                 seed: Optional[int] = None, no_guess: bool = False):
+        """
+        盤面を初期化
+
+        Args:
+            height: 盤面の高さ
+            width: 盤面の幅
+            mine_count: 地雷の数
+            label_zero_regions: 0の領域を事前にラベル付けして展開を一括で行うか
+            seed: 地雷配置の乱数のシード
+            no_guess: 推測なしで解ける盤面にするか
+        """
+        self.label_zero_regions = label_zero_regions
+        # 0の領域の事前計算結果（地雷生成時に作成）
+        self._region_ids: Optional[np.ndarray] = None       # マス → 領域番号（0のマス以外は-1）
+        self._region_zero_offsets: Optional[np.ndarray] = None
+        self._region_zero_cells: Optional[np.ndarray] = None  # 領域内の0のマス
+        self._region_open_offsets: Optional[np.ndarray] = None
+        self._region_open_cells: Optional[np.ndarray] = None  # 展開で開くマス（0のマス+その周囲）
+        super().__init__(height, width, mine_count, seed, no_guess)
+
+    def _init_storage(self):
+        """盤面データをuint8配列として確保"""
+        shape = (self.height, self.width)
+        self._mines = np.zeros(shape, dtype=np.bool_)
+        self._states = np.zeros(shape, dtype=np.uint8)  # CellStateの値を格納
+        self._numbers = np.zeros(shape, dtype=np.uint8)
+        self._cell_state_grid = CellStateGrid(self._states)
+
+    @property
+    def mines(self) -> np.ndarray:
+        """地雷配置（mines[row][col] で参照可能）"""
+        return self._mines
+
+    @property
+    def mine_numbers(self) -> np.ndarray:
+        """周囲の地雷数（mine_numbers[row][col] で参照可能）"""
+        return self._numbers
+
+    @property
+    def cell_states(self) -> CellStateGrid:
+        """セル状態（cell_states[row][col] でCellStateを読み書き可能）"""
+        return self._cell_state_grid
+
+    def _is_hidden(self, row: int, col: int) -> bool:
+        """未発見のマスか（cell_statesのビューを通さずに配列を読む）"""
+        return self._states[row, col] == _HIDDEN
+
+    def _is_mine(self, row: int, col: int) -> bool:
+        """地雷のマスか"""
+        return bool(self._mines[row, col])
+
+    def get_storage_bytes(self) -> int:
+        """盤面データが使用している配列のバイト数"""
+        return self._mines.nbytes + self._states.nbytes + self._numbers.nbytes
+
+    def _place_mines(self, indices: np.ndarray):
+        """地雷のマスの通し番号の配列を、地雷配置の配列に一度に書き込む"""
+        self._mines.reshape(-1)[indices] = True
+
+    def _set_mine_numbers(self, mine_numbers: np.ndarray):
+        """計算済みの周囲の地雷数を配列に書き込む"""
+        self._numbers[...] = mine_numbers
+
+        if self.label_zero_regions:
+            self._build_zero_regions()
+
+    def _calculate_mine_numbers(self):
+        """各マスの周囲の地雷数をまとめて計算（ベクトル演算版）"""
+        self._numbers[...] = count_adjacent_mines(self._mines)
+
+        if self.label_zero_regions:
+            self._build_zero_regions()
+
+    def _build_zero_regions(self):
+        """0の領域ごとに「領域内の0のマス」と「展開で開くマス」をCSR形式で事前計算"""
+        height, width = self.height, self.width
+        cell_count = height * width
+
+        labels = label_zero_regions((self._numbers == 0) & ~self._mines).ravel()
+        zero_cells = np.flatnonzero(labels >= 0)
+
+        # ラベル（領域内の最小インデックス）を0始まりの領域番号に振り直す
+        is_representative = labels == np.arange(cell_count)
+        region_count = int(np.count_nonzero(is_representative))
+        rank = np.cumsum(is_representative) - 1
+        region_ids = np.full(cell_count, -1, dtype=np.int32)
+        region_ids[zero_cells] = rank[labels[zero_cells]]
+        self._region_ids = region_ids.reshape(height, width)
+
+        # 領域内の0のマス（zero_cellsは昇順なので安定ソートで領域ごとにまとまる）
+        region_of_zero = region_ids[zero_cells]
+        order = np.argsort(region_of_zero, kind='stable')
+        self._region_zero_cells = zero_cells[order].astype(np.int32)
+        self._region_zero_offsets = self._offsets_from_counts(
+            np.bincount(region_of_zero, minlength=region_count))
+
+        # 展開で開くマス = 0のマスとその8近傍
+        # 各マスについて自身と8近傍の領域番号を並べ、重複を除いた (マス, 領域番号) の組を作る
+        padded = np.full((height + 2, width + 2), -1, dtype=np.int32)
+        padded[1:-1, 1:-1] = self._region_ids
+        around = np.stack([padded[dr:dr + height, dc:dc + width].ravel()
+                           for dr in (0, 1, 2) for dc in (0, 1, 2)], axis=1)
+        around.sort(axis=1)
+        distinct = around >= 0
+        distinct[:, 1:] &= around[:, 1:] != around[:, :-1]
+        open_cells, column = np.nonzero(distinct)
+        open_regions = around[open_cells, column]
+
+        order = np.argsort(open_regions, kind='stable')
+        self._region_open_cells = open_cells[order].astype(np.int32)
+        self._region_open_offsets = self._offsets_from_counts(
+            np.bincount(open_regions, minlength=region_count))
+
+    @staticmethod
+    def _offsets_from_counts(counts: np.ndarray) -> np.ndarray:
+        """領域ごとの要素数からCSR形式のオフセット配列を作成"""
+        offsets = np.zeros(len(counts) + 1, dtype=np.int32)
+        np.cumsum(counts, out=offsets[1:])
+        return offsets
+
+    def _reveal_cell(self, row: int, col: int) -> List[Tuple[int, int]]:
+        """
+        マスを発見状態にし、周囲の0のマスも展開する
+        0の領域が事前計算済みなら一括で開き、そうでなければスタックで展開する
+
+        Returns:
+            List[Tuple[int, int]]: 新たに発見状態になったマスの座標リスト
+        """
+        if self._states[row, col] != _HIDDEN or self._mines[row, col]:
+            return []
+
+        # 数字のマス（ほとんどの手）はそのマスだけを開く
+        if self._numbers[row, col] != 0:
+            self._states[row, col] = _REVEALED
+            self._hidden_safe_count -= 1
+            return [(row, col)]
+
+        if self._region_ids is not None:
+            region_id = int(self._region_ids[row, col])
+            if region_id >= 0:
+                revealed = self._reveal_zero_region(region_id)
+                if revealed is not None:
+                    return revealed
+
+        return self._reveal_by_stack(row * self.width + col)
+
+    def _reveal_by_stack(self, index: int) -> List[Tuple[int, int]]:
+        """
+        一次元インデックスindexのマスから、近傍テーブルのCSR形式を辿ってスタックで展開する
+
+        マスごとの読み書きはmemoryview経由で行い、NumPyスカラーやcell_statesのビューを作らない
+
+        Returns:
+            新たに発見状態になったマスの座標リスト
+        """
+        states = memoryview(self._states).cast('B')
+        mines = memoryview(self._mines).cast('B')
+        numbers = memoryview(self._numbers).cast('B')
+        if states[index] != _HIDDEN or mines[index]:
+            return []
+
+        offsets, indices = self._neighbor_table.offsets, self._neighbor_table.indices
+        states[index] = _REVEALED
+        revealed = [index]
+        stack = [index] if numbers[index] == 0 else []
+        while stack:
+            current = stack.pop()
+            for neighbor in indices[offsets[current]:offsets[current + 1]]:
+                if states[neighbor] != _HIDDEN or mines[neighbor]:
+                    continue
+                states[neighbor] = _REVEALED
+                revealed.append(neighbor)
+                if numbers[neighbor] == 0:
+                    stack.append(neighbor)
+
+        self._hidden_safe_count -= len(revealed)
+        width = self.width
+        return [divmod(cell, width) for cell in revealed]
+
+    def _reveal_zero_region(self, region_id: int) -> Optional[List[Tuple[int, int]]]:
+        """
+        事前計算した0の領域を一括で開く
+
+        領域内の0のマスに発見済み・フラグ付きのものがあると、
+        スタック展開とは開く範囲が変わりうるのでNoneを返して通常の展開に任せる
+
+        Returns:
+            新たに発見状態になったマスの座標リスト、一括で開けない場合はNone
+        """
+        flat_states = self._states.reshape(-1)
+
+        zero_cells = self._region_zero_cells[
+            self._region_zero_offsets[region_id]:self._region_zero_offsets[region_id + 1]]
+        if np.any(flat_states[zero_cells] != _HIDDEN):
+            return None
+
+        open_cells = self._region_open_cells[
+            self._region_open_offsets[region_id]:self._region_open_offsets[region_id + 1]]
+        newly_revealed = open_cells[flat_states[open_cells] == _HIDDEN]
+        flat_states[newly_revealed] = _REVEALED
+        self._hidden_safe_count -= len(newly_revealed)
+
+        rows, cols = np.divmod(newly_revealed, self.width)
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    def toggle_flag(self, row: int, col: int):
+        """フラグを切り替え（MinesweeperBoard.toggle_flagと同じ挙動で、配列を直接読み書きする）"""
+        if not self._is_valid_position(row, col):
+            raise ValueError("指定された位置が盤面外です")
+
+        if self.game_state != GameState.PLAYING:
+            return
+
+        state = self._states[row, col]
+        if state == _HIDDEN:
+            new_state, flag_delta = CellState.FLAGGED, 1
+        elif state == _FLAGGED:
+            new_state, flag_delta = CellState.HIDDEN, -1
+        else:
+            new_state = None
+
+        if new_state is not None:
+            self._states[row, col] = new_state.value
+            self._flag_count += flag_delta
+            # フラグ付きの安全なマスは「未発見の安全なマス」に数えない（勝利判定と同じ基準）
+            if not self._mines[row, col]:
+                self._hidden_safe_count -= flag_delta
+            self.version += 1
+            self.change_feed.append((row, col, new_state))
+
+        if self.consistency_check:
+            self.verify_counters()
+
+    def _scan_counters(self) -> Tuple[int, int]:
+        """盤面全体を走査してカウンタの値を求める（ベクトル演算版）"""
+        hidden_safe_count = int(np.count_nonzero((self._states == _HIDDEN) & ~self._mines))
+        flag_count = int(np.count_nonzero(self._states == _FLAGGED))
+        return hidden_safe_count, flag_count
+
+    def get_cell_info(self, row: int, col: int) -> dict:
+        """指定された位置のセル情報を辞書形式で取得（API用）"""
+        if not self._is_valid_position(row, col):
+            return None
+
+        state = int(self._states[row, col])
+        return {
+            'state': _CELL_STATES[state],
+            'is_mine': bool(self._mines[row, col]),
+            'mine_number': int(self._numbers[row, col]),
+            'is_revealed': state == _REVEALED,
+            'is_flagged': state == _FLAGGED,
+            'is_hidden': state == _HIDDEN
+        }
+
+    def get_board_data(self) -> List[List[dict]]:
+        """全盤面のセル情報を2次元リストで取得（API用）"""
+        # 要素ごとのNumPyスカラー参照を避けるため、行単位でPythonのリストに変換してから組み立てる
+        board_data = []
+        for state_row, mine_row, number_row in zip(self._states.tolist(),
+                                                   self._mines.tolist(),
+                                                   self._numbers.tolist()):
+            board_data.append([
+                {
+                    'state': _CELL_STATES[state],
+                    'is_mine': is_mine,
+                    'mine_number': number,
+                    'is_revealed': state == _REVEALED,
+                    'is_flagged': state == _FLAGGED,
+                    'is_hidden': state == _HIDDEN
+                }
+                for state, is_mine, number in zip(state_row, mine_row, number_row)
+            ])
+        return board_data
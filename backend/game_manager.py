@@ -1,10 +1,18 @@
 from minesweeper import MinesweeperBoard, GameState, CellState
+from compact_board import CompactMinesweeperBoard
 import sys
 
+# 難易度のプリセット: 名前→(高さ, 幅, 地雷数)
+DIFFICULTY_PRESETS = {
+    "初級": (9, 9, 10),
+    "中級": (16, 16, 40),
+    "上級": (20, 24, 99),
+}
+
 class MinesweeperGame:
     """マインスイーパーゲームマネージャー"""
 
-    def __init__(self, height: int = 9, width: int = 9, mine_count: int = 10):
+    def __init__(self, height: int = 9, width: int = 9, mine_count: int = 10, compact: bool = False):
         """
         ゲームマネージャーを初期化
 
@@ -12,8 +20,10 @@ class MinesweeperGame:
             height: 盤面の高さ
             width: 盤面の幅
             mine_count: 地雷の数
+            compact: 盤面をNumPy配列で持つ省メモリ版（CompactMinesweeperBoard）にするか
         """
-        self.board = MinesweeperBoard(height, width, mine_count)
+        board_class = CompactMinesweeperBoard if compact else MinesweeperBoard
+        self.board = board_class(height, width, mine_count)
         self.turn_count = 0
 
     def get_cell_display(self, row: int, col: int, show_mines: bool = False) -> str:
@@ -243,21 +253,17 @@ def select_difficulty():
     """難易度選択"""
     print("=== マインスイーパー設定 ===\n")
     print("難易度を選択してください:")
-    print("1. 初級 (9x9, 地雷10個)")
-    print("2. 中級 (16x16, 地雷40個)")
-    print("3. 上級 (24x20, 地雷99個)")
+    presets = list(DIFFICULTY_PRESETS.items())
+    for number, (name, (height, width, mine_count)) in enumerate(presets, 1):
+        print(f"{number}. {name} ({width}x{height}, 地雷{mine_count}個)")
     print("4. カスタム")
 
     while True:
         try:
             choice = input("選択 (1-4): ").strip()
 
-            if choice == '1':
-                return 9, 9, 10
-            elif choice == '2':
-                return 16, 16, 40
-            elif choice == '3':
-                return 20, 24, 99
+            if choice in ('1', '2', '3'):
+                return presets[int(choice) - 1][1]
             elif choice == '4':
                 print("\n=== カスタム設定 ===")
                 height = int(input("高さ (5-50): "))
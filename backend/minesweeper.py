@@ -1,6 +1,11 @@
 ﻿import random
 from enum import Enum
-from typing import List, Tuple, Set
+from typing import List, Optional, Tuple, Set
+
+import numpy as np
+
+from neighbor_table import get_neighbor_table
+from change_feed import ChangeFeed
 
 class CellState(Enum):
     """マスの状態を表す列挙型"""
@@ -14,10 +19,91 @@ class GameState(Enum):
     WON = 1         # 勝利
     LOST = 2        # 敗北
 
+# マスの状態変化 (row, col, 新しい状態)
+CellChange = Tuple[int, int, CellState]
+
+def generate_mine_indices(height: int, width: int, mine_count: int,
+                          first_click_row: int, first_click_col: int,
+                          seed: Optional[int] = None) -> np.ndarray:
+    """
+    地雷の位置をランダムに決める（最初の一手の周囲3x3以外）
+
+    除外しないマスに0から振った番号を非復元抽出し、除外するマス（最大9個、番号順）を
+    飛ばすように盤面の通し番号（row * width + col）へずらす。
+    マスごとの座標のリストは作らないので、手間とメモリは地雷数にほぼ比例する
+
+    seedを指定すると結果は(高さ, 幅, 地雷数, 最初の一手, シード)だけで決まるので、
+    同じ盤面を何度でも作り直せる。Noneならrandomモジュールの共有の乱数からシードを取る
+    （random.seedで再現できる）
+
+    Args:
+        height: 盤面の高さ
+        width: 盤面の幅
+        mine_count: 地雷の数
+        first_click_row: 最初にクリックした行
+        first_click_col: 最初にクリックした列
+        seed: 乱数のシード
+
+    Returns:
+        地雷のマスの通し番号の配列（順不同）
+    """
+    rng = np.random.default_rng(seed if seed is not None else random.getrandbits(64))
+    excluded = first_click_window(height, width, first_click_row, first_click_col)
+
+    # 地雷数が多すぎたらダメだ
+    available_count = height * width - excluded.size
+    if mine_count > available_count:
+        raise ValueError("地雷数が多すぎます")
+
+    samples = rng.choice(available_count, size=mine_count, replace=False, shuffle=False)
+    return skip_excluded(samples, excluded)
+
+
+def first_click_window(height: int, width: int, first_click_row: int, first_click_col: int) -> np.ndarray:
+    """
+    最初のクリック位置中心の3x3マス（地雷を置かないマス、盤面の端で切り詰める）の通し番号を求める
+
+    Returns:
+        通し番号の配列（番号順、角なら4個・辺なら6個・内側なら9個）
+    """
+    rows = np.arange(max(first_click_row - 1, 0), min(first_click_row + 2, height))
+    cols = np.arange(max(first_click_col - 1, 0), min(first_click_col + 2, width))
+    return (rows[:, None] * width + cols[None, :]).ravel()
+
+
+def skip_excluded(samples: np.ndarray, excluded: np.ndarray) -> np.ndarray:
+    """
+    除外しないマスに0から振った番号を、除外するマスを飛ばして盤面の通し番号へずらす
+
+    Args:
+        samples: 除外しないマスの番号の配列
+        excluded: 除外するマスの通し番号の配列（番号順）
+
+    Returns:
+        盤面の通し番号の配列
+    """
+    # 除外しないマスの番号aは、a以下になる「除外マスより前の除外しないマスの数」の個数だけずれる
+    return samples + np.searchsorted(excluded - np.arange(excluded.size), samples, side="right")
+
+
+def generate_mine_positions(height: int, width: int, mine_count: int,
+                            first_click_row: int, first_click_col: int,
+                            seed: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    地雷の位置を(row, col)のリストで求める（generate_mine_indicesと同じ配置）
+
+    Returns:
+        地雷の位置のリスト（順不同）
+    """
+    indices = generate_mine_indices(height, width, mine_count, first_click_row, first_click_col, seed)
+    return [divmod(index, width) for index in indices.tolist()]
+
+
 class MinesweeperBoard:
     """マインスイーパーの盤面クラス"""
 
-    def __init__(self, height: int, width: int, mine_count: int):
+    def __init__(self, height: int, width: int, mine_count: int, seed: Optional[int] = None,
+                 no_guess: bool = False):
         """
         マインスイーパーの盤面を初期化
 
@@ -25,14 +111,34 @@ class MinesweeperBoard:
             height: 盤面の高さ
             width: 盤面の幅
             mine_count: 地雷の数
+            seed: 地雷配置の乱数のシード（指定すると同じ最初の一手なら同じ盤面になる）
+            no_guess: 推測なしで解ける盤面にするか（最初の一手で解けるシードを探して設定する。no_guess.NoGuessGenerator）
         """
         self.height = height
         self.width = width
         self.mine_count = mine_count
+        self.seed = seed
+        self.no_guess = no_guess
         self.first_click = True
         self.game_state = GameState.PLAYING
+        self.last_revealed_cells: List[Tuple[int, int]] = []  # 直前のdigで新たに発見されたマス
+        self.version = 0  # 盤面が変化するたびに1増える版番号
+        self.change_feed: ChangeFeed[CellChange] = ChangeFeed()  # マスの状態変化の配信（購読者がいるときだけ記録）
+
+        # 勝利判定・残り地雷数を定数時間で返すためのカウンタ
+        self._hidden_safe_count = height * width  # 未発見の安全なマス数（地雷生成前は全マス）
+        self._flag_count = 0                      # フラグ数
+        self.consistency_check = False            # Trueならカウンタを更新のたびに全体スキャンで検証
+
+        # 同じサイズの盤面で共有する近傍テーブル
+        self._neighbor_table = get_neighbor_table(height, width)
 
         # 盤面の状態を初期化
+        self._init_storage()
+
+    def _init_storage(self):
+        """盤面データの格納領域を確保（格納方式を変えるサブクラスはここを上書き）"""
+        height, width = self.height, self.width
         self.mines: List[List[bool]] = [[False for _ in range(width)] for _ in range(height)]
         self.cell_states: List[List[CellState]] = [[CellState.HIDDEN for _ in range(width)] for _ in range(height)]
         self.mine_numbers: List[List[int]] = [[0 for _ in range(width)] for _ in range(height)]
@@ -41,54 +147,75 @@ class MinesweeperBoard:
         """盤面範囲内にちゃんと収まってる？"""
         return 0 <= row < self.height and 0 <= col < self.width
 
-    def _get_neighbors(self, row: int, col: int) -> List[Tuple[int, int]]:
-        """指定された座標の周囲8マスの座標のリストを返すよ"""
-        neighbors = []
-        for dr in [-1, 0, 1]:
-            for dc in [-1, 0, 1]:
-                if dr == 0 and dc == 0:
-                    continue
-                new_row, new_col = row + dr, col + dc
-                if self._is_valid_position(new_row, new_col):
-                    neighbors.append((new_row, new_col))
-        return neighbors
+    def _is_hidden(self, row: int, col: int) -> bool:
+        """未発見のマスか（格納方式を変えるサブクラスは上書き）"""
+        return self.cell_states[row][col] == CellState.HIDDEN
+
+    def _is_mine(self, row: int, col: int) -> bool:
+        """地雷のマスか（格納方式を変えるサブクラスは上書き）"""
+        return self.mines[row][col]
+
+    def _get_neighbors(self, row: int, col: int) -> Tuple[Tuple[int, int], ...]:
+        """指定された座標の周囲8マスの座標のタプルを返すよ（共有テーブルなので変更しないでね）"""
+        return self._neighbor_table.neighbors(row, col)
 
     def generate_mines(self, first_click_row: int, first_click_col: int):
         """
-        地雷をランダム生成（最初の一手以外の場所に配置）
+        地雷をランダム生成（最初の一手以外の場所に配置、盤面のシードがあればそれで決まる）
 
         Args:
             first_click_row: 最初にクリックした行
             first_click_col: 最初にクリックした列
         """
-
-        # 最初のクリック位置中心の3x3マスを地雷生成除外エリアとして設定
-        excluded_positions = set()
-        excluded_positions.add((first_click_row, first_click_col))
-        for neighbor in self._get_neighbors(first_click_row, first_click_col):
-            excluded_positions.add(neighbor)
-
-        # 利用可能な位置のリストを作成
-        available_positions = []
-        for row in range(self.height):
-            for col in range(self.width):
-                if (row, col) not in excluded_positions:
-                    available_positions.append((row, col))
-
-        # 地雷数が多すぎたらダメだ
-        if self.mine_count > len(available_positions):
-            raise ValueError("地雷数が多すぎます")
-
         # 地雷配置する～
-        mine_positions = random.sample(available_positions, self.mine_count)
-        for row, col in mine_positions:
-            self.mines[row][col] = True
+        self._place_mines(generate_mine_indices(self.height, self.width, self.mine_count,
+                                                first_click_row, first_click_col, self.seed))
 
         # 各マスの周囲の地雷数をmine_numbersに記入
         self._calculate_mine_numbers()
 
+        self._reset_counters_after_mines()
+        self.first_click = False
+
+    def apply_mine_layout(self, mines: np.ndarray, mine_numbers: np.ndarray):
+        """
+        前もって生成した地雷配置を、最初の一手の前に設定（generate_minesの代わり）
+
+        Args:
+            mines: 地雷のbool配列 (height, width)
+            mine_numbers: 周囲の地雷数の配列 (height, width)（地雷のマスは0）
+        """
+        if not self.first_click:
+            raise ValueError("地雷配置は最初の一手の前にしか設定できません")
+        if mines.shape != (self.height, self.width) or int(mines.sum()) != self.mine_count:
+            raise ValueError("地雷配置が盤面と一致しません")
+
+        self._place_mines(np.flatnonzero(mines))
+        self._set_mine_numbers(mine_numbers)
+        self._reset_counters_after_mines()
         self.first_click = False
 
+    def _reset_counters_after_mines(self):
+        """地雷が決まったのでカウンタを数え直す（初手前のフラグも反映される）"""
+        if self._flag_count == 0:
+            # 初手前は発見済みのマスがないので、フラグがなければ地雷以外の全マスが未発見の安全なマス
+            self._hidden_safe_count = self.height * self.width - self.mine_count
+            if self.consistency_check:
+                self.verify_counters()
+        else:
+            self._hidden_safe_count, self._flag_count = self._scan_counters()
+
+    def _set_mine_numbers(self, mine_numbers: np.ndarray):
+        """計算済みの周囲の地雷数をmine_numbersに書き込む（格納方式を変えるサブクラスは上書き）"""
+        self.mine_numbers = mine_numbers.tolist()
+
+    def _place_mines(self, indices: np.ndarray):
+        """地雷のマスの通し番号（row * width + col）の配列を地雷配置に書き込む（格納方式を変えるサブクラスは上書き）"""
+        mines, width = self.mines, self.width
+        for index in indices.tolist():
+            row, col = divmod(index, width)
+            mines[row][col] = True
+
     def _calculate_mine_numbers(self):
         """各マスの周囲の地雷数をmine_numbersに記入"""
         for row in range(self.height):
@@ -115,16 +242,24 @@ class MinesweeperBoard:
         if not self._is_valid_position(row, col):
             raise ValueError("指定された位置が盤面外です")
 
+        self.last_revealed_cells = []
+
         # 既に発見済みまたはフラグ付きの場合は何もしない
-        if self.cell_states[row][col] != CellState.HIDDEN:
+        if not self._is_hidden(row, col):
             return True
 
         # 最初のクリックの場合、専用メソッドを呼び出して地雷配置を行う
         if self.first_click:
-            return self._first_dig(row, col)
+            success = self._first_dig(row, col)
+        else:
+            # 二手目以降の通常のdig
+            success = self._normal_dig(row, col)
+
+        if self.last_revealed_cells:
+            self.version += 1
+            self.change_feed.extend((r, c, CellState.REVEALED) for r, c in self.last_revealed_cells)
 
-        # 二手目以降の通常のdig
-        return self._normal_dig(row, col)
+        return success
 
     def _first_dig(self, row: int, col: int) -> bool:
         """
@@ -141,7 +276,7 @@ class MinesweeperBoard:
         self.generate_mines(row, col)
 
         # 掘る
-        self._reveal_cell(row, col)
+        self.last_revealed_cells = self._reveal_cell(row, col)
 
         # 勝利条件をチェック
         self._check_win_condition()
@@ -160,34 +295,63 @@ class MinesweeperBoard:
             bool: 成功した場合True、地雷を踏んだ場合False
         """
         # 地雷を踏んだ場合
-        if self.mines[row][col]:
+        if self._is_mine(row, col):
             self.cell_states[row][col] = CellState.REVEALED
+            self.last_revealed_cells = [(row, col)]
             self.game_state = GameState.LOST
             return False
 
         # 掘るぜ
-        self._reveal_cell(row, col)
+        self.last_revealed_cells = self._reveal_cell(row, col)
 
         # 勝利条件をチェック
         self._check_win_condition()
 
         return True
 
-    def _reveal_cell(self, row: int, col: int):
-        """マスを発見状態にし、周囲の0のマスも展開するよね"""
+    def _reveal_cell(self, row: int, col: int) -> List[Tuple[int, int]]:
+        """
+        マスを発見状態にし、周囲の0のマスも展開するよね
+        再帰せずスタックで展開するので、広い0の領域でも再帰上限に引っかからない
 
-        if self.cell_states[row][col] != CellState.HIDDEN:
-            return
+        Args:
+            row: 行
+            col: 列
 
-        if self.mines[row][col]:
-            return
+        Returns:
+            List[Tuple[int, int]]: 新たに発見状態になったマスの座標リスト
+        """
+        cell_states = self.cell_states
+        mines = self.mines
+        mine_numbers = self.mine_numbers
+        get_neighbors = self._neighbor_table.neighbors
+
+        if cell_states[row][col] != CellState.HIDDEN:
+            return []
 
-        self.cell_states[row][col] = CellState.REVEALED
+        if mines[row][col]:
+            return []
+
+        cell_states[row][col] = CellState.REVEALED
+        revealed = [(row, col)]
 
         # 周囲に地雷がない場合、自動的に周囲も展開
-        if self.mine_numbers[row][col] == 0:
-            for neighbor_row, neighbor_col in self._get_neighbors(row, col):
-                self._reveal_cell(neighbor_row, neighbor_col)
+        stack = [(row, col)] if mine_numbers[row][col] == 0 else []
+        while stack:
+            current_row, current_col = stack.pop()
+            for neighbor_row, neighbor_col in get_neighbors(current_row, current_col):
+                if cell_states[neighbor_row][neighbor_col] != CellState.HIDDEN:
+                    continue
+                if mines[neighbor_row][neighbor_col]:
+                    continue
+
+                cell_states[neighbor_row][neighbor_col] = CellState.REVEALED
+                revealed.append((neighbor_row, neighbor_col))
+                if mine_numbers[neighbor_row][neighbor_col] == 0:
+                    stack.append((neighbor_row, neighbor_col))
+
+        self._hidden_safe_count -= len(revealed)
+        return revealed
 
     def toggle_flag(self, row: int, col: int):
         """フラグを切り替え"""
@@ -197,28 +361,63 @@ class MinesweeperBoard:
         if self.game_state != GameState.PLAYING:
             return
 
+        # フラグ付きの安全なマスは「未発見の安全なマス」に数えない（勝利判定と同じ基準）
+        safe_delta = 0 if self.mines[row][col] else 1
+
         if self.cell_states[row][col] == CellState.HIDDEN:
             self.cell_states[row][col] = CellState.FLAGGED
+            self._flag_count += 1
+            self._hidden_safe_count -= safe_delta
+            self.version += 1
+            self.change_feed.append((row, col, CellState.FLAGGED))
         elif self.cell_states[row][col] == CellState.FLAGGED:
             self.cell_states[row][col] = CellState.HIDDEN
+            self._flag_count -= 1
+            self._hidden_safe_count += safe_delta
+            self.version += 1
+            self.change_feed.append((row, col, CellState.HIDDEN))
+
+        if self.consistency_check:
+            self.verify_counters()
 
     def _check_win_condition(self):
         """勝利条件をチェックしてgame_stateを更新"""
-        for row in range(self.height):
-            for col in range(self.width):
-                if not self.mines[row][col] and self.cell_states[row][col] == CellState.HIDDEN:
-                    return  # まだ未発見の安全なマスがある
+        if self.consistency_check:
+            self.verify_counters()
+
+        if self._hidden_safe_count > 0:
+            return  # まだ未発見の安全なマスがある
 
         self.game_state = GameState.WON
 
+    def _scan_counters(self) -> Tuple[int, int]:
+        """
+        盤面全体を走査してカウンタの値を求める
+
+        Returns:
+            (未発見の安全なマス数, フラグ数)のタプル
+        """
+        hidden_safe_count = 0
+        flag_count = 0
+        for row in range(self.height):
+            for col in range(self.width):
+                state = self.cell_states[row][col]
+                if state == CellState.HIDDEN and not self.mines[row][col]:
+                    hidden_safe_count += 1
+                elif state == CellState.FLAGGED:
+                    flag_count += 1
+        return hidden_safe_count, flag_count
+
+    def verify_counters(self):
+        """カウンタが全体スキャンの結果と一致するか検証（テスト・デバッグ用）"""
+        expected = self._scan_counters()
+        actual = (self._hidden_safe_count, self._flag_count)
+        if actual != expected:
+            raise RuntimeError(f"カウンタ不整合: (未発見の安全マス, フラグ) = {actual}, 期待値 {expected}")
+
     def get_remaining_mines(self) -> int:
         """残りの地雷数を取得（地雷数-フラグ数）"""
-        flagged_count = sum(
-            1 for row in range(self.height)
-            for col in range(self.width)
-            if self.cell_states[row][col] == CellState.FLAGGED
-        )
-        return self.mine_count - flagged_count
+        return self.mine_count - self._flag_count
 
     def is_game_over(self) -> bool:
         """ゲームが終了しているかチェック"""
@@ -228,6 +427,14 @@ class MinesweeperBoard:
         """現在のゲーム状態を取得"""
         return self.game_state
 
+    def get_last_revealed_cells(self) -> List[Tuple[int, int]]:
+        """直前のdigで新たに発見状態になったマスの座標リストを取得"""
+        return self.last_revealed_cells
+
+    def get_version(self) -> int:
+        """盤面の版番号を取得（マスの状態が変わるたびに1増える）"""
+        return self.version
+
     def get_cell_info(self, row: int, col: int) -> dict:
         """指定された位置のセル情報を辞書形式で取得（API用）"""
         if not self._is_valid_position(row, col):
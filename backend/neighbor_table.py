@@ -0,0 +1,107 @@
+"""
+盤面サイズごとの近傍テーブル
+同じ (高さ, 幅) の盤面・ソルバービューの間で、周囲8マスの索引表を共有する
+"""
+
+from array import array
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# セルの座標を表す型エイリアス
+Cell = Tuple[int, int]  # (row, col)
+
+# これより大きい盤面では座標タプルをキャッシュしない（1マスあたり約0.5KB使うため）
+MAX_CACHED_CELLS = 250_000
+
+_OFFSETS = tuple((dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if not (dr == 0 and dc == 0))
+
+
+class NeighborTable:
+    """周囲8マスの索引表
+
+    - neighbors(row, col): 近傍座標のタプル。初回参照時に作成してキャッシュし、
+      以降は同じタプルを返すので呼び出しごとのリスト・タプル生成がない
+    - offsets / indices: 一次元インデックス（row * width + col）のCSR形式。
+      indices[offsets[i]:offsets[i + 1]] がマス i の近傍（初回参照時にベクトル演算で作成）。
+      CompactMinesweeperBoardの0のマスからのスタック展開で使う
+
+    テーブルは読み取り専用として共有するので、返したタプルや配列は変更しないこと
+    """
+
+    def __init__(self, height: int, width: int):
+        self.height = height
+        self.width = width
+        self._cache_enabled = height * width <= MAX_CACHED_CELLS
+        self._cell_neighbors: List[Optional[Tuple[Cell, ...]]] = (
+            [None] * (height * width) if self._cache_enabled else [])
+        self._offsets: Optional[array] = None
+        self._indices: Optional[array] = None
+
+    def __reduce__(self):
+        # pickle時はテーブル本体を送らず、復元側のキャッシュから取り直す
+        return get_neighbor_table, (self.height, self.width)
+
+    def __deepcopy__(self, memo):
+        # 読み取り専用なのでコピーせず共有する
+        return self
+
+    def neighbors(self, row: int, col: int) -> Tuple[Cell, ...]:
+        """指定された座標の周囲8マスの座標タプルを返す"""
+        if not self._cache_enabled:
+            return self._build_neighbors(row, col)
+
+        index = row * self.width + col
+        cached = self._cell_neighbors[index]
+        if cached is None:
+            cached = self._build_neighbors(row, col)
+            self._cell_neighbors[index] = cached
+        return cached
+
+    def _build_neighbors(self, row: int, col: int) -> Tuple[Cell, ...]:
+        """近傍座標のタプルを作成"""
+        height, width = self.height, self.width
+        return tuple((row + dr, col + dc) for dr, dc in _OFFSETS
+                     if 0 <= row + dr < height and 0 <= col + dc < width)
+
+    @property
+    def offsets(self) -> array:
+        """CSR形式のオフセット（長さ height * width + 1）"""
+        if self._offsets is None:
+            self._build_csr()
+        return self._offsets
+
+    @property
+    def indices(self) -> array:
+        """CSR形式の近傍インデックス"""
+        if self._indices is None:
+            self._build_csr()
+        return self._indices
+
+    def _build_csr(self):
+        """一次元インデックスのCSR形式テーブルを作成（全マス分を一度に計算する）"""
+        height, width = self.height, self.width
+        # 周囲を-1で1マス分パディングした番号の盤面を8方向にずらして並べ、盤面外（-1）を除く
+        padded = np.full((height + 2, width + 2), -1, dtype=np.intc)
+        padded[1:-1, 1:-1] = np.arange(height * width, dtype=np.intc).reshape(height, width)
+        around = np.stack([padded[1 + dr:1 + dr + height, 1 + dc:1 + dc + width].ravel()
+                           for dr, dc in _OFFSETS], axis=1)
+        valid = around >= 0
+
+        # 行優先で取り出すのでマスごとの近傍は_OFFSETSの順に並ぶ
+        offsets = np.zeros(height * width + 1, dtype=np.intc)
+        np.cumsum(valid.sum(axis=1), out=offsets[1:])
+        self._indices = array('i', around[valid].tobytes())
+        self._offsets = array('i', offsets.tobytes())
+
+    def neighbor_indices(self, index: int) -> array:
+        """一次元インデックス index のマスの近傍インデックスを返す"""
+        offsets = self.offsets
+        return self.indices[offsets[index]:offsets[index + 1]]
+
+
+@lru_cache(maxsize=32)
+def get_neighbor_table(height: int, width: int) -> NeighborTable:
+    """(高さ, 幅) ごとに共有される近傍テーブルを取得"""
+    return NeighborTable(height, width)
@@ -0,0 +1,289 @@
+"""
+推測なしで解ける盤面の生成
+最初の一手の位置に対して候補のシードから盤面を作り、論理ソルバー（エリア解析）で最初の一手から
+最後まで解けるかを調べて、推測が必要な盤面を捨てる。盤面は(高さ, 幅, 地雷数, 最初の一手, シード)だけで
+決まるので、見つかった盤面はシードとして返し・キャッシュする
+"""
+
+import multiprocessing
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Deque, Optional, Sequence, Tuple
+
+from minesweeper import MinesweeperBoard, GameState
+from simulation import create_solver
+from solver.solver_manager import SolverManager
+
+# キャッシュのキー (高さ, 幅, 地雷数, 最初の一手の行, 列)
+FirstClickKey = Tuple[int, int, int, int, int]
+
+# 1つのタスクで調べる候補のシード数
+DEFAULT_CANDIDATES_PER_TASK = 4
+
+# ワーカー1つあたりの、同時に投入しておくタスク数
+TASKS_PER_WORKER = 2
+
+# ワーカープロセスの起動方法。プロセスプールはuvicornのスレッドから作るので、
+# 他のスレッドが持っているロックごと複製されうるforkは使わない
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def is_solvable_without_guess(height: int, width: int, mine_count: int, row: int, col: int,
+                              seed: int, solver_name: str = "area") -> bool:
+    """
+    シードの盤面を最初の一手(row, col)から推測なしで最後まで解けるか
+
+    ソルバーは確実な手がなくなった時点で止まるので、推測が必要な盤面はそこで打ち切られる
+    """
+    board = MinesweeperBoard(height, width, mine_count, seed=seed)
+    board.dig(row, col)
+    SolverManager(create_solver(solver_name)).solve_until_manual_needed(board)
+    return board.get_game_state() == GameState.WON
+
+
+def find_solvable_seed(height: int, width: int, mine_count: int, row: int, col: int,
+                       seeds: Sequence[int], solver_name: str = "area") -> Tuple[Optional[int], int]:
+    """
+    候補のシードを順に調べ、推測なしで解ける最初のシードを返す（ワーカープロセスで実行する1タスク分）
+
+    Returns:
+        (解けるシード（なければNone）, 調べた候補の数)のタプル
+    """
+    for index, seed in enumerate(seeds):
+        if is_solvable_without_guess(height, width, mine_count, row, col, seed, solver_name):
+            return seed, index + 1
+    return None, len(seeds)
+
+
+class NoGuessGenerator:
+    """推測なしで解ける盤面のシードを探す（プロセスプールで候補を並列に調べ、見つかったシードをキャッシュする）
+
+    in_process=True（既定ではworkers=1のとき）ならプロセスプールを使わず呼び出したスレッドで調べる。
+    見つかった時点で残りのタスクは取り消し、すでに動いているタスクが見つけたシードは後からキャッシュに入る。
+    ワーカープロセスが落ちたら、そのプロセスプールは捨てて次の呼び出しで作り直す。
+    キャッシュは最初の一手の位置ごとで、取り出したシードは削除する（同じ盤面を何度も配らない）
+    """
+
+    def __init__(self, solver_name: str = "area", workers: Optional[int] = None, cache_size: int = 1024,
+                 candidates_per_task: int = DEFAULT_CANDIDATES_PER_TASK, in_process: Optional[bool] = None):
+        """
+        Args:
+            solver_name: 解けるかを調べるソルバー名（simulation.SOLVERS）
+            workers: ワーカープロセス数（Noneならコア数）
+            cache_size: キャッシュする最初の一手の位置の最大数（超えたら最も長く使われていない位置から捨てる）
+            candidates_per_task: 1タスクで調べる候補のシード数
+            in_process: プロセスプールを使わずに調べるか（Noneならworkers=1のとき）
+        """
+        create_solver(solver_name)  # ソルバー名の確認
+        self.solver_name = solver_name
+        self.workers = workers or os.cpu_count() or 1
+        self.in_process = self.workers == 1 if in_process is None else in_process
+        self.cache_size = cache_size
+        self.candidates_per_task = candidates_per_task
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cache: "OrderedDict[FirstClickKey, Deque[int]]" = OrderedDict()
+        # キャッシュはタスクの完了コールバック（別スレッド）からも追加され、
+        # find_seedは複数のスレッドから同時に呼ばれうる（プロセスプールの作成・破棄も排他する）
+        self._lock = threading.Lock()
+
+        self.cache_hit_count = 0    # キャッシュから返した数
+        self.found_count = 0        # 探して見つけた数
+        self.timeout_count = 0      # 時間内に見つからなかった数
+        self.broken_count = 0       # ワーカープロセスが落ちて探せなかった数
+        self.candidate_count = 0    # 調べた候補の数
+        self.search_time = 0.0      # 探すのにかかった時間の合計（秒）
+
+    def find_seed(self, height: int, width: int, mine_count: int, row: int, col: int,
+                  timeout: Optional[float] = None, base_seed: Optional[int] = None) -> Optional[int]:
+        """
+        最初の一手(row, col)から推測なしで解ける盤面のシードを求める
+
+        Args:
+            height: 盤面の高さ
+            width: 盤面の幅
+            mine_count: 地雷の数
+            row: 最初の一手の行
+            col: 最初の一手の列
+            timeout: 探す時間の上限（秒、Noneなら見つかるまで）
+            base_seed: 候補のシードの開始値（Noneならrandomモジュールの乱数から決める）
+
+        Returns:
+            シード、時間内に見つからない・ワーカープロセスが落ちたときはNone
+        """
+        key = (height, width, mine_count, row, col)
+        seed = self._take_cached(key)
+        if seed is not None:
+            self.cache_hit_count += 1
+            return seed
+
+        start = time.perf_counter()
+        deadline = start + timeout if timeout is not None else None
+        if base_seed is None:
+            base_seed = random.getrandbits(62)
+        try:
+            seed = self._search(key, base_seed, deadline)
+        except BrokenProcessPool:
+            self.broken_count += 1
+            return None
+        finally:
+            self.search_time += time.perf_counter() - start
+
+        if seed is None:
+            self.timeout_count += 1
+        else:
+            self.found_count += 1
+        return seed
+
+    def _search_in_process(self, key: FirstClickKey, base_seed: int, deadline: Optional[float]) -> Optional[int]:
+        """このプロセスで候補を1つずつ調べる"""
+        seed = base_seed
+        while deadline is None or time.perf_counter() < deadline:
+            self.candidate_count += 1
+            if is_solvable_without_guess(*key, seed, self.solver_name):
+                return seed
+            seed += 1
+        return None
+
+    def _search_in_pool(self, key: FirstClickKey, base_seed: int, deadline: Optional[float]) -> Optional[int]:
+        """
+        プロセスプールで候補のシードの範囲を並列に調べる
+
+        Raises:
+            BrokenProcessPool: ワーカープロセスが落ちた（プロセスプールは捨てる）
+        """
+        executor = self._get_executor()
+        next_seed = base_seed
+        pending = set()
+        try:
+            while True:
+                while len(pending) < self.workers * TASKS_PER_WORKER:
+                    seeds = range(next_seed, next_seed + self.candidates_per_task)
+                    next_seed += self.candidates_per_task
+                    pending.add(executor.submit(find_solvable_seed, *key, seeds, self.solver_name))
+
+                timeout = None if deadline is None else max(deadline - time.perf_counter(), 0.0)
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                found = [seed for seed, _ in (self._collect(future) for future in done) if seed is not None]
+                if found:
+                    # 他に見つかった分は次の同じ位置の要求のためにキャッシュしておく
+                    for seed in found[1:]:
+                        self._add_cached(key, seed)
+                    return found[0]
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return None
+        except BrokenProcessPool:
+            self._discard_executor(executor)
+            raise
+        finally:
+            # 残りのタスクは取り消し、動いているタスクが見つけたシードはキャッシュに入れる
+            for future in pending:
+                if not future.cancel():
+                    future.add_done_callback(lambda future, key=key: self._cache_result(key, future))
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """プロセスプールを取得（なければ作る）"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context(START_METHOD))
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor):
+        """落ちたプロセスプールを捨てる（別のスレッドがすでに作り直していればそのまま）"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _collect(self, future: Future) -> Tuple[Optional[int], int]:
+        """完了したタスクの結果を取り出し、調べた候補の数を数える"""
+        seed, candidates = future.result()
+        # 取り消せなかったタスクの完了コールバック（別スレッド）からも呼ばれる
+        with self._lock:
+            self.candidate_count += candidates
+        return seed, candidates
+
+    def _cache_result(self, key: FirstClickKey, future: Future):
+        """取り消せなかったタスクの結果をキャッシュに入れる（完了コールバック）"""
+        if not future.cancelled() and future.exception() is None:
+            seed, _ = self._collect(future)
+            if seed is not None:
+                self._add_cached(key, seed)
+
+    def warm(self, height: int, width: int, mine_count: int, row: int, col: int, count: int,
+             timeout: Optional[float] = None) -> int:
+        """
+        最初の一手の位置について、解けるシードをcount個までキャッシュに溜める（要求処理の外で呼ぶ）
+
+        Returns:
+            キャッシュにあるその位置のシードの数
+        """
+        key = (height, width, mine_count, row, col)
+        deadline = time.perf_counter() + timeout if timeout is not None else None
+        while self._cached_count(key) < count:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            try:
+                seed = self._search(key, random.getrandbits(62), deadline)
+            except BrokenProcessPool:
+                self.broken_count += 1
+                break
+            if seed is None:
+                break
+            self._add_cached(key, seed)
+        return self._cached_count(key)
+
+    def _search(self, key: FirstClickKey, base_seed: int, deadline: Optional[float]) -> Optional[int]:
+        """キャッシュを使わずに探す"""
+        if self.in_process:
+            return self._search_in_process(key, base_seed, deadline)
+        return self._search_in_pool(key, base_seed, deadline)
+
+    def _take_cached(self, key: FirstClickKey) -> Optional[int]:
+        with self._lock:
+            seeds = self._cache.get(key)
+            if not seeds:
+                return None
+            self._cache.move_to_end(key)
+            return seeds.popleft()
+
+    def _add_cached(self, key: FirstClickKey, seed: int):
+        with self._lock:
+            self._cache.setdefault(key, deque()).append(seed)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _cached_count(self, key: FirstClickKey) -> int:
+        with self._lock:
+            return len(self._cache.get(key, ()))
+
+    def get_stats(self) -> dict:
+        """生成の統計情報を取得"""
+        searches = self.found_count + self.timeout_count
+        with self._lock:
+            cached_seeds = sum(len(seeds) for seeds in self._cache.values())
+        return {
+            "workers": self.workers,
+            "cache_hits": self.cache_hit_count,
+            "found": self.found_count,
+            "timeouts": self.timeout_count,
+            "broken_pools": self.broken_count,
+            "candidates": self.candidate_count,
+            "candidates_per_search": self.candidate_count / searches if searches else None,
+            "search_seconds_mean": self.search_time / searches if searches else None,
+            "cached_seeds": cached_seeds
+        }
+
+    def close(self):
+        """プロセスプールを終了"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
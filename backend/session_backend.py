@@ -0,0 +1,358 @@
+"""
+ゲームセッションの永続化バックエンド
+SessionStore（メモリ上のLRUキャッシュ）の裏側に置き、プロセス再起動後もゲームを復元できるようにする
+shared=True にすると複数のワーカープロセスで同じデータベースを共有できる
+"""
+
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from minesweeper import MinesweeperBoard
+from board_snapshot import encode_board, decode_board, snapshot_version
+
+# 書き込み待ちの内容: 盤面（保存）または None（削除）
+PendingWrite = Optional[MinesweeperBoard]
+# エンコード済みの書き込み内容: スナップショット（保存）または None（削除）
+Snapshot = Tuple[str, Optional[bytes]]
+
+# 共有時にロックを待つ時間の上限（秒）。要求処理の中で読み書きするので、イベントループを長く止めない
+SHARED_BUSY_TIMEOUT = 0.1
+
+# ライトビハインドの書き込みで1トランザクションにまとめるスナップショット数。
+# 同じデータベースへの他の書き込み（期限切れの削除）が待つのは最大でこの件数の書き込みまで
+WRITE_CHUNK_SIZE = 100
+
+
+class SessionConflictError(Exception):
+    """別のプロセスが同じセッションを先に更新していた"""
+    pass
+
+
+class SessionBusyError(Exception):
+    """共有の保存先が別のプロセスに書き込みでロックされていて、時間内に読み書きできなかった"""
+    pass
+
+
+class SessionBackend(ABC):
+    """セッション永続化バックエンドの基底クラス"""
+
+    # Trueなら他のプロセスも同じ保存先を更新する（メモリ上の盤面が古くなりうる）
+    shared = False
+
+    @abstractmethod
+    def load(self, game_id: str) -> Optional[MinesweeperBoard]:
+        """
+        保存されている盤面を読み込む
+
+        Returns:
+            復元した盤面、なければNone
+        """
+        pass
+
+    @abstractmethod
+    def save(self, game_id: str, board: MinesweeperBoard):
+        """盤面の保存を予約（実際の書き込みはflushまで遅らせてよい）"""
+        pass
+
+    @abstractmethod
+    def delete(self, game_id: str):
+        """盤面の削除を予約"""
+        pass
+
+    @abstractmethod
+    def flush(self):
+        """予約されている保存・削除をすべて書き込む"""
+        pass
+
+    def stored_version(self, game_id: str) -> Optional[int]:
+        """
+        保存されている盤面の版番号を取得（共有バックエンドでメモリ上の盤面が最新か確かめる用）
+
+        Returns:
+            版番号、保存されていなければNone
+        """
+        return None
+
+    def delete_expired(self) -> int:
+        """
+        放置期限を過ぎたセッションを削除（標準実装は何もしない）
+
+        Returns:
+            削除したセッション数
+        """
+        return 0
+
+    def close(self):
+        """バックエンドを閉じる（標準実装は書き込みのみ）"""
+        self.flush()
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """SQLiteにスナップショットを保存するバックエンド
+
+    通常（ライトビハインド）:
+        save / delete は書き込み待ちに積むだけで、ディスクへの書き込みは flush でまとめて
+        write_chunk_size 件ずつのトランザクションで行う。書き込みを要求処理の外に出せるよう、flush は
+        take_pending（スナップショット化）と write_snapshots（ディスク書き込み）に分けて呼べる。
+        write_snapshots は読み出し用とは別の接続・ロックを使うので、書き込み中も load などの
+        読み出しは待たない（WALなので読み出しはコミット済みの内容を読める）。
+    共有（shared=True、複数ワーカー用）:
+        save / delete はその場で書き込む（ライトスルー）。保存時に版番号を比べ、
+        別のプロセスが先に同じセッションを更新していたら SessionConflictError を送出する。
+        要求処理の中で読み書きするので、ロック待ちは busy_timeout（既定 SHARED_BUSY_TIMEOUT）で打ち切り、
+        SessionBusyError を送出する（呼び出し側は再試行を促す）。
+    """
+
+    def __init__(self, path: str, idle_ttl: Optional[float] = None, shared: bool = False,
+                 busy_timeout: Optional[float] = None, write_chunk_size: int = WRITE_CHUNK_SIZE):
+        """
+        Args:
+            path: SQLiteのデータベースファイルのパス
+            idle_ttl: 最後の保存からこの秒数を過ぎたセッションはdelete_expiredで削除（Noneなら削除しない）
+            shared: 複数のプロセスで同じデータベースを共有する
+            busy_timeout: ロックを待つ時間の上限（秒、Noneなら共有時はSHARED_BUSY_TIMEOUT、それ以外は10秒）
+            write_chunk_size: write_snapshotsで1トランザクションにまとめるスナップショット数
+        """
+        if write_chunk_size < 1:
+            raise ValueError("write_chunk_size は1以上にしてください")
+
+        self.path = path
+        self.idle_ttl = idle_ttl
+        self.shared = shared
+        self.write_chunk_size = write_chunk_size
+        if busy_timeout is None:
+            busy_timeout = SHARED_BUSY_TIMEOUT if shared else 10.0
+
+        self._lock = threading.Lock()        # 書き込み待ち・読み出し用の接続の排他
+        self._write_lock = threading.Lock()  # ライトビハインドの書き込み用の接続の排他
+        self._pending: Dict[str, PendingWrite] = {}
+        self._in_flight: Dict[str, Optional[bytes]] = {}  # スナップショット化済みで書き込み中
+        self._failed: Dict[str, Optional[bytes]] = {}     # 書き込みに失敗したスナップショット（次のflushで再試行）
+
+        self._connection = self._connect(busy_timeout)
+        self._write_connection = self._connect(busy_timeout)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " game_id TEXT PRIMARY KEY,"
+            " snapshot BLOB NOT NULL,"
+            " version INTEGER NOT NULL DEFAULT 0,"
+            " updated_at REAL NOT NULL)"
+        )
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(sessions)")]
+        if "version" not in columns:
+            self._connection.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+        self.write_count = 0  # 書き込んだスナップショット数
+        self.flush_count = 0  # 書き込みトランザクション数
+        self.busy_count = 0   # ロック待ちを打ち切った数
+
+    def _connect(self, busy_timeout: float) -> sqlite3.Connection:
+        """WALモードの接続を開く"""
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None,
+                                     timeout=busy_timeout)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # WALではNORMALでもデータベースは壊れない（電源断で直近のコミットを失うだけ）
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @contextmanager
+    def _locked(self, writer: bool = False):
+        """
+        接続を排他して使う（ロック待ちの打ち切りはSessionBusyErrorにする）
+
+        Args:
+            writer: 読み出し用ではなく、ライトビハインドの書き込み用の接続を使う
+
+        Raises:
+            SessionBusyError: 別のプロセスのロックが時間内に解けなかった
+        """
+        lock, connection = (self._write_lock, self._write_connection) if writer else (self._lock, self._connection)
+        with lock:
+            try:
+                yield connection
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) and "busy" not in str(e):
+                    raise
+                self.busy_count += 1
+                raise SessionBusyError(str(e)) from e
+
+    def load(self, game_id: str) -> Optional[MinesweeperBoard]:
+        with self._locked() as connection:
+            # まだディスクに届いていない最新の内容を優先する
+            if game_id in self._pending:
+                return self._pending[game_id]
+            if game_id in self._in_flight:
+                snapshot = self._in_flight[game_id]
+            elif game_id in self._failed:
+                snapshot = self._failed[game_id]
+            else:
+                row = connection.execute(
+                    "SELECT snapshot FROM sessions WHERE game_id = ?", (game_id,)).fetchone()
+                snapshot = row[0] if row else None
+
+        return decode_board(snapshot) if snapshot is not None else None
+
+    def save(self, game_id: str, board: MinesweeperBoard):
+        if self.shared:
+            self._write_through(game_id, board)
+            return
+        with self._lock:
+            self._pending[game_id] = board
+
+    def delete(self, game_id: str):
+        if self.shared:
+            with self._locked() as connection:
+                connection.execute("DELETE FROM sessions WHERE game_id = ?", (game_id,))
+            return
+        with self._lock:
+            self._pending[game_id] = None
+
+    def _write_through(self, game_id: str, board: MinesweeperBoard):
+        """
+        盤面をその場で書き込む（保存済みより新しい版のときだけ）
+
+        Raises:
+            SessionConflictError: 保存済みの版番号が盤面の版番号以上だった
+            SessionBusyError: 別のプロセスのロックが時間内に解けなかった
+        """
+        snapshot = encode_board(board)
+        with self._locked() as connection:
+            cursor = connection.execute(
+                "INSERT INTO sessions (game_id, snapshot, version, updated_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(game_id) DO UPDATE SET"
+                " snapshot = excluded.snapshot, version = excluded.version, updated_at = excluded.updated_at"
+                " WHERE excluded.version > sessions.version",
+                (game_id, snapshot, board.version, time.time()))
+            if cursor.rowcount == 0:
+                raise SessionConflictError(game_id)
+            self.write_count += 1
+            self.flush_count += 1
+
+    def stored_version(self, game_id: str) -> Optional[int]:
+        with self._locked() as connection:
+            row = connection.execute(
+                "SELECT version FROM sessions WHERE game_id = ?", (game_id,)).fetchone()
+        return row[0] if row else None
+
+    def pending_count(self) -> int:
+        """書き込み待ちの件数（書き込みに失敗して再試行を待つものを含む）"""
+        with self._lock:
+            return len(self._pending) + len(self._failed)
+
+    def take_pending(self) -> List[Snapshot]:
+        """
+        書き込み待ちをスナップショット化して取り出す
+
+        盤面を変更するのと同じスレッドから呼ぶこと（変更途中の盤面を読まないため）
+
+        Returns:
+            (game_id, スナップショットまたはNone) のリスト
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            failed, self._failed = self._failed, {}
+            snapshots = [(game_id, encode_board(board) if board is not None else None)
+                         for game_id, board in pending.items()]
+            # 前回書き込めなかったものは、その後に変更されていなければ再試行する
+            snapshots += [(game_id, snapshot) for game_id, snapshot in failed.items() if game_id not in pending]
+            self._in_flight.update(snapshots)
+        return snapshots
+
+    def write_snapshots(self, snapshots: List[Snapshot]):
+        """
+        スナップショットをwrite_chunk_size件ずつのトランザクションで書き込む（別スレッドから呼んでよい）
+
+        書き込み用の接続を使い、読み出し用のロックは書き込み中の一覧を更新する間しか持たない。
+        書き込めなかったスナップショット（失敗したトランザクション以降の分）は次のflush（take_pending）で再試行する
+
+        Raises:
+            SessionBusyError: 別のプロセスのロックが時間内に解けなかった
+        """
+        now = time.time()
+        for start in range(0, len(snapshots), self.write_chunk_size):
+            chunk = snapshots[start:start + self.write_chunk_size]
+            try:
+                with self._locked(writer=True) as connection:
+                    self._write_chunk(connection, chunk, now)
+            except Exception:
+                self._finish_in_flight(snapshots[start:], failed=True)
+                raise
+            self._finish_in_flight(chunk, failed=False)
+
+    def _write_chunk(self, connection: sqlite3.Connection, chunk: List[Snapshot], now: float):
+        """スナップショットを1トランザクションで書き込む（書き込み用の接続を排他して呼ぶ）"""
+        saves = [(game_id, snapshot, snapshot_version(snapshot), now)
+                 for game_id, snapshot in chunk if snapshot is not None]
+        deletes = [(game_id,) for game_id, snapshot in chunk if snapshot is None]
+        connection.execute("BEGIN")
+        try:
+            if saves:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO sessions (game_id, snapshot, version, updated_at)"
+                    " VALUES (?, ?, ?, ?)",
+                    saves)
+            if deletes:
+                connection.executemany("DELETE FROM sessions WHERE game_id = ?", deletes)
+            connection.execute("COMMIT")
+        except Exception:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        self.write_count += len(saves)
+        self.flush_count += 1
+
+    def _finish_in_flight(self, snapshots: List[Snapshot], failed: bool):
+        """
+        書き込みを終えたスナップショットを書き込み中の一覧から外す（失敗したものは再試行に回す）
+
+        書き込み中の内容より新しい書き込み待ちがあれば、そちらがloadで優先されるのでそのままにする
+        """
+        with self._lock:
+            for game_id, snapshot in snapshots:
+                if self._in_flight.get(game_id, snapshot) is snapshot:
+                    self._in_flight.pop(game_id, None)
+                    if failed:
+                        self._failed[game_id] = snapshot
+
+    def flush(self):
+        snapshots = self.take_pending()
+        if snapshots:
+            self.write_snapshots(snapshots)
+
+    def delete_expired(self) -> int:
+        if self.idle_ttl is None:
+            return 0
+        # ライトビハインドでは書き込み用の接続で行い、SQLiteのロックを待たずに書き込みの区切りで順番を待つ
+        with self._locked(writer=not self.shared) as connection:
+            cursor = connection.execute(
+                "DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.idle_ttl,))
+            return cursor.rowcount
+
+    def close(self):
+        self.flush()
+        with self._write_lock:
+            self._write_connection.close()
+        with self._lock:
+            self._connection.close()
+
+    def get_stats(self) -> dict:
+        """バックエンドの統計情報を取得（保存先が混み合っていれば保存数はNone）"""
+        try:
+            with self._locked() as connection:
+                stored = connection.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        except SessionBusyError:
+            stored = None
+        with self._lock:
+            return {
+                "backend": "sqlite",
+                "shared": self.shared,
+                "stored_sessions": stored,
+                "pending_writes": len(self._pending) + len(self._failed),
+                "snapshots_written": self.write_count,
+                "flushes": self.flush_count,
+                "busy_timeouts": self.busy_count
+            }
@@ -0,0 +1,233 @@
+"""
+ゲームセッションの保管庫
+最大数と放置期限（TTL）つきで、上限を超えたら最も長く使われていないセッションから追い出す
+永続化バックエンドを渡すと、メモリ上の保管庫はその前段のキャッシュとして動く
+"""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, Optional
+
+from minesweeper import MinesweeperBoard
+from session_backend import SessionBackend, SessionConflictError, SessionBusyError
+
+
+class SessionStore:
+    """game_id → MinesweeperBoard の保管庫（LRU追い出し・放置期限つき）
+
+    辞書と同じく `in` / `[]` / `del` / `len()` で使える。
+    参照されたセッションは「最近使った」扱いになり、放置期限もそこから数え直す。
+
+    backend を渡した場合:
+    - メモリにないセッションはバックエンドから読み込む
+    - 上限超過で追い出したセッションはバックエンドに保存し、メモリからだけ取り除く
+    - 期限切れ・削除したセッションはバックエンドからも削除する
+    - 盤面を変更したら mark_dirty で保存を予約する
+    共有バックエンド（複数ワーカー）の場合は、参照のたびに保存済みの版番号と比べ、
+    別のプロセスが更新していたら読み込み直す。保存はその場で行われるので、
+    追い出し・期限切れではメモリから取り除くだけにする。
+    保存先のロック待ちを打ち切ったときは SessionBusyError がそのまま呼び出し側に伝わる
+    （参照は `in` / `get` の1回で済ませると、版番号の確認も1回で済む）
+    """
+
+    def __init__(self, max_size: int = 10000, idle_ttl: float = 3600.0,
+                 on_evict: Optional[Callable[[str], None]] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 backend: Optional[SessionBackend] = None):
+        """
+        Args:
+            max_size: 保持するセッションの最大数
+            idle_ttl: 最後に参照されてからこの秒数を過ぎたセッションは期限切れ
+            on_evict: セッションが追い出された・期限切れになったときに game_id を渡して呼ぶ関数
+            clock: 現在時刻（秒）を返す関数（テスト用に差し替え可能）
+            backend: 永続化バックエンド（Noneならメモリ上のみ）
+        """
+        if max_size < 1:
+            raise ValueError("max_size は1以上にしてください")
+
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self.on_evict = on_evict
+        self._clock = clock
+        self.backend = backend
+
+        # 最後に参照された順（先頭が最も古い）に並べる
+        self._sessions: "OrderedDict[str, MinesweeperBoard]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+
+        self.evicted_count = 0  # 上限超過で追い出した数
+        self.expired_count = 0  # 放置期限切れで削除した数
+        self.loaded_count = 0   # バックエンドから読み込んだ数
+        self.reloaded_count = 0  # 他のプロセスの更新で読み込み直した数
+
+    def _is_expired(self, game_id: str, now: float) -> bool:
+        return now - self._last_access[game_id] > self.idle_ttl
+
+    def _discard(self, game_id: str, persist: bool = False):
+        """
+        セッションを取り除き、コールバックを呼ぶ
+
+        Args:
+            persist: Trueならバックエンドに保存してメモリからだけ取り除く、Falseならバックエンドからも削除
+        """
+        board = self._sessions.pop(game_id)
+        del self._last_access[game_id]
+        if self.backend is not None and not self.backend.shared:
+            if persist:
+                self.backend.save(game_id, board)
+            else:
+                self.backend.delete(game_id)
+        if self.on_evict is not None:
+            self.on_evict(game_id)
+
+    def _load(self, game_id: str) -> bool:
+        """バックエンドからセッションを読み込んでメモリに置く（見つかればTrue）"""
+        if self.backend is None:
+            return False
+
+        board = self.backend.load(game_id)
+        if board is None:
+            return False
+
+        self.loaded_count += 1
+        self._put(game_id, board)
+        return True
+
+    def __contains__(self, game_id: str) -> bool:
+        if game_id not in self._sessions:
+            return self._load(game_id)
+
+        # 掃除がまだでも期限切れのセッションは見せない
+        if self._is_expired(game_id, self._clock()):
+            self._discard(game_id)
+            self.expired_count += 1
+            return False
+
+        if self.backend is not None and self.backend.shared:
+            return self._refresh(game_id)
+
+        return True
+
+    def _refresh(self, game_id: str) -> bool:
+        """メモリ上の盤面が保存済みの版より古ければ読み込み直す（削除されていればFalse）"""
+        stored_version = self.backend.stored_version(game_id)
+        if stored_version == self._sessions[game_id].version:
+            return True
+
+        del self._sessions[game_id]
+        del self._last_access[game_id]
+        if stored_version is None:
+            return False
+
+        self.reloaded_count += 1
+        return self._load(game_id)
+
+    def __getitem__(self, game_id: str) -> MinesweeperBoard:
+        if game_id not in self:
+            raise KeyError(game_id)
+
+        self._sessions.move_to_end(game_id)
+        self._last_access[game_id] = self._clock()
+        return self._sessions[game_id]
+
+    def __setitem__(self, game_id: str, board: MinesweeperBoard):
+        if self.backend is not None:
+            self.backend.save(game_id, board)
+        self._put(game_id, board)
+
+    def _put(self, game_id: str, board: MinesweeperBoard):
+        """メモリ上に置き、上限を超えたら追い出す"""
+        self._sessions[game_id] = board
+        self._sessions.move_to_end(game_id)
+        self._last_access[game_id] = self._clock()
+
+        # 上限を超えたら最も長く使われていないものから追い出す
+        while len(self._sessions) > self.max_size:
+            oldest_id = next(iter(self._sessions))
+            self._discard(oldest_id, persist=True)
+            self.evicted_count += 1
+
+    def __delitem__(self, game_id: str):
+        if game_id not in self._sessions:
+            raise KeyError(game_id)
+        del self._sessions[game_id]
+        del self._last_access[game_id]
+        if self.backend is not None:
+            self.backend.delete(game_id)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._sessions))
+
+    def get(self, game_id: str, default: Optional[MinesweeperBoard] = None) -> Optional[MinesweeperBoard]:
+        """セッションを取得（なければdefault）"""
+        try:
+            return self[game_id]
+        except KeyError:
+            return default
+
+    def mark_dirty(self, game_id: str):
+        """
+        盤面を変更したセッションの保存を予約（バックエンドがなければ何もしない）
+
+        Raises:
+            SessionConflictError: 共有バックエンドで別のプロセスが先に更新していた
+                                  （メモリ上の盤面は捨て、次の参照で読み込み直す）
+            SessionBusyError: 共有バックエンドのロック待ちを打ち切った
+                              （保存できなかった変更ごとメモリ上の盤面を捨て、次の参照で読み込み直す）
+        """
+        if self.backend is None or game_id not in self._sessions:
+            return
+
+        try:
+            self.backend.save(game_id, self._sessions[game_id])
+        except (SessionConflictError, SessionBusyError):
+            del self._sessions[game_id]
+            del self._last_access[game_id]
+            raise
+
+    def flush(self):
+        """バックエンドへの書き込み待ちをすべて書き込む"""
+        if self.backend is not None:
+            self.backend.flush()
+
+    def sweep(self) -> int:
+        """
+        放置期限切れのセッションを削除
+
+        参照順に並んでいるので、先頭から期限切れでないものが出るまで見ればよい
+
+        Returns:
+            削除したセッション数
+        """
+        now = self._clock()
+        removed = 0
+        while self._sessions:
+            oldest_id = next(iter(self._sessions))
+            if not self._is_expired(oldest_id, now):
+                break
+            self._discard(oldest_id)
+            removed += 1
+
+        self.expired_count += removed
+        if self.backend is not None:
+            self.backend.delete_expired()
+        return removed
+
+    def get_stats(self) -> dict:
+        """保管庫の統計情報を取得"""
+        stats = {
+            "sessions": len(self._sessions),
+            "max_size": self.max_size,
+            "idle_ttl_seconds": self.idle_ttl,
+            "evicted_lru": self.evicted_count,
+            "expired_ttl": self.expired_count
+        }
+        if self.backend is not None:
+            stats["loaded_from_backend"] = self.loaded_count
+            stats["reloaded_stale"] = self.reloaded_count
+            if hasattr(self.backend, "get_stats"):
+                stats["backend"] = self.backend.get_stats()
+        return stats
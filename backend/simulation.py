@@ -0,0 +1,238 @@
+"""
+ソルバーの一括シミュレーション
+画面なしで、難易度のプリセットごとにシード付きのゲームをプロセスプールで並列に解かせ、
+終わったゲームから順に結果を流しつつ勝率・手数・ソルバーの時間を集計する
+
+使い方:
+    cd backend
+    python simulation.py --games 1000 --workers 4
+    python simulation.py --games 1000 --presets 上級 --solver area --no-guess
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from minesweeper import MinesweeperBoard, GameState
+from game_manager import DIFFICULTY_PRESETS
+from solver.solver_base import SolverBase
+from solver.solver_manager import SolverManager
+from solver.logical_solver import LogicalSolver
+from solver.exact_solver import ExactSolver
+
+# ソルバー名→ソルバーを作る関数（ワーカープロセスに渡すのは名前だけ）
+SOLVERS = {
+    "logical": LogicalSolver,
+    "area": lambda: LogicalSolver(use_area_analyzer=True),
+    "exact": ExactSolver,
+}
+
+# 1つのタスクでまとめて解くゲーム数（プロセス間のやり取りの回数を減らす）
+DEFAULT_CHUNK_SIZE = 20
+
+# ワーカー1つあたりの、同時に投入しておくタスク数（全タスクを一度に投入しない）
+TASKS_PER_WORKER = 4
+
+
+@dataclass(frozen=True, slots=True)
+class GameResult:
+    """1ゲームの結果"""
+    preset: str
+    seed: int
+    state: GameState  # 1000回の反復で終わらなかった場合はPLAYINGのまま
+    moves: int  # 最初の1手を含む実行した手の数
+    guesses: int  # 推測で掘った回数
+    solver_time: float  # 最初の1手のあとの、ソルバーで解いた時間（秒）
+
+
+@dataclass
+class SimulationStats:
+    """プリセットごとの集計"""
+    preset: str
+    games: int = 0
+    wins: int = 0
+    losses: int = 0
+    total_moves: int = 0
+    total_guesses: int = 0
+    total_solver_time: float = 0.0
+
+    def add(self, result: GameResult):
+        """ゲームの結果を集計に加える"""
+        self.games += 1
+        self.wins += result.state == GameState.WON
+        self.losses += result.state == GameState.LOST
+        self.total_moves += result.moves
+        self.total_guesses += result.guesses
+        self.total_solver_time += result.solver_time
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.games if self.games else 0.0
+
+    @property
+    def moves_per_game(self) -> float:
+        return self.total_moves / self.games if self.games else 0.0
+
+    @property
+    def guesses_per_game(self) -> float:
+        return self.total_guesses / self.games if self.games else 0.0
+
+    @property
+    def solver_time_per_game(self) -> float:
+        return self.total_solver_time / self.games if self.games else 0.0
+
+
+def create_solver(solver_name: str) -> SolverBase:
+    """ソルバー名からソルバーを作成"""
+    if solver_name not in SOLVERS:
+        raise ValueError(f"不明なソルバー: {solver_name}")
+    return SOLVERS[solver_name]()
+
+
+def play_game(preset: str, seed: int, solver_name: str = "exact", allow_guess: bool = True) -> GameResult:
+    """
+    シードから盤面を作り、中央を最初に掘ってからソルバーで最後まで（推測なしなら解けるところまで）進める
+
+    盤面はプリセットとシードだけで決まり、ソルバーも乱数を使わないので、結果は同じシードなら常に同じになる
+
+    Args:
+        preset: 難易度のプリセット名
+        seed: 乱数のシード
+        solver_name: ソルバー名
+        allow_guess: 確実な手がなくなったら推測で掘るか
+
+    Returns:
+        ゲームの結果
+    """
+    height, width, mine_count = DIFFICULTY_PRESETS[preset]
+    board = MinesweeperBoard(height, width, mine_count, seed=seed)
+    board.dig(height // 2, width // 2)
+
+    manager = SolverManager(create_solver(solver_name), allow_guess=allow_guess)
+    start = time.perf_counter()
+    commands = manager.solve_until_manual_needed(board)
+    solver_time = time.perf_counter() - start
+    return GameResult(preset, seed, board.get_game_state(), len(commands) + 1, manager.guess_count, solver_time)
+
+
+def play_games(preset: str, seeds: Sequence[int], solver_name: str, allow_guess: bool) -> List[GameResult]:
+    """複数のゲームを続けて解く（ワーカープロセスで実行する1タスク分）"""
+    return [play_game(preset, seed, solver_name, allow_guess) for seed in seeds]
+
+
+def iter_tasks(presets: Sequence[str], games: int, base_seed: int, chunk_size: int) -> Iterator[tuple]:
+    """(プリセット名, シードのリスト)のタスクを順に生成（各プリセットのシードはbase_seedから連番）"""
+    for preset in presets:
+        for start in range(0, games, chunk_size):
+            yield preset, list(range(base_seed + start, base_seed + min(start + chunk_size, games)))
+
+
+def run_simulation(presets: Sequence[str], games: int, solver_name: str = "exact", allow_guess: bool = True,
+                   workers: Optional[int] = None, base_seed: int = 0,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[GameResult]:
+    """
+    プリセットごとにgames個のゲームを解き、終わったゲームから順に結果を返す
+
+    同時に投入するタスクはワーカー数のTASKS_PER_WORKER倍までにするので、
+    ゲーム数が多くてもタスク・結果がメモリに溜まらない。
+    終わった順に返すので、結果の順番はシードの順とは限らない
+
+    Args:
+        presets: 難易度のプリセット名のリスト
+        games: プリセットごとのゲーム数
+        solver_name: ソルバー名
+        allow_guess: 確実な手がなくなったら推測で掘るか
+        workers: ワーカープロセス数（Noneならコア数、1ならプロセスプールを使わずこのプロセスで解く）
+        base_seed: 最初のゲームのシード
+        chunk_size: 1タスクでまとめて解くゲーム数
+
+    Yields:
+        ゲームの結果
+    """
+    for preset in presets:
+        if preset not in DIFFICULTY_PRESETS:
+            raise ValueError(f"不明なプリセット: {preset}")
+    create_solver(solver_name)  # ソルバー名の確認（ワーカーで失敗させない）
+
+    workers = workers or os.cpu_count() or 1
+    tasks = iter_tasks(presets, games, base_seed, chunk_size)
+    if workers == 1:
+        for preset, seeds in tasks:
+            yield from play_games(preset, seeds, solver_name, allow_guess)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for preset, seeds in tasks:
+            pending.add(executor.submit(play_games, preset, seeds, solver_name, allow_guess))
+            if len(pending) < workers * TASKS_PER_WORKER:
+                continue
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+def summarize(results: Iterator[GameResult], on_result=None) -> Dict[str, SimulationStats]:
+    """
+    結果を流しながらプリセットごとに集計
+
+    Args:
+        results: ゲームの結果のイテレータ
+        on_result: 結果ごとに(結果, そのプリセットの集計)で呼ばれる関数（進捗表示用）
+
+    Returns:
+        プリセット名→集計
+    """
+    stats: Dict[str, SimulationStats] = {}
+    for result in results:
+        preset_stats = stats.setdefault(result.preset, SimulationStats(result.preset))
+        preset_stats.add(result)
+        if on_result is not None:
+            on_result(result, preset_stats)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ソルバーの一括シミュレーション")
+    parser.add_argument("--games", type=int, default=1000, help="プリセットごとのゲーム数")
+    parser.add_argument("--presets", nargs="+", choices=list(DIFFICULTY_PRESETS), default=list(DIFFICULTY_PRESETS),
+                        help="シミュレーションする難易度")
+    parser.add_argument("--solver", choices=list(SOLVERS), default="exact", help="ソルバー")
+    parser.add_argument("--no-guess", action="store_true", help="推測せず、確実な手がなくなったら終了")
+    parser.add_argument("--workers", type=int, default=None, help="ワーカープロセス数（既定はコア数）")
+    parser.add_argument("--seed", type=int, default=0, help="最初のゲームのシード")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="1タスクのゲーム数")
+    parser.add_argument("--progress", type=int, default=100, help="このゲーム数ごとに途中経過を表示（0なら表示しない）")
+    args = parser.parse_args()
+
+    def show_progress(result: GameResult, preset_stats: SimulationStats):
+        if args.progress and preset_stats.games % args.progress == 0:
+            print(f"  {result.preset}: {preset_stats.games}/{args.games}ゲーム, 勝率 {preset_stats.win_rate:6.1%}",
+                  flush=True)
+
+    start = time.perf_counter()
+    results = run_simulation(args.presets, args.games, args.solver, not args.no_guess,
+                             args.workers, args.seed, args.chunk_size)
+    stats = summarize(results, show_progress)
+    elapsed = time.perf_counter() - start
+
+    print(f"=== シミュレーション結果 (ソルバー {args.solver}, 推測{'なし' if args.no_guess else 'あり'}, "
+          f"{args.games}ゲームずつ) ===")
+    for preset in args.presets:
+        preset_stats = stats[preset]
+        print(f"{preset}: 勝率 {preset_stats.win_rate:6.1%}, 敗北 {preset_stats.losses}, "
+              f"手数 {preset_stats.moves_per_game:7.1f}/ゲーム, 推測 {preset_stats.guesses_per_game:5.2f}/ゲーム, "
+              f"ソルバー {preset_stats.solver_time_per_game * 1000:8.2f} ms/ゲーム")
+    total_games = sum(preset_stats.games for preset_stats in stats.values())
+    print(f"合計 {total_games}ゲーム, {elapsed:.1f}秒 ({total_games / elapsed:.1f}ゲーム/秒)")
+
+
+if __name__ == "__main__":
+    main()
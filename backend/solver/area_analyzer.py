@@ -1,14 +1,28 @@
 """
 エリアベース論理解法アルゴリズム（第2版）
 エリアを削除せずに追加のみで管理し、セル→エリア辞書で効率的な重複検出を行う
+内部ではエリアをビットマスク（BitArea）で持ち、共通部分・差分・セル数をビット演算で求める
+追加・制約が厳しくなったエリアはワークリストに積み、不動点に達するまで他のエリアとマージする
 """
 
 from typing import List, Set, Tuple, Optional, Dict
 from dataclasses import dataclass
+from collections import deque
 
 # セルの座標を表す型エイリアス
 Cell = Tuple[int, int]  # (row, col)
 
+# マージで作ったエリアを残す最大セル数（1つの数字の周囲と同じ8マスまで）
+# 全体制約との差分のような大きいエリアまで残すと、エリア数が爆発的に増える
+# 同じ理由で、マージで作ったエリアは地雷数が確定した（min == max）ものだけ残す
+MAX_DERIVED_AREA_CELLS = 8
+
+# 削除済みエリア（None）がこの数以上かつ有効なエリア数以上になったら、エリアIDを詰め直す
+COMPACTION_MIN_TOMBSTONES = 256
+
+# 1回の呼び出しで行うマージ数の目安（これを超えたら、残ったワークリストは次の呼び出しで処理する）
+MAX_MERGES_PER_CALL = 2000
+
 
 @dataclass
 class Area:
@@ -38,6 +52,10 @@ class Area:
         """全セルが安全確定か"""
         return self.max_mines == 0
 
+    def is_unconstrained(self) -> bool:
+        """地雷数に制約がないか（0〜セル数なので何の情報も持たない）"""
+        return self.min_mines == 0 and self.max_mines == len(self.cells)
+
     def overlaps_with(self, other: 'Area') -> bool:
         """他のエリアと重複があるか"""
         return bool(self.cells & other.cells)
@@ -47,32 +65,96 @@ class Area:
         return self.cells & other.cells
 
 
-class AreaAnalyzer:
-    """エリアベースの論理解法アルゴリズム（第2版）"""
+@dataclass(frozen=True, slots=True)
+class BitArea:
+    """
+    ビットマスクで表したエリア（AreaAnalyzer内部用）
 
-    def __init__(self):
-        """空のAreaAnalyzerを初期化"""
-        self.areas: List[Optional[Area]] = []  # エリアリスト（削除されたエリアはNone）
-        self.cell_to_areas: Dict[Cell, List[int]] = {}  # セル→エリアID一覧のマッピング
-        self.next_area_id = 0  # 次に割り当てるエリアID
+    ビット番号はAreaAnalyzerがセルに割り当てた番号。
+    共通部分・差分は & と & ~、セル数は bit_count() の1回で求まる
+    """
+    mask: int
+    min_mines: int
+    max_mines: int
 
-    def _find_same_cell_area(self, area: Area) -> Optional[int]:
-        """同じセル集合を持つ既存エリアを探し、あればそのIDを返す"""
-        if not area.cells:
-            return None
+    @property
+    def size(self) -> int:
+        """セル数"""
+        return self.mask.bit_count()
 
-        # 1つの代表セルで既存エリアを検索
-        sample_cell = next(iter(area.cells))
-        if sample_cell not in self.cell_to_areas:
-            return None
+    def is_all_mines(self) -> bool:
+        """全セルが地雷確定か"""
+        return self.min_mines == self.size
+
+    def is_all_safe(self) -> bool:
+        """全セルが安全確定か"""
+        return self.max_mines == 0
+
+    def is_fully_determined(self) -> bool:
+        """地雷数が完全に確定しているか（min == max）"""
+        return self.min_mines == self.max_mines
+
+    def is_unconstrained(self) -> bool:
+        """地雷数に制約がないか（0〜セル数なので何の情報も持たない）"""
+        return self.min_mines == 0 and self.max_mines == self.size
 
-        for existing_id in self.cell_to_areas[sample_cell]:
-            if self.areas[existing_id] is not None:
-                existing_area = self.areas[existing_id]
-                if existing_area.cells == area.cells:
-                    return existing_id
 
-        return None
+class AreaAnalyzer:
+    """エリアベースの論理解法アルゴリズム（第2版）"""
+
+    def __init__(self, max_merges_per_call: int = MAX_MERGES_PER_CALL):
+        """
+        空のAreaAnalyzerを初期化
+
+        Args:
+            max_merges_per_call: 1回の呼び出しで行うマージ数の上限
+        """
+        self.max_merges_per_call = max_merges_per_call
+        self.last_merge_count = 0  # 直前の呼び出しで行ったマージ数
+        self.areas: List[Optional[BitArea]] = []  # エリアリスト（削除されたエリアはNone）
+        self.cell_to_areas: Dict[Cell, Set[int]] = {}  # セル→エリアID集合のマッピング
+        self.next_area_id = 0  # 次に割り当てるエリアID
+        self._tombstone_count = 0  # self.areas中の削除済みエリア（None）の数
+        self._mask_to_area: Dict[int, int] = {}  # セル集合（ビットマスク）→エリアID
+        self._cell_bits: Dict[Cell, int] = {}  # セル→ビット番号
+        self._bit_cells: List[Cell] = []  # ビット番号→セル
+        self._known_safe = 0   # 安全と分かっているセルのマスク（エリアからは除いてある）
+        self._known_mines = 0  # 地雷と分かっているセルのマスク（エリアからは除いてある）
+        self._worklist = deque()  # 他のエリアとまだマージしていないエリアID
+        self._worklist_ids: Set[int] = set()  # ワークリストにあるエリアID（重複防止用）
+
+    def _cells_to_mask(self, cells: Set[Cell]) -> int:
+        """セル集合をビットマスクに変換（初めて見るセルにはビット番号を割り当てる）"""
+        mask = 0
+        for cell in cells:
+            bit = self._cell_bits.get(cell)
+            if bit is None:
+                bit = len(self._bit_cells)
+                self._cell_bits[cell] = bit
+                self._bit_cells.append(cell)
+            mask |= 1 << bit
+        return mask
+
+    def _mask_to_cells(self, mask: int) -> Set[Cell]:
+        """ビットマスクをセル集合に変換"""
+        cells = set()
+        while mask:
+            lowest = mask & -mask
+            cells.add(self._bit_cells[lowest.bit_length() - 1])
+            mask ^= lowest
+        return cells
+
+    def _to_bit_area(self, area: Area) -> BitArea:
+        """AreaをBitAreaに変換"""
+        return BitArea(self._cells_to_mask(area.cells), area.min_mines, area.max_mines)
+
+    def _to_area(self, area: BitArea) -> Area:
+        """BitAreaをAreaに変換"""
+        return Area(self._mask_to_cells(area.mask), area.min_mines, area.max_mines)
+
+    def _find_same_cell_area(self, area: BitArea) -> Optional[int]:
+        """同じセル集合を持つ既存エリアを探し、あればそのIDを返す"""
+        return self._mask_to_area.get(area.mask)
 
     def _update_area_constraints(self, area_id: int, new_min: int, new_max: int):
         """既存エリアの制約をより厳しい値に更新"""
@@ -83,11 +165,20 @@ class AreaAnalyzer:
         updated_min = max(existing_area.min_mines, new_min)
         updated_max = min(existing_area.max_mines, new_max)
 
-        # 制約が無効になった場合（min > max）は何もしない
-        if updated_min <= updated_max:
-            self.areas[area_id] = Area(existing_area.cells, updated_min, updated_max)
+        # 制約が無効になった場合（min > max）・変わらない場合は何もしない
+        if updated_min > updated_max:
+            return
+        if (updated_min, updated_max) != (existing_area.min_mines, existing_area.max_mines):
+            self.areas[area_id] = BitArea(existing_area.mask, updated_min, updated_max)
+            self._push_work(area_id)
+
+    def _push_work(self, area_id: int):
+        """エリアをワークリストに積む（既に積んであれば何もしない）"""
+        if area_id not in self._worklist_ids:
+            self._worklist_ids.add(area_id)
+            self._worklist.append(area_id)
 
-    def _add_area(self, area: Area) -> int:
+    def _add_area(self, area: BitArea) -> int:
         """エリアを追加し、セル→エリア辞書を更新"""
         # 同じセル集合のエリアをチェック
         same_cell_id = self._find_same_cell_area(area)
@@ -101,13 +192,15 @@ class AreaAnalyzer:
 
         # エリアリストに追加
         self.areas.append(area)
+        self._mask_to_area[area.mask] = area_id
 
         # セル→エリア辞書を更新
-        for cell in area.cells:
+        for cell in self._mask_to_cells(area.mask):
             if cell not in self.cell_to_areas:
-                self.cell_to_areas[cell] = []
-            self.cell_to_areas[cell].append(area_id)
+                self.cell_to_areas[cell] = set()
+            self.cell_to_areas[cell].add(area_id)
 
+        self._push_work(area_id)
         return area_id
 
     def _remove_area(self, area_id: int):
@@ -118,149 +211,335 @@ class AreaAnalyzer:
         area = self.areas[area_id]
 
         # セル→エリア辞書からエリアIDを削除
-        for cell in area.cells:
+        for cell in self._mask_to_cells(area.mask):
             if cell in self.cell_to_areas:
-                if area_id in self.cell_to_areas[cell]:
-                    self.cell_to_areas[cell].remove(area_id)
+                self.cell_to_areas[cell].discard(area_id)
 
-        # エリアリストからエリアを削除（メモリ効率のためNoneに）
+        # エリアリストからエリアを削除（IDを保つためNoneにし、後でまとめて詰める）
+        del self._mask_to_area[area.mask]
         self.areas[area_id] = None
+        self._tombstone_count += 1
+
+    def _compact_if_needed(self):
+        """削除済みエリアが増えたら、エリアIDを詰め直してNoneを解放"""
+        live_count = len(self.areas) - self._tombstone_count
+        if self._tombstone_count >= max(COMPACTION_MIN_TOMBSTONES, live_count):
+            self.compact()
+
+    def compact(self):
+        """
+        削除済みエリア（None）を取り除き、エリアIDを0から詰め直す
+
+        エリアIDを持ったまま呼び出さないこと（呼び出し後は別のエリアを指す）
+        """
+        new_ids = {}
+        live_areas = []
+        for area_id, area in enumerate(self.areas):
+            if area is not None:
+                new_ids[area_id] = len(live_areas)
+                live_areas.append(area)
+
+        self.areas = live_areas
+        self.next_area_id = len(live_areas)
+        self._tombstone_count = 0
+        self._mask_to_area = {area.mask: area_id for area_id, area in enumerate(live_areas)}
+        self.cell_to_areas = {cell: {new_ids[area_id] for area_id in area_ids}
+                              for cell, area_ids in self.cell_to_areas.items() if area_ids}
+        self._worklist = deque(new_ids[area_id] for area_id in self._worklist if area_id in new_ids)
+        self._worklist_ids = set(self._worklist)
+
+    def _shrink_area(self, area_id: int, shrunk_area: BitArea):
+        """
+        エリアを、セルを減らしたエリアに置き換える
 
-    def _get_overlapping_area_ids(self, target_area: Area) -> Set[int]:
+        減ったセルはセル→エリア辞書から取り除き済みであること。
+        残ったセルの辞書はそのまま使えるので、大きいエリアでも作り直さずに済む
+        """
+        same_cell_id = self._mask_to_area.get(shrunk_area.mask)
+        if same_cell_id is not None:
+            # 同じセル集合のエリアがあれば、そちらの制約を厳しくしてこのエリアは削除
+            self._remove_area(area_id)
+            self._update_area_constraints(same_cell_id, shrunk_area.min_mines, shrunk_area.max_mines)
+            return
+
+        del self._mask_to_area[self.areas[area_id].mask]
+        self._mask_to_area[shrunk_area.mask] = area_id
+        self.areas[area_id] = shrunk_area
+        self._push_work(area_id)
+
+    def _get_overlapping_area_ids(self, target_area: BitArea) -> Set[int]:
         """指定エリアと重複する既存エリアのIDを取得"""
         overlapping_ids = set()
 
-        for cell in target_area.cells:
+        for cell in self._mask_to_cells(target_area.mask):
             if cell in self.cell_to_areas:
                 overlapping_ids.update(self.cell_to_areas[cell])
 
         return overlapping_ids
 
-    def _merge_two_areas(self, area1: Area, area2: Area) -> Tuple[List[Area], Set[Cell], Set[Cell]]:
+    @staticmethod
+    def _classify_area(area: BitArea, new_areas: List[BitArea]) -> Tuple[int, int]:
+        """
+        エリアを全て安全・全て地雷・それ以外に振り分ける
+
+        それ以外（情報を持たないエリアを除く）はnew_areasに追加する
+
+        Returns:
+            (確定安全セルのマスク, 確定地雷セルのマスク)
+        """
+        if area.is_all_safe():
+            return area.mask, 0
+        if area.is_all_mines():
+            return 0, area.mask
+        if not area.is_unconstrained():
+            new_areas.append(area)
+        return 0, 0
+
+    def _merge_two_areas(self, area1: BitArea, area2: BitArea) -> Tuple[List[BitArea], int, int]:
         """
         2つのエリアをマージして新エリアリストを作成
 
         Returns:
-            (新エリアリスト, 確定安全セル, 確定地雷セル)
+            (新エリアリスト, 確定安全セルのマスク, 確定地雷セルのマスク)
         """
-        overlap = area1.get_overlap_cells(area2)
-        area1_only = area1.cells - overlap
-        area2_only = area2.cells - overlap
+        overlap = area1.mask & area2.mask
+        area1_only = area1.mask & ~overlap
+        area2_only = area2.mask & ~overlap
+        area1_only_size = area1_only.bit_count()
+        area2_only_size = area2_only.bit_count()
 
         new_areas = []
-        safe_cells = set()
-        mine_cells = set()
+        safe_mask = 0
+        mine_mask = 0
 
         # A ∩ B（重複部分）
         if overlap:
             min_overlap = max(0,
-                            area1.min_mines - len(area1_only),
-                            area2.min_mines - len(area2_only))
-            max_overlap = min(len(overlap),
+                            area1.min_mines - area1_only_size,
+                            area2.min_mines - area2_only_size)
+            max_overlap = min(overlap.bit_count(),
                             area1.max_mines,
                             area2.max_mines)
 
             if min_overlap <= max_overlap:
-                area = Area(overlap, min_overlap, max_overlap)
-                if area.is_all_safe():
-                    safe_cells.update(area.cells)
-                elif area.is_all_mines():
-                    mine_cells.update(area.cells)
-                else:
-                    new_areas.append(area)
+                safe, mines = self._classify_area(BitArea(overlap, min_overlap, max_overlap), new_areas)
+                safe_mask |= safe
+                mine_mask |= mines
 
         # A \ B（area1のみ）
         if area1_only:
             min_a_only = max(0, area1.min_mines - max_overlap if overlap else area1.min_mines)
-            max_a_only = min(len(area1_only), area1.max_mines - min_overlap if overlap else area1.max_mines)
+            max_a_only = min(area1_only_size, area1.max_mines - min_overlap if overlap else area1.max_mines)
 
             if min_a_only <= max_a_only:
-                area = Area(area1_only, min_a_only, max_a_only)
-                if area.is_all_safe():
-                    safe_cells.update(area.cells)
-                elif area.is_all_mines():
-                    mine_cells.update(area.cells)
-                else:
-                    new_areas.append(area)
+                safe, mines = self._classify_area(BitArea(area1_only, min_a_only, max_a_only), new_areas)
+                safe_mask |= safe
+                mine_mask |= mines
 
         # B \ A（area2のみ）
         if area2_only:
             min_b_only = max(0, area2.min_mines - max_overlap if overlap else area2.min_mines)
-            max_b_only = min(len(area2_only), area2.max_mines - min_overlap if overlap else area2.max_mines)
+            max_b_only = min(area2_only_size, area2.max_mines - min_overlap if overlap else area2.max_mines)
 
             if min_b_only <= max_b_only:
-                area = Area(area2_only, min_b_only, max_b_only)
-                if area.is_all_safe():
-                    safe_cells.update(area.cells)
-                elif area.is_all_mines():
-                    mine_cells.update(area.cells)
+                safe, mines = self._classify_area(BitArea(area2_only, min_b_only, max_b_only), new_areas)
+                safe_mask |= safe
+                mine_mask |= mines
+
+        return new_areas, safe_mask, mine_mask
+
+    def _without_known_cells(self, area: BitArea) -> Optional[BitArea]:
+        """既知のセルを除いたエリアを作成（セルが残らない・矛盾する場合はNone）"""
+        known_mask = area.mask & (self._known_safe | self._known_mines)
+        if not known_mask:
+            return area
+
+        mask = area.mask & ~known_mask
+        known_mine_count = (known_mask & self._known_mines).bit_count()
+        min_mines = max(0, area.min_mines - known_mine_count)
+        max_mines = min(mask.bit_count(), area.max_mines - known_mine_count)
+        if not mask or min_mines > max_mines:
+            return None
+        return BitArea(mask, min_mines, max_mines)
+
+    def apply_known_cells(self, safe_cells: Set[Cell], mine_cells: Set[Cell]) -> Tuple[Set[Cell], Set[Cell]]:
+        """
+        安全・地雷と分かったセルを全エリアから取り除き、エリアを縮める
+
+        縮めたエリアが全て安全・全て地雷になったら、そのセルも同様に取り除く（連鎖的に確定）
+
+        Args:
+            safe_cells: 安全と分かったセル
+            mine_cells: 地雷と分かったセル
+
+        Returns:
+            (新たに確定した安全セル, 新たに確定した地雷セル)のタプル（引数のセルは含まない）
+        """
+        new_safe, new_mines = self._apply_known_masks(self._cells_to_mask(safe_cells),
+                                                      self._cells_to_mask(mine_cells))
+        found_safe, found_mines = self._propagate()
+        self._compact_if_needed()
+        return self._mask_to_cells(new_safe | found_safe), self._mask_to_cells(new_mines | found_mines)
+
+    def _apply_known_masks(self, safe_mask: int, mine_mask: int) -> Tuple[int, int]:
+        """apply_known_cellsのマスク版（新たに確定したセルのマスクを返す）"""
+        new_safe_mask = 0
+        new_mine_mask = 0
+        pending_safe = safe_mask & ~self._known_safe
+        pending_mines = mine_mask & ~self._known_mines
+
+        while pending_safe or pending_mines:
+            self._known_safe |= pending_safe
+            self._known_mines |= pending_mines
+            determined_mask = pending_safe | pending_mines
+
+            affected_ids = set()
+            for cell in self._mask_to_cells(determined_mask):
+                affected_ids.update(self.cell_to_areas.pop(cell, ()))
+
+            found_safe = 0
+            found_mines = 0
+            for area_id in affected_ids:
+                area = self.areas[area_id]
+                if area is None:
+                    continue
+
+                mask = area.mask & ~determined_mask
+                mine_count = (area.mask & pending_mines).bit_count()
+                min_mines = max(0, area.min_mines - mine_count)
+                max_mines = min(mask.bit_count(), area.max_mines - mine_count)
+                if not mask or min_mines > max_mines:
+                    self._remove_area(area_id)
+                    continue
+
+                shrunk_area = BitArea(mask, min_mines, max_mines)
+                if shrunk_area.is_all_safe():
+                    found_safe |= mask
+                    self._remove_area(area_id)
+                elif shrunk_area.is_all_mines():
+                    found_mines |= mask
+                    self._remove_area(area_id)
+                elif shrunk_area.is_unconstrained():
+                    self._remove_area(area_id)
                 else:
-                    new_areas.append(area)
+                    self._shrink_area(area_id, shrunk_area)
 
-        return new_areas, safe_cells, mine_cells
+            pending_safe = found_safe & ~self._known_safe
+            pending_mines = found_mines & ~self._known_mines & ~pending_safe
+            new_safe_mask |= pending_safe
+            new_mine_mask |= pending_mines
 
-    def _remove_areas_overlapping_with_cells(self, determined_cells: Set[Cell]):
-        """確定セルと重複するエリアを削除"""
-        areas_to_remove = set()
+        return new_safe_mask, new_mine_mask
 
-        for cell in determined_cells:
-            if cell in self.cell_to_areas:
-                areas_to_remove.update(self.cell_to_areas[cell])
+    def _propagate(self) -> Tuple[int, int]:
+        """
+        ワークリストのエリアを重複する全エリアとマージし、不動点に達するまで繰り返す
 
-        for area_id in areas_to_remove:
-            self._remove_area(area_id)
+        マージで新しくできたエリア・制約が厳しくなったエリアはワークリストに積まれる。
+        マージ数が上限に達したら、残りのワークリストは次の呼び出しに持ち越す
+        （上限は新しいエリアを取り出すときに見るので、1エリア分だけ超えることがある）
+
+        Returns:
+            (確定安全セルのマスク, 確定地雷セルのマスク)
+        """
+        safe_mask = 0
+        mine_mask = 0
+        merge_count = 0
+
+        while self._worklist and merge_count < self.max_merges_per_call:
+            area_id = self._worklist.popleft()
+            self._worklist_ids.discard(area_id)
+            area = self.areas[area_id]
+            if area is None:
+                continue
+
+            # 制約が厳しくなって確定したエリア
+            if area.is_all_safe() or area.is_all_mines():
+                determined_safe = area.mask if area.is_all_safe() else 0
+                determined_mines = area.mask if area.is_all_mines() else 0
+                cascade_safe, cascade_mines = self._apply_known_masks(determined_safe, determined_mines)
+                safe_mask |= determined_safe | cascade_safe
+                mine_mask |= determined_mines | cascade_mines
+                continue
+
+            for other_id in self._get_overlapping_area_ids(area):
+                # ワークリストに残っているエリアとは、そちらを処理するときにマージする
+                other_area = self.areas[other_id]
+                if other_id == area_id or other_area is None or other_id in self._worklist_ids:
+                    continue
+
+                merge_count += 1
+                new_areas, merged_safe, merged_mines = self._merge_two_areas(area, other_area)
+
+                # 地雷数が確定した新エリアだけ追加（大きすぎるエリアは残さない）
+                for new_area in new_areas:
+                    if new_area.is_fully_determined() and new_area.size <= MAX_DERIVED_AREA_CELLS:
+                        self._add_area(new_area)
+
+                if merged_safe or merged_mines:
+                    cascade_safe, cascade_mines = self._apply_known_masks(merged_safe, merged_mines)
+                    safe_mask |= merged_safe | cascade_safe
+                    mine_mask |= merged_mines | cascade_mines
+
+                # 確定セルを取り除いてこのエリアが変わったら、残りは積み直した後で処理する
+                if self.areas[area_id] is not area:
+                    break
+
+        self.last_merge_count = merge_count
+        return safe_mask, mine_mask
+
+    def has_pending_work(self) -> bool:
+        """マージ数の上限で持ち越したワークリストが残っているか"""
+        return bool(self._worklist)
+
+    def propagate(self) -> Tuple[Set[Cell], Set[Cell]]:
+        """
+        持ち越したワークリストの処理を続ける（1回の呼び出しのマージ数には上限がある）
+
+        Returns:
+            (確定した安全セル, 確定した地雷セル)のタプル
+        """
+        safe_mask, mine_mask = self._propagate()
+        self._compact_if_needed()
+        return self._mask_to_cells(safe_mask), self._mask_to_cells(mine_mask)
 
     def add_constraint_area(self, new_area: Area) -> Tuple[Set[Cell], Set[Cell]]:
         """
-        制約エリアを追加し、重複エリアとマージ処理を実行
+        制約エリアを追加し、不動点に達するまで重複エリアとのマージを繰り返す
+
+        既知のセルは取り除いてから追加し、確定したセルは全エリアから取り除く。
+        行ったマージ数は last_merge_count に入る
 
         Returns:
             (確定した安全セル, 確定した地雷セル)のタプル
         """
-        # 重複エリアIDを取得
-        overlapping_ids = self._get_overlapping_area_ids(new_area)
-
-        all_safe_cells = set()
-        all_mine_cells = set()
-
-        # 重複エリアがある場合はマージ処理
-        if overlapping_ids:
-            # 各重複エリアと個別にマージ
-            for area_id in overlapping_ids:
-                if self.areas[area_id] is not None:  # エリアが削除されていない場合のみ
-                    existing_area = self.areas[area_id]
-                    new_areas, safe_cells, mine_cells = self._merge_two_areas(new_area, existing_area)
-
-                    # 確定セルを累積
-                    all_safe_cells.update(safe_cells)
-                    all_mine_cells.update(mine_cells)
-
-                    # 新エリアを追加
-                    for area in new_areas:
-                        self._add_area(area)
-
-                    # 確定セルがある場合、即座に重複エリアを削除
-                    if safe_cells or mine_cells:
-                        determined_cells = safe_cells | mine_cells
-                        self._remove_areas_overlapping_with_cells(determined_cells)
+        self.last_merge_count = 0
+        bit_area = self._without_known_cells(self._to_bit_area(new_area))
+        if bit_area is None:
+            return set(), set()
+
+        safe_mask = 0
+        mine_mask = 0
+        if bit_area.is_all_safe():
+            safe_mask = bit_area.mask
+        elif bit_area.is_all_mines():
+            mine_mask = bit_area.mask
         else:
-            # 重複エリアがない場合は単純に追加
-            if new_area.is_all_safe():
-                all_safe_cells.update(new_area.cells)
-            elif new_area.is_all_mines():
-                all_mine_cells.update(new_area.cells)
-            else:
-                self._add_area(new_area)
+            self._add_area(bit_area)
 
-        return all_safe_cells, all_mine_cells
+        cascade_safe, cascade_mines = self._apply_known_masks(safe_mask, mine_mask)
+        found_safe, found_mines = self._propagate()
+        self._compact_if_needed()
+        return (self._mask_to_cells(safe_mask | cascade_safe | found_safe),
+                self._mask_to_cells(mine_mask | cascade_mines | found_mines))
 
     def get_area_count(self) -> int:
         """現在のアクティブなエリア数を取得"""
-        return sum(1 for area in self.areas if area is not None)
+        return len(self.areas) - self._tombstone_count
 
     def get_active_areas(self) -> List[Area]:
         """現在のアクティブなエリアのリストを取得"""
-        return [area for area in self.areas if area is not None]
+        return [self._to_area(area) for area in self.areas if area is not None]
 
     def reset(self, width: int = 0, height: int = 0, total_mines: int = 0) -> Tuple[Set[Cell], Set[Cell]]:
         """
@@ -278,6 +557,14 @@ class AreaAnalyzer:
         self.areas.clear()
         self.cell_to_areas.clear()
         self.next_area_id = 0
+        self._tombstone_count = 0
+        self._mask_to_area.clear()
+        self._cell_bits.clear()
+        self._bit_cells.clear()
+        self._known_safe = 0
+        self._known_mines = 0
+        self._worklist.clear()
+        self._worklist_ids.clear()
         
         # 全体制約エリアを追加
         if width > 0 and height > 0:
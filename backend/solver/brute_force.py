@@ -0,0 +1,43 @@
+"""
+総当たりの地雷配置の列挙（テストでソルバーの結果と比較する用）
+小さい盤面で、未発見のマスへの地雷の置き方を全て試して数字と矛盾しないものを求める
+"""
+
+from itertools import combinations
+from typing import Iterator, List, Tuple
+import sys
+import os
+
+# 親ディレクトリのminesweeperモジュールをインポートするための設定
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from minesweeper import CellState
+from .area_analyzer import Cell
+from .solver_board_view import SolverBoardView
+
+
+def hidden_cells(view: SolverBoardView) -> List[Cell]:
+    """未発見のマスの座標リスト（行優先の順）"""
+    return [(row, col) for row in range(view.height) for col in range(view.width)
+            if view.cell_states[row][col] == CellState.HIDDEN]
+
+
+def consistent_mine_layouts(view: SolverBoardView) -> Iterator[Tuple[Cell, ...]]:
+    """
+    未発見のマスへの地雷の置き方のうち、発見済みのマスの数字と矛盾しないものを全て列挙
+
+    フラグ付きのマスは地雷として扱い、残りの地雷を未発見のマスに置く
+
+    Yields:
+        未発見のマスのうち地雷を置いたマスのタプル
+    """
+    hidden = hidden_cells(view)
+    flagged = {(row, col) for row in range(view.height) for col in range(view.width)
+               if view.cell_states[row][col] == CellState.FLAGGED}
+    numbers = [(row, col) for row in range(view.height) for col in range(view.width)
+               if view.cell_states[row][col] == CellState.REVEALED]
+
+    for mines in combinations(hidden, view.mine_count - len(flagged)):
+        mine_set = set(mines) | flagged
+        if all(sum(cell in mine_set for cell in view.get_neighbors(row, col)) == view.get_mine_number(row, col)
+               for row, col in numbers):
+            yield mines
@@ -0,0 +1,125 @@
+"""
+完全列挙ソルバー
+論理ソルバー（エリア解析）で手がなくなったら、境界の連結成分ごとに矛盾のない地雷配置を
+バックトラックで全て数え上げ、盤面全体の地雷数と組み合わせて確実に安全・地雷のセルを求める
+"""
+
+from typing import List, Set, Tuple
+from collections import deque
+
+from .area_analyzer import Area, Cell
+from .logical_solver import LogicalSolver
+from .probability import MineProbabilities, ProbabilityEngine, MAX_COMPONENT_CELLS, TIME_BUDGET
+from .solver_command import SolverCommand, SolverAction
+from .solver_base import SolverBase
+
+
+class ExactSolver(SolverBase):
+    """
+    論理ソルバー（エリア解析）で手がなくなったら、地雷配置を数え上げて確実な手を求めるソルバー
+
+    数え上げと盤面全体の地雷数での重み付けはProbabilityEngineで行う。
+    時間・大きさの上限を超えた成分がある場合は、盤面全体の地雷数は使わず、
+    数え上げられた成分の中だけで確実なセルを求める
+    """
+
+    def __init__(self, time_budget: float = TIME_BUDGET, max_component_cells: int = MAX_COMPONENT_CELLS):
+        super().__init__()
+        self.name = "Exact Enumeration Solver"
+        self.probability_engine = ProbabilityEngine(time_budget, max_component_cells)
+        self.logical_solver = LogicalSolver(use_area_analyzer=True)
+        self.action_queue = deque()  # 数え上げで確定した行動のキュー（SolverCommand）
+        self._queued_commands: Set[SolverCommand] = set()  # キューにある行動（重複検出用）
+        self.last_fallback = False  # 直前の分析で上限を超えた成分があったか
+
+    def set_board(self, solver_board_view):
+        """盤面を設定（論理ソルバーにも同じ盤面を設定）"""
+        super().set_board(solver_board_view)
+        self.logical_solver.set_board(solver_board_view)
+
+    def find_moves(self):
+        """
+        論理ソルバーで手を探し、なければ地雷配置の数え上げで確実な手を探す
+        基底クラスのfind_movesメソッドの実装
+        """
+        if self.board_view is None:
+            raise ValueError("盤面が設定されていません")
+
+        self.logical_solver.find_moves()
+        if self.logical_solver.has_moves() or self.action_queue:
+            return
+
+        safe_cells, mine_cells = self._find_certain_cells()
+        for row, col in sorted(safe_cells):
+            self._add_to_queue(SolverCommand.dig(row, col))
+        for row, col in sorted(mine_cells):
+            self._add_to_queue(SolverCommand.flag(row, col))
+
+    def _find_certain_cells(self) -> Tuple[Set[Cell], Set[Cell]]:
+        """
+        地雷配置を数え上げ、確実に安全・地雷のセルを求める
+
+        Returns:
+            (確実に安全なセル, 確実に地雷のセル)のタプル
+        """
+        probabilities = self.analyze_probabilities()
+        self.last_fallback = self.probability_engine.last_unsolved_count > 0
+        return probabilities.get_certain_cells()
+
+    def analyze_probabilities(self) -> MineProbabilities:
+        """境界の数字の制約から、未発見の各セルが地雷である確率を求める"""
+        return self.probability_engine.analyze_view(self.board_view, self._current_constraints())
+
+    def _current_constraints(self) -> List[Area]:
+        """境界の全ての数字について、現在の盤面での制約エリアを求める"""
+        constraints = []
+        for component in self.logical_solver.frontier.components.values():
+            for row, col in component.constraints:
+                area = self.logical_solver.get_constraint_area(row, col)
+                if area is not None:
+                    constraints.append(area)
+        return constraints
+
+    def get_next_move(self) -> SolverCommand:
+        """
+        次の確実な手を取得（論理ソルバーの手を優先）
+
+        Returns:
+            実行すべきソルバーコマンド
+        """
+        if self.board_view is None:
+            raise ValueError("盤面が設定されていません")
+
+        command = self.logical_solver.get_next_move()
+        if command.action != SolverAction.NO_MOVE:
+            return command
+
+        while self.action_queue:
+            command = self.action_queue.popleft()
+            self._queued_commands.discard(command)
+            if self._is_command_valid(command):
+                return command
+
+        return SolverCommand.no_move()
+
+    def _add_to_queue(self, command: SolverCommand):
+        """重複チェックしてキューに追加"""
+        if command not in self._queued_commands:
+            self._queued_commands.add(command)
+            self.action_queue.append(command)
+
+    def has_moves(self) -> bool:
+        """
+        実行可能な手があるかチェック
+        基底クラスのhas_movesメソッドの実装
+        """
+        return self.logical_solver.has_moves() or len(self.action_queue) > 0
+
+    def reset(self):
+        """ソルバーの状態をリセット"""
+        self.logical_solver.reset()
+        self.action_queue.clear()
+        self._queued_commands.clear()
+        self.probability_engine.clear_cache()
+        self.last_fallback = False
+        self.board_view = None
@@ -0,0 +1,173 @@
+"""
+境界の連結成分分解
+未発見の境界セルを、共通の数字（制約）でつながる連結成分に分け、成分ごとにAreaAnalyzerで分析する
+手を打ったあとの処理は変化したセルを含む成分だけで済み、他の成分の分析結果はそのまま使われる
+"""
+
+from typing import Dict, List, Set, Tuple
+
+from .area_analyzer import AreaAnalyzer, Area, Cell
+
+
+class FrontierComponent:
+    """境界の連結成分1つ分の情報と、その成分専用のAreaAnalyzer"""
+
+    def __init__(self, component_id: int):
+        self.component_id = component_id
+        self.cells: Set[Cell] = set()  # 安全・地雷がまだ分からないセル
+        self.constraints: Dict[Cell, Area] = {}  # 数字のセル→その数字の制約エリア（追加したときのまま）
+        self.known_safe: Set[Cell] = set()  # 安全と分かったセル（発見済みを含む）
+        self.known_mines: Set[Cell] = set()  # 地雷と分かったセル（フラグ付きを含む）
+        self.analyzer = AreaAnalyzer()
+        self.version = 0  # 成分が変化するたびに増える（分析結果のキャッシュ用）
+
+    def mark_known(self, safe_cells: Set[Cell], mine_cells: Set[Cell]):
+        """安全・地雷と分かったセルを記録"""
+        if safe_cells or mine_cells:
+            self.known_safe |= safe_cells
+            self.known_mines |= mine_cells
+            self.cells -= safe_cells
+            self.cells -= mine_cells
+            self.version += 1
+
+
+class FrontierDecomposition:
+    """
+    境界の連結成分の管理
+
+    数字の制約エリアを追加すると、そのセルを含む成分に加わる（複数の成分にまたがれば1つにまとめる）。
+    成分は分割しないので、セルが確定して実際には2つに分かれた成分も1つのまま扱う
+    """
+
+    def __init__(self):
+        self.components: Dict[int, FrontierComponent] = {}  # 成分ID→成分
+        self.cell_to_component: Dict[Cell, int] = {}  # 成分に属するセル（未発見のもの）→成分ID
+        self.next_component_id = 0
+        self.last_merge_count = 0  # 直前の呼び出しで各成分のAreaAnalyzerが行ったマージ数の合計
+
+    def reset(self):
+        """全ての成分を破棄"""
+        self.components.clear()
+        self.cell_to_component.clear()
+        self.next_component_id = 0
+        self.last_merge_count = 0
+
+    def get_components(self) -> List[FrontierComponent]:
+        """まだ分からないセルが残っている成分のリストを取得"""
+        return [component for component in self.components.values() if component.cells]
+
+    def apply_known_cells(self, safe_cells: Set[Cell], mine_cells: Set[Cell]) -> Tuple[Set[Cell], Set[Cell]]:
+        """
+        発見済み・フラグ付きになったセルを、そのセルを含む成分だけに反映
+
+        Args:
+            safe_cells: 発見済みになったセル
+            mine_cells: フラグ付きになったセル
+
+        Returns:
+            (新たに確定した安全セル, 新たに確定した地雷セル)のタプル
+        """
+        by_component: Dict[int, Tuple[Set[Cell], Set[Cell]]] = {}
+        for cells, index in ((safe_cells, 0), (mine_cells, 1)):
+            for cell in cells:
+                # 発見済み・フラグ付きのセルは今後の制約エリアに入らないので、対応を外す
+                component_id = self.cell_to_component.pop(cell, None)
+                if component_id is not None:
+                    by_component.setdefault(component_id, (set(), set()))[index].add(cell)
+
+        all_safe, all_mines = set(), set()
+        self.last_merge_count = 0
+        for component_id, (component_safe, component_mines) in by_component.items():
+            component = self.components[component_id]
+            found_safe, found_mines = component.analyzer.apply_known_cells(component_safe, component_mines)
+            self.last_merge_count += component.analyzer.last_merge_count
+            component.mark_known(component_safe | found_safe, component_mines | found_mines)
+            all_safe |= found_safe
+            all_mines |= found_mines
+
+        return all_safe, all_mines
+
+    def add_constraint(self, number_cell: Cell, area: Area) -> Tuple[Set[Cell], Set[Cell]]:
+        """
+        数字の制約エリアを、そのセルを含む成分に追加
+
+        Args:
+            number_cell: 数字のセル
+            area: 数字の周囲の未発見のセルの制約エリア（フラグ付きのセルは含めないこと）
+
+        Returns:
+            (確定した安全セル, 確定した地雷セル)のタプル
+        """
+        component_ids = {self.cell_to_component[cell] for cell in area.cells if cell in self.cell_to_component}
+        component, merged_safe, merged_mines = self._merge_components(component_ids)
+
+        component.constraints[number_cell] = area
+        for cell in area.cells:
+            self.cell_to_component[cell] = component.component_id
+            if cell not in component.known_safe and cell not in component.known_mines:
+                component.cells.add(cell)
+        component.version += 1
+
+        safe_cells, mine_cells = component.analyzer.add_constraint_area(area)
+        self.last_merge_count += component.analyzer.last_merge_count
+        component.mark_known(safe_cells, mine_cells)
+        return merged_safe | safe_cells, merged_mines | mine_cells
+
+    def propagate_pending(self) -> Tuple[Set[Cell], Set[Cell]]:
+        """
+        マージ数の上限で持ち越した分を、持ち越しのある成分ごとに1回ずつ進める
+
+        Returns:
+            (確定した安全セル, 確定した地雷セル)のタプル
+        """
+        all_safe, all_mines = set(), set()
+        for component in self.components.values():
+            if component.analyzer.has_pending_work():
+                safe_cells, mine_cells = component.analyzer.propagate()
+                component.mark_known(safe_cells, mine_cells)
+                all_safe |= safe_cells
+                all_mines |= mine_cells
+        return all_safe, all_mines
+
+    def has_pending_work(self) -> bool:
+        """マージ数の上限で持ち越した分が残っている成分があるか"""
+        return any(component.analyzer.has_pending_work() for component in self.components.values())
+
+    def _merge_components(self, component_ids: Set[int]) -> Tuple[FrontierComponent, Set[Cell], Set[Cell]]:
+        """
+        成分を1つにまとめる（制約の数が一番多い成分に、他の成分の既知セルと制約を追加し直す）
+
+        成分がなければ新しく作る。手間はまとめられる側の成分の大きさに比例する
+
+        Returns:
+            (まとめた成分, 追加し直す間に確定した安全セル, 同じく地雷セル)のタプル
+        """
+        self.last_merge_count = 0
+        if not component_ids:
+            component = FrontierComponent(self.next_component_id)
+            self.next_component_id += 1
+            self.components[component.component_id] = component
+            return component, set(), set()
+
+        components = sorted((self.components[component_id] for component_id in component_ids),
+                            key=lambda component: len(component.constraints), reverse=True)
+        target = components[0]
+        all_safe, all_mines = set(), set()
+        for source in components[1:]:
+            for cell in source.known_safe | source.known_mines | source.cells:
+                if self.cell_to_component.get(cell) == source.component_id:
+                    self.cell_to_component[cell] = target.component_id
+            target.cells |= source.cells
+            target.analyzer.apply_known_cells(source.known_safe, source.known_mines)
+            target.mark_known(source.known_safe, source.known_mines)
+
+            for number_cell, area in source.constraints.items():
+                target.constraints[number_cell] = area
+                safe_cells, mine_cells = target.analyzer.add_constraint_area(area)
+                self.last_merge_count += target.analyzer.last_merge_count
+                target.mark_known(safe_cells, mine_cells)
+                all_safe |= safe_cells
+                all_mines |= mine_cells
+            del self.components[source.component_id]
+
+        return target, all_safe, all_mines
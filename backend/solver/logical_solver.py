@@ -1,9 +1,9 @@
 ﻿"""
 論理解法専用ソルバー - キューベース実装
-確定した行動をキューで管理し、盤面差分から新しい確定を検出
+確定した行動をキューで管理し、盤面ビューの変化配信から新しい確定を検出
 """
 
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Set
 from collections import deque
 import sys
 import os
@@ -14,43 +14,56 @@ from minesweeper import CellState
 from .solver_board_view import SolverBoardView
 from .solver_command import SolverCommand, SolverAction
 from .solver_base import SolverBase
+from .area_analyzer import AreaAnalyzer, Area
+from .frontier import FrontierDecomposition
 
 
 class LogicalSolver(SolverBase):
-    """論理的に確定する手のみを提案するソルバー"""
+    """論理的に確定する手のみを提案するソルバー
 
-    def __init__(self):
+    use_area_analyzer=False（既定）: 1マスの数字だけを見る2つの規則で判定
+    use_area_analyzer=True: 数字ごとの制約エリアを境界の連結成分ごとのAreaAnalyzerに追加し、
+                            エリア同士の重なりまで使って判定
+                            （手がなくなったら、盤面全体の地雷数も加えて全体をまとめて分析）
+    """
+
+    def __init__(self, use_area_analyzer: bool = False):
         super().__init__()
-        self.name = "Logical Certainty Solver"
+        self.use_area_analyzer = use_area_analyzer
+        self.name = "Logical Area Solver" if use_area_analyzer else "Logical Certainty Solver"
+        self.frontier = FrontierDecomposition() if use_area_analyzer else None
+        self._hidden_count = 0  # フラグのない未発見のマス数（use_area_analyzer=Trueのときのみ）
+        self._flagged_count = 0  # フラグ付きのマス数（use_area_analyzer=Trueのときのみ）
         self.action_queue = deque()  # 確定した行動のキュー（SolverCommand）
-        self.previous_board_state: Optional[List[List[CellState]]] = None  # 前回の盤面状態
+        self._queued_commands: Set[SolverCommand] = set()  # キューにある行動（重複検出用）
+        self._subscribed_view: Optional[SolverBoardView] = None  # 変化配信を購読中のビュー
+        self._subscription: Optional[int] = None  # 変化配信の購読者ID
 
     def find_moves(self):
         """
-        前回との差分を検出し、新しい確定手をキューに追加
+        前回から変化したセルを調べ、新しい確定手をキューに追加
         基底クラスのfind_movesメソッドの実装
+
+        変化はビューの変化配信から受け取るので、手間は盤面の大きさではなく変化したセル数に比例する
+        （初回・ビューの切り替え時・取りこぼし時だけ全ての発見済みセルを調べる）
         """
         if self.board_view is None:
             raise ValueError("盤面が設定されていません")
 
-        if self.previous_board_state is None:
-            # 初回実行時は全ての発見済みセルを差分として扱う
-            changed_cells = []
-            for row in range(self.board_view.height):
-                for col in range(self.board_view.width):
-                    if self.board_view.cell_states[row][col] == CellState.REVEALED:
-                        changed_cells.append((row, col))
+        changes = self._read_changes()
+        if self.use_area_analyzer:
+            self._find_moves_with_areas(changes)
+            return
+
+        if changes is None:
+            changed_cells = self._all_revealed_cells()
         else:
-            # 差分を検出
-            changed_cells = self._detect_changes(self.board_view.cell_states)
+            changed_cells = self._cells_to_analyze(changes)
 
         # 差分があるセルについて分析
         for row, col in changed_cells:
             self._analyze_revealed_cell(row, col)
 
-        # 現在の状態を保存（深いコピーを作成）
-        self.previous_board_state = [row[:] for row in self.board_view.cell_states]
-
     def get_next_move(self) -> SolverCommand:
         """
         次の論理的確定手を取得
@@ -63,6 +76,7 @@ class LogicalSolver(SolverBase):
 
         while self.action_queue:
             command = self.action_queue.popleft()
+            self._queued_commands.discard(command)
 
             # 行動が有効かチェック
             if self._is_command_valid(command):
@@ -72,22 +86,166 @@ class LogicalSolver(SolverBase):
         # キューが空または全て無効
         return SolverCommand.no_move()
 
-    def _detect_changes(self, current_state: List[List[CellState]]) -> List[Tuple[int, int]]:
-        """前回から変化したセルを検出"""
+    def _read_changes(self) -> Optional[List[Tuple[int, int, CellState]]]:
+        """
+        ビューの変化配信から前回以降の変化を読む
+
+        Returns:
+            変化のリスト、全体を調べ直す必要がある場合はNone
+        """
+        if self._subscribed_view is not self.board_view:
+            self._unsubscribe()
+            self._subscribed_view = self.board_view
+            self._subscription = self.board_view.change_feed.subscribe()
+            return None
+
+        return self.board_view.change_feed.read(self._subscription)
+
+    def _unsubscribe(self):
+        """購読中のビューの変化配信をやめる"""
+        if self._subscribed_view is not None:
+            self._subscribed_view.change_feed.unsubscribe(self._subscription)
+        self._subscribed_view = None
+        self._subscription = None
+
+    def _all_revealed_cells(self) -> List[Tuple[int, int]]:
+        """全ての発見済みセル"""
+        cell_states = self.board_view.cell_states
+        return [(row, col) for row in range(self.board_view.height) for col in range(self.board_view.width)
+                if cell_states[row][col] == CellState.REVEALED]
+
+    def _cells_to_analyze(self, changes: List[Tuple[int, int, CellState]]) -> List[Tuple[int, int]]:
+        """変化から分析対象のセルを求める"""
         changed_cells = []
 
-        for row in range(len(current_state)):
-            for col in range(len(current_state[0])):
-                if self.previous_board_state[row][col] != current_state[row][col]:
-                    # 新たに発見されたセルを対象とする
-                    if current_state[row][col] == CellState.REVEALED:
-                        changed_cells.append((row, col))
-                    # フラグを立てたセルの周囲を対象とする
-                    elif current_state[row][col] == CellState.FLAGGED:
-                        changed_cells.extend(self.board_view.get_neighbors(row, col))
+        for row, col, state in changes:
+            # 新たに発見されたセルを対象とする
+            if state == CellState.REVEALED:
+                changed_cells.append((row, col))
+            # フラグを立てたセルの周囲を対象とする
+            elif state == CellState.FLAGGED:
+                changed_cells.extend(self.board_view.get_neighbors(row, col))
 
         return changed_cells
 
+    def _find_moves_with_areas(self, changes: Optional[List[Tuple[int, int, CellState]]]):
+        """
+        変化を境界の連結成分に反映し、確定したセルをキューに追加
+
+        変化したセルを含む成分だけを分析し直す
+
+        Args:
+            changes: 前回以降の変化（Noneなら盤面全体から作り直す）
+        """
+        # フラグが外された場合は、そのマスを地雷とみなした制約が崩れるので作り直す
+        if changes is not None and any(state == CellState.HIDDEN for _, _, state in changes):
+            changes = None
+
+        frontier = self.frontier
+        cell_states = self.board_view.cell_states
+
+        if changes is None:
+            frontier.reset()
+            revealed_cells = self._all_revealed_cells()
+            flagged_cells = {(row, col) for row in range(self.board_view.height)
+                             for col in range(self.board_view.width)
+                             if cell_states[row][col] == CellState.FLAGGED}
+            self._flagged_count = len(flagged_cells)
+            self._hidden_count = (self.board_view.height * self.board_view.width
+                                  - len(revealed_cells) - len(flagged_cells))
+        else:
+            revealed_cells = [(row, col) for row, col, state in changes if state == CellState.REVEALED]
+            flagged_cells = {(row, col) for row, col, state in changes if state == CellState.FLAGGED}
+            self._flagged_count += len(flagged_cells)
+            self._hidden_count -= len(revealed_cells) + len(flagged_cells)
+
+        # 発見済み・フラグ付きのセルを、そのセルを含む成分から取り除く
+        safe_cells, mine_cells = frontier.apply_known_cells(set(revealed_cells), flagged_cells)
+
+        # 数字ごとに「フラグのない未発見の周囲のセルに、残りN個の地雷」という制約を追加
+        for row, col in revealed_cells:
+            area = self.get_constraint_area(row, col)
+            if area is not None:
+                found_safe, found_mines = frontier.add_constraint((row, col), area)
+                safe_cells |= found_safe
+                mine_cells |= found_mines
+
+        self._queue_determined_cells(safe_cells, mine_cells)
+
+        # マージ数の上限で持ち越した分は、確定する手が見つかるまで続けて処理する
+        while not self.action_queue and frontier.has_pending_work():
+            self._queue_determined_cells(*frontier.propagate_pending())
+
+        if not self.action_queue:
+            self._queue_mine_count_moves()
+
+    def _queue_mine_count_moves(self):
+        """
+        盤面全体の地雷数も使って確定する手をキューに追加
+
+        成分ごとの分析で手がなくなったときだけ、全成分の制約と「残りの未発見のマスに残りの地雷数」
+        という制約を1つのAreaAnalyzerにまとめて分析する
+        """
+        if self.board_view.mine_count is None or self._hidden_count == 0:
+            return
+
+        cell_states = self.board_view.cell_states
+        hidden_cells = {(row, col) for row in range(self.board_view.height) for col in range(self.board_view.width)
+                        if cell_states[row][col] == CellState.HIDDEN}
+        remaining_mines = self.board_view.mine_count - self._flagged_count
+        if not 0 <= remaining_mines <= len(hidden_cells):
+            return
+
+        analyzer = AreaAnalyzer()
+        safe_cells, mine_cells = analyzer.add_constraint_area(Area(hidden_cells, remaining_mines, remaining_mines))
+        for component in self.frontier.get_components():
+            for row, col in component.constraints:
+                area = self.get_constraint_area(row, col)
+                if area is not None:
+                    found_safe, found_mines = analyzer.add_constraint_area(area)
+                    safe_cells |= found_safe
+                    mine_cells |= found_mines
+        while analyzer.has_pending_work():
+            found_safe, found_mines = analyzer.propagate()
+            safe_cells |= found_safe
+            mine_cells |= found_mines
+
+        self._queue_determined_cells(safe_cells, mine_cells)
+
+    def _queue_determined_cells(self, safe_cells: Set[Tuple[int, int]], mine_cells: Set[Tuple[int, int]]):
+        """確定したセルのうち未発見のものを、掘る・フラグを立てる行動としてキューに追加"""
+        cell_states = self.board_view.cell_states
+        for row, col in sorted(safe_cells):
+            if cell_states[row][col] == CellState.HIDDEN:
+                self._add_to_queue(SolverCommand.dig(row, col))
+        for row, col in sorted(mine_cells):
+            if cell_states[row][col] == CellState.HIDDEN:
+                self._add_to_queue(SolverCommand.flag(row, col))
+
+    def get_constraint_area(self, row: int, col: int) -> Optional[Area]:
+        """
+        発見済みセルの数字から制約エリアを作成
+
+        フラグ付きの周囲のセルは含めず、その数を地雷数から差し引く
+
+        Returns:
+            制約エリア、数字が不明・周囲にフラグのない未発見のセルがない・フラグと矛盾する場合はNone
+        """
+        mine_number = self.board_view.get_mine_number(row, col)
+        if mine_number is None:
+            return None
+
+        cells = set()
+        for r, c in self.board_view.get_neighbors(row, col):
+            state = self.board_view.cell_states[r][c]
+            if state == CellState.HIDDEN:
+                cells.add((r, c))
+            elif state == CellState.FLAGGED:
+                mine_number -= 1
+        if not cells or not 0 <= mine_number <= len(cells):
+            return None
+        return Area(cells, mine_number, mine_number)
+
     def _analyze_revealed_cell(self, row: int, col: int):
         """
         発見済みセル周辺の論理的確定を分析してキューに追加
@@ -123,8 +281,9 @@ class LogicalSolver(SolverBase):
                 self._add_to_queue(SolverCommand.flag(r, c))
 
     def _add_to_queue(self, command: SolverCommand):
-        """重複チェックしてキューに追加"""
-        if command not in self.action_queue:
+        """重複チェックしてキューに追加（集合で調べるので定数時間）"""
+        if command not in self._queued_commands:
+            self._queued_commands.add(command)
             self.action_queue.append(command)
 
     def has_moves(self) -> bool:
@@ -140,5 +299,8 @@ class LogicalSolver(SolverBase):
     def reset(self):
         """ソルバーの状態をリセット"""
         self.action_queue.clear()
-        self.previous_board_state = None
+        self._queued_commands.clear()
+        self._unsubscribe()
+        if self.frontier is not None:
+            self.frontier.reset()
         self.board_view = None
@@ -0,0 +1,470 @@
+"""
+地雷確率エンジン
+境界の連結成分ごとの解の数え上げ結果を、盤面全体の残りの地雷数で重み付けして、
+未発見の各マスが地雷である確率を求める（推測するマスの選択に使う）
+"""
+
+from typing import Dict, List, Optional, Set, Tuple
+from collections import deque
+from dataclasses import dataclass, field
+from fractions import Fraction
+from math import comb
+import time
+import sys
+import os
+
+# 親ディレクトリのminesweeperモジュールをインポートするための設定
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from minesweeper import CellState
+from .area_analyzer import Area, Cell
+from .solver_board_view import SolverBoardView
+
+# 数え上げる連結成分の最大セル数（これより大きい成分は数え上げない）
+MAX_COMPONENT_CELLS = 60
+
+# 1回の分析で数え上げに使う時間の上限（秒）
+TIME_BUDGET = 1.0
+
+
+class BudgetExceeded(Exception):
+    """数え上げが時間の上限を超えた"""
+    pass
+
+
+@dataclass
+class ComponentSolutions:
+    """連結成分1つの、矛盾のない地雷配置の数え上げ結果"""
+    cells: List[Cell]
+    solution_counts: Dict[int, int]  # 成分内の地雷数k→解の数
+    mine_counts: Dict[int, List[int]]  # 成分内の地雷数k→セルごとの、そのセルが地雷である解の数
+
+
+def order_cells(constraints: List[Area]) -> List[Cell]:
+    """
+    バックトラックで割り当てるセルの順番を決める
+
+    セル数の少ない制約から始め、割り当て済みのセルを含む制約のセルを幅優先でたどる。
+    制約のセルが続けて割り当てられるので、矛盾が早く見つかり枝刈りが効く
+    """
+    cell_to_constraints: Dict[Cell, List[int]] = {}
+    for index, area in enumerate(constraints):
+        for cell in area.cells:
+            cell_to_constraints.setdefault(cell, []).append(index)
+
+    order = []
+    seen_cells = set()
+    seen_constraints = set()
+    for start in sorted(range(len(constraints)), key=lambda index: len(constraints[index].cells)):
+        if start in seen_constraints:
+            continue
+        seen_constraints.add(start)
+        queue = deque([start])
+        while queue:
+            area = constraints[queue.popleft()]
+            for cell in sorted(area.cells):
+                if cell in seen_cells:
+                    continue
+                seen_cells.add(cell)
+                order.append(cell)
+                for index in sorted(cell_to_constraints[cell], key=lambda index: len(constraints[index].cells)):
+                    if index not in seen_constraints:
+                        seen_constraints.add(index)
+                        queue.append(index)
+    return order
+
+
+def enumerate_solutions(constraints: List[Area], deadline: float) -> ComponentSolutions:
+    """
+    制約（地雷数が確定したエリア）を全て満たす地雷配置をバックトラックで数え上げる
+
+    同じ制約の組に属するセルは区別しなくてよいので1つのグループにまとめ、グループごとに
+    地雷の個数だけを割り当てる（通り数は二項係数で数える）。グループ内の各セルが地雷である
+    解の数は、グループの地雷数に比例して配分する
+
+    Args:
+        constraints: 連結成分の制約エリアのリスト（min_mines == max_mines）
+        deadline: time.perf_counter()でのこの時刻を過ぎたらBudgetExceededを送出
+
+    Returns:
+        数え上げ結果
+    """
+    cell_constraints: Dict[Cell, List[int]] = {}
+    for index, area in enumerate(constraints):
+        for cell in area.cells:
+            cell_constraints.setdefault(cell, []).append(index)
+
+    # 割り当ての順番で、同じ制約の組に属するセルをグループにまとめる
+    group_of: Dict[Tuple[int, ...], int] = {}
+    group_cells: List[List[Cell]] = []
+    group_constraints: List[List[int]] = []
+    for cell in order_cells(constraints):
+        key = tuple(cell_constraints[cell])
+        if key not in group_of:
+            group_of[key] = len(group_cells)
+            group_cells.append([])
+            group_constraints.append(cell_constraints[cell])
+        group_cells[group_of[key]].append(cell)
+    cells = [cell for group in group_cells for cell in group]
+    group_sizes = [len(group) for group in group_cells]
+
+    targets = [area.min_mines for area in constraints]
+    remaining = [len(area.cells) for area in constraints]  # 制約ごとの未割り当てのセル数
+    mines = [0] * len(constraints)  # 制約ごとの割り当て済みの地雷数
+    assignment = [0] * len(group_cells)  # グループごとの地雷数
+    solution_counts: Dict[int, int] = {}
+    group_mine_counts: Dict[int, List[int]] = {}  # 地雷数k→グループごとの、(解の数×グループの地雷数)の和
+    node_count = 0
+
+    def assign(depth: int, mine_total: int, ways: int):
+        nonlocal node_count
+        if depth == len(group_cells):
+            solution_counts[mine_total] = solution_counts.get(mine_total, 0) + ways
+            counts = group_mine_counts.setdefault(mine_total, [0] * len(group_cells))
+            for index, value in enumerate(assignment):
+                if value:
+                    counts[index] += ways * value
+            return
+
+        node_count += 1
+        if node_count % 1024 == 0 and time.perf_counter() > deadline:
+            raise BudgetExceeded()
+
+        related = group_constraints[depth]
+        size = group_sizes[depth]
+        for index in related:
+            remaining[index] -= size
+        for value in range(size + 1):
+            # 地雷を増やすと超過は解消しないので打ち切り、不足はまだ解消しうるので次の値へ
+            if any(mines[index] + value > targets[index] for index in related):
+                break
+            if all(mines[index] + value + remaining[index] >= targets[index] for index in related):
+                for index in related:
+                    mines[index] += value
+                assignment[depth] = value
+                assign(depth + 1, mine_total + value, ways * comb(size, value))
+                for index in related:
+                    mines[index] -= value
+        for index in related:
+            remaining[index] += size
+        assignment[depth] = 0
+
+    assign(0, 0, 1)
+
+    mine_counts: Dict[int, List[int]] = {}
+    for mine_total, counts in group_mine_counts.items():
+        # グループ内のセルは対称なので、各セルが地雷である解の数はグループの合計をセル数で割ったもの
+        mine_counts[mine_total] = [counts[index] // size
+                                   for index, size in enumerate(group_sizes) for _ in range(size)]
+    return ComponentSolutions(cells, solution_counts, mine_counts)
+
+
+def split_components(constraints: List[Area]) -> List[List[Area]]:
+    """制約を、共通のセルでつながる連結成分に分ける"""
+    parent = list(range(len(constraints)))
+
+    def find(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    cell_owner: Dict[Cell, int] = {}
+    for index, area in enumerate(constraints):
+        for cell in area.cells:
+            if cell in cell_owner:
+                parent[find(index)] = find(cell_owner[cell])
+            else:
+                cell_owner[cell] = index
+
+    groups: Dict[int, List[Area]] = {}
+    for index, area in enumerate(constraints):
+        groups.setdefault(find(index), []).append(area)
+    return list(groups.values())
+
+
+def convolve(left: Dict[int, int], right: Dict[int, int]) -> Dict[int, int]:
+    """地雷数→通り数の2つの表を掛け合わせる（地雷数の和ごとに通り数の積を足す）"""
+    result: Dict[int, int] = {}
+    for left_mines, left_count in left.items():
+        for right_mines, right_count in right.items():
+            result[left_mines + right_mines] = result.get(left_mines + right_mines, 0) + left_count * right_count
+    return result
+
+
+@dataclass
+class MineProbabilities:
+    """
+    未発見のマスごとの地雷の確率の分析結果
+
+    重みは「そのマスが地雷である地雷配置の数」で、total_weightで割ると確率になる。
+    exactがFalseのとき（上限を超えた成分がある・盤面全体の地雷数が不明）は、境界のマスの重みは
+    各成分の中だけで数えたもので、数え上げられなかったマスと内部のマスは地雷の密度からの概算になる
+    （盤面全体の地雷数が不明なら内部のマスは概算もしない）
+    """
+    cell_weights: Dict[Cell, int] = field(default_factory=dict)  # 境界のマス→そのマスが地雷である配置の数
+    total_weight: int = 0  # 全配置の数（0なら盤面が矛盾している）
+    interior_cells: List[Cell] = field(default_factory=list)  # 境界以外の未発見のマス
+    interior_weight: int = 0  # 内部の1マスが地雷である配置の数（exactのときのみ）
+    estimates: Dict[Cell, float] = field(default_factory=dict)  # 概算の確率（exactでないときのみ）
+    exact: bool = True
+
+    def probability(self, cell: Cell) -> Optional[Fraction]:
+        """マスが地雷である確率（厳密な値、概算しかないマス・分析対象外のマスはNone）"""
+        if self.total_weight == 0:
+            return None
+        if cell in self.cell_weights:
+            return Fraction(self.cell_weights[cell], self.total_weight)
+        if self.exact and cell in self.interior_cells:
+            return Fraction(self.interior_weight, self.total_weight)
+        return None
+
+    def get_probabilities(self) -> Dict[Cell, float]:
+        """未発見のマス→地雷である確率（概算を含む）"""
+        probabilities = dict(self.estimates)
+        if self.total_weight == 0:
+            return probabilities
+        for cell, weight in self.cell_weights.items():
+            probabilities[cell] = weight / self.total_weight
+        if self.exact and self.interior_cells:
+            interior_probability = self.interior_weight / self.total_weight
+            for cell in self.interior_cells:
+                probabilities[cell] = interior_probability
+        return probabilities
+
+    def get_certain_cells(self) -> Tuple[Set[Cell], Set[Cell]]:
+        """
+        確実に安全・地雷のマスを求める（概算のマスは含めない）
+
+        Returns:
+            (確実に安全なマス, 確実に地雷のマス)のタプル
+        """
+        if self.total_weight == 0:
+            # 矛盾している（間違ったフラグがある等）ので、何も確定しない
+            return set(), set()
+
+        safe_cells = {cell for cell, weight in self.cell_weights.items() if weight == 0}
+        mine_cells = {cell for cell, weight in self.cell_weights.items() if weight == self.total_weight}
+        if self.exact and self.interior_cells:
+            if self.interior_weight == 0:
+                safe_cells.update(self.interior_cells)
+            elif self.interior_weight == self.total_weight:
+                mine_cells.update(self.interior_cells)
+        return safe_cells, mine_cells
+
+    def get_safest_cells(self) -> List[Cell]:
+        """地雷である確率が最も低いマスのリスト（確率は概算を含む）"""
+        probabilities = self.get_probabilities()
+        if not probabilities:
+            return []
+        lowest = min(probabilities.values())
+        return sorted(cell for cell, probability in probabilities.items() if probability == lowest)
+
+
+def constraints_from_view(board_view: SolverBoardView) -> List[Area]:
+    """
+    盤面ビューの全ての数字について、周囲の未発見のマスの制約エリアを作成
+
+    フラグ付きの周囲のマスは含めず、その数を地雷数から差し引く（LogicalSolver.get_constraint_areaと同じ）
+    """
+    constraints = []
+    cell_states = board_view.cell_states
+    for row in range(board_view.height):
+        for col in range(board_view.width):
+            mine_number = board_view.visible_mine_numbers[row][col]
+            if mine_number is None or cell_states[row][col] != CellState.REVEALED:
+                continue
+            cells = set()
+            for r, c in board_view.get_neighbors(row, col):
+                state = cell_states[r][c]
+                if state == CellState.HIDDEN:
+                    cells.add((r, c))
+                elif state == CellState.FLAGGED:
+                    mine_number -= 1
+            if cells and 0 <= mine_number <= len(cells):
+                constraints.append(Area(cells, mine_number, mine_number))
+    return constraints
+
+
+class ProbabilityEngine:
+    """
+    地雷確率の計算
+
+    制約を共通のマスでつながる成分に分けて成分ごとにバックトラックで数え上げ、
+    成分の通り数の表と内部のマスへの残りの地雷の入れ方（二項係数、多倍長整数）を掛け合わせる。
+    成分の数え上げ結果は制約の組ごとにキャッシュするので、手を打って変化した成分だけを数え直す
+    """
+
+    def __init__(self, time_budget: float = TIME_BUDGET, max_component_cells: int = MAX_COMPONENT_CELLS):
+        self.time_budget = time_budget
+        self.max_component_cells = max_component_cells
+        # 制約の組→数え上げ結果（直前の分析で使った成分だけ残す）
+        self._solution_cache: Dict[frozenset, ComponentSolutions] = {}
+        self.last_unsolved_count = 0  # 直前の分析で上限を超えて数え上げられなかった成分の数
+        self.last_enumerated_count = 0  # 直前の分析で（キャッシュを使わず）数え上げた成分の数
+
+    def clear_cache(self):
+        """数え上げ結果のキャッシュを破棄"""
+        self._solution_cache.clear()
+        self.last_unsolved_count = 0
+        self.last_enumerated_count = 0
+
+    def analyze_view(self, board_view: SolverBoardView,
+                     constraints: Optional[List[Area]] = None) -> MineProbabilities:
+        """
+        盤面ビューの未発見のマスと残りの地雷数から地雷の確率を求める
+
+        Args:
+            board_view: 盤面ビュー
+            constraints: 数字の制約エリアのリスト（Noneなら盤面ビューから作る）
+        """
+        cell_states = board_view.cell_states
+        hidden_cells = [(row, col) for row in range(board_view.height) for col in range(board_view.width)
+                        if cell_states[row][col] == CellState.HIDDEN]
+        remaining_mines = None
+        if board_view.mine_count is not None:
+            remaining_mines = board_view.mine_count - sum(row.count(CellState.FLAGGED) for row in cell_states)
+        if constraints is None:
+            constraints = constraints_from_view(board_view)
+        return self.analyze(constraints, hidden_cells, remaining_mines)
+
+    def analyze(self, constraints: List[Area], hidden_cells: List[Cell],
+                remaining_mines: Optional[int]) -> MineProbabilities:
+        """
+        地雷の確率を求める
+
+        Args:
+            constraints: 数字の制約エリアのリスト（min_mines == max_mines、フラグ付きのマスを含まない）
+            hidden_cells: 未発見のマス（フラグ付きを除く）
+            remaining_mines: 残りの地雷数（全体の地雷数 - フラグ数、不明ならNone）
+
+        Returns:
+            分析結果
+        """
+        groups = split_components(constraints)
+        solved, unsolved = self._solve_components(groups)
+        solved_cells = {cell for solutions in solved for cell in solutions.cells}
+        unsolved_cells = {cell for group in unsolved for area in group for cell in area.cells}
+        interior_cells = [cell for cell in hidden_cells if cell not in solved_cells and cell not in unsolved_cells]
+
+        if remaining_mines is None or unsolved:
+            return self._estimate(solved, unsolved, interior_cells, remaining_mines)
+
+        cell_weights, interior_weight, total_weight = self._weigh_cells(solved, len(interior_cells), remaining_mines)
+        return MineProbabilities(cell_weights, total_weight, interior_cells, interior_weight)
+
+    def _solve_components(self, groups: List[List[Area]]) -> Tuple[List[ComponentSolutions], List[List[Area]]]:
+        """
+        成分ごとに数え上げる（前回と同じ制約の成分はキャッシュを使う）
+
+        Returns:
+            (数え上げ結果のリスト, 上限を超えて数え上げられなかった成分の制約のリスト)のタプル
+        """
+        deadline = time.perf_counter() + self.time_budget
+        cache = {}
+        solved = []
+        unsolved = []
+        self.last_enumerated_count = 0
+
+        # 小さい成分から数え上げ、時間切れで大きい成分だけが残るようにする
+        for constraints in sorted(groups, key=len):
+            key = frozenset((frozenset(area.cells), area.min_mines) for area in constraints)
+            solutions = self._solution_cache.get(key)
+            if solutions is None:
+                cell_count = len(set().union(*(area.cells for area in constraints)))
+                if cell_count > self.max_component_cells:
+                    unsolved.append(constraints)
+                    continue
+                try:
+                    solutions = enumerate_solutions(constraints, deadline)
+                except BudgetExceeded:
+                    unsolved.append(constraints)
+                    continue
+                self.last_enumerated_count += 1
+            cache[key] = solutions
+            solved.append(solutions)
+
+        self._solution_cache = cache
+        self.last_unsolved_count = len(unsolved)
+        return solved, unsolved
+
+    @staticmethod
+    def _weigh_cells(solved: List[ComponentSolutions], interior_count: int,
+                     remaining_mines: int) -> Tuple[Dict[Cell, int], int, int]:
+        """
+        盤面全体の地雷数を使って、各マスが地雷である配置の数を求める
+
+        Args:
+            solved: 各成分の数え上げ結果
+            interior_count: 内部（境界以外の未発見のマス）の数
+            remaining_mines: 残りの地雷数（全体の地雷数 - フラグ数）
+
+        Returns:
+            (境界のマス→そのマスが地雷である配置の数, 内部の1マスが地雷である配置の数, 全配置の数)
+        """
+        # 左から・右からの成分の通り数の表を掛け合わせておき、各成分について「それ以外の成分」の表を作る
+        prefix = [{0: 1}]
+        for solutions in solved:
+            prefix.append(convolve(prefix[-1], solutions.solution_counts))
+        suffix = [{0: 1}]
+        for solutions in reversed(solved):
+            suffix.append(convolve(suffix[-1], solutions.solution_counts))
+        suffix.reverse()
+
+        def interior_ways(mines: int, cells: int) -> int:
+            return comb(cells, mines) if 0 <= mines <= cells else 0
+
+        cell_weights: Dict[Cell, int] = {}
+        for index, solutions in enumerate(solved):
+            others = convolve(prefix[index], suffix[index + 1])
+            for mine_count, counts in solutions.mine_counts.items():
+                # この成分の地雷数がmine_countのときの、他の成分と内部の配置の数
+                ways = sum(count * interior_ways(remaining_mines - mine_count - other_mines, interior_count)
+                           for other_mines, count in others.items())
+                for cell, count in zip(solutions.cells, counts):
+                    cell_weights[cell] = cell_weights.get(cell, 0) + count * ways
+
+        frontier_counts = prefix[-1]
+        total_weight = sum(count * interior_ways(remaining_mines - mines, interior_count)
+                           for mines, count in frontier_counts.items())
+        interior_weight = sum(count * interior_ways(remaining_mines - mines - 1, interior_count - 1)
+                              for mines, count in frontier_counts.items()) if interior_count else 0
+        return cell_weights, interior_weight, total_weight
+
+    @staticmethod
+    def _estimate(solved: List[ComponentSolutions], unsolved: List[List[Area]], interior_cells: List[Cell],
+                  remaining_mines: Optional[int]) -> MineProbabilities:
+        """
+        盤面全体の地雷数を使わずに確率を求める
+
+        数え上げられた成分は成分の中だけで数えた厳密な値（重み）、数え上げられなかった成分の
+        マスはそのマスを含む制約の地雷の密度の最大値、内部のマスは残りの地雷の密度で概算する
+        """
+        result = MineProbabilities(interior_cells=interior_cells, exact=False)
+        # 成分ごとに全体の数が異なるので、全成分の通り数の積を共通の分母にする
+        totals = [sum(solutions.solution_counts.values()) for solutions in solved]
+        result.total_weight = 1
+        for total in totals:
+            result.total_weight *= total
+
+        expected_mines = 0.0
+        for solutions, total in zip(solved, totals):
+            if total == 0:
+                continue
+            scale = result.total_weight // total
+            for index, cell in enumerate(solutions.cells):
+                mine_total = sum(counts[index] for counts in solutions.mine_counts.values())
+                result.cell_weights[cell] = mine_total * scale
+                expected_mines += mine_total / total
+
+        for constraints in unsolved:
+            for area in constraints:
+                density = area.min_mines / len(area.cells)
+                for cell in area.cells:
+                    result.estimates[cell] = max(result.estimates.get(cell, 0.0), density)
+        expected_mines += sum(result.estimates.values())
+
+        if interior_cells and remaining_mines is not None:
+            density = min(max((remaining_mines - expected_mines) / len(interior_cells), 0.0), 1.0)
+            for cell in interior_cells:
+                result.estimates[cell] = density
+        return result
@@ -10,6 +10,8 @@ import os
 # 親ディレクトリのminesweeperモジュールをインポートするための設定
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from minesweeper import CellState
+from neighbor_table import get_neighbor_table
+from change_feed import ChangeFeed
 
 if TYPE_CHECKING:
     from minesweeper import MinesweeperBoard
@@ -19,11 +21,16 @@ class SolverBoardView:
     """ソルバー用の盤面情報"""
 
     def __init__(self, height: int, width: int, cell_states: List[List[CellState]],
-                visible_mine_numbers: List[List[Optional[int]]]):
+                visible_mine_numbers: List[List[Optional[int]]], mine_count: Optional[int] = None):
         self.height = height
         self.width = width
+        self.mine_count = mine_count  # 盤面全体の地雷数（プレイヤーにも見えている情報、不明ならNone）
         self.cell_states = cell_states
         self.visible_mine_numbers = visible_mine_numbers
+        self._neighbor_table = get_neighbor_table(height, width)  # 同じサイズの盤面と共有
+        # update_changed_cellsで反映した変化をソルバーに配信
+        # （cell_statesを直接書き換えた場合は配信されないので、そのときはupdate_cell_statesを使う）
+        self.change_feed: ChangeFeed[Tuple[int, int, CellState]] = ChangeFeed()
 
     def update_mine_number(self, row: int, col: int, mine_number: int):
         """発見されたセルの地雷数を更新"""
@@ -48,36 +55,28 @@ class SolverBoardView:
     def update_cell_states(self, new_cell_states: List[List[CellState]]):
         """セル状態を更新（完全置換）"""
         self.cell_states = new_cell_states
+        self.change_feed.invalidate()  # 購読者には全体を読み直させる
 
-    def update_changed_cells(self, new_cell_states: List[List[CellState]],
+    def update_changed_cells(self, changed_cells: List[Tuple[int, int, CellState]],
                             revealed_mine_numbers: List[Tuple[int, int, int]]):
-        """変更されたセルのみを効率的に更新
+        """変更されたセルのみを更新
 
         Args:
-            new_cell_states: 新しいセル状態の2次元配列
+            changed_cells: (row, col, 新しい状態)のタプルリスト（盤面の変化記録の順）
             revealed_mine_numbers: (row, col, mine_number)のタプルリスト（発見済みセルのみ）
         """
-        # セル状態の差分更新
-        for row in range(self.height):
-            for col in range(self.width):
-                if self.cell_states[row][col] != new_cell_states[row][col]:
-                    self.cell_states[row][col] = new_cell_states[row][col]
+        cell_states = self.cell_states
+        for row, col, state in changed_cells:
+            cell_states[row][col] = state
+        self.change_feed.extend(changed_cells)
 
         # 新しく発見されたセルの地雷数を更新
         if revealed_mine_numbers:
             self.update_multiple_mine_numbers(revealed_mine_numbers)
 
-    def get_neighbors(self, row: int, col: int) -> List[Tuple[int, int]]:
-        """指定された座標の周囲8マスの座標のリストを返す"""
-        neighbors = []
-        for dr in [-1, 0, 1]:
-            for dc in [-1, 0, 1]:
-                if dr == 0 and dc == 0:
-                    continue
-                new_row, new_col = row + dr, col + dc
-                if self.is_valid_position(new_row, new_col):
-                    neighbors.append((new_row, new_col))
-        return neighbors
+    def get_neighbors(self, row: int, col: int) -> Tuple[Tuple[int, int], ...]:
+        """指定された座標の周囲8マスの座標のタプルを返す（共有テーブルなので変更しないこと）"""
+        return self._neighbor_table.neighbors(row, col)
 
     def is_valid_position(self, row: int, col: int) -> bool:
         """盤面範囲内にちゃんと収まってる？"""
@@ -16,9 +16,12 @@ class SolverAction(Enum):
     QUIT = "quit"         # ユーザーが終了を選択
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SolverCommand:
-    """ソルバーからの指示コマンド"""
+    """ソルバーからの指示コマンド
+
+    変更不可・ハッシュ可能なので、集合や辞書のキーとして重複検出に使える
+    """
     action: SolverAction
     row: Optional[int] = None
     col: Optional[int] = None
@@ -8,6 +8,7 @@ from .solver_base import SolverBase
 from .logical_solver import LogicalSolver
 from .solver_board_view import SolverBoardView
 from .solver_command import SolverCommand, SolverAction
+from .probability import ProbabilityEngine
 import sys
 import os
 
@@ -19,11 +20,22 @@ from minesweeper import MinesweeperBoard, CellState
 class SolverManager:
     """ソルバーとマニュアル操作を統合管理"""
 
-    def __init__(self, solver: Optional[SolverBase] = None):
+    def __init__(self, solver: Optional[SolverBase] = None, allow_guess: bool = False):
         # デフォルトはLogicalSolverを使用
         self.solver = solver if solver is not None else LogicalSolver()
         self.move_history: List[SolverCommand] = []
 
+        # 確実な手がなくなったら、地雷である確率が最も低いマスを推測で掘るモード
+        self.allow_guess = allow_guess
+        self.probability_engine = ProbabilityEngine()
+        self.guess_count = 0  # 推測で掘った回数
+        self.last_guess_probability: Optional[float] = None  # 直前の推測で掘ったマスの地雷の確率
+
+        # 盤面ごとに作り直さず、盤面の変化記録で差分更新するビュー
+        self._board_view: Optional[SolverBoardView] = None
+        self._view_board: Optional[MinesweeperBoard] = None  # ビューの元になった盤面
+        self._view_subscription: Optional[int] = None  # 盤面の変化配信の購読者ID
+
     @staticmethod
     def create_solver_board_view(board: MinesweeperBoard) -> SolverBoardView:
         """MinesweeperBoardからプレイヤーに見せられるSolverBoardViewを作成
@@ -39,7 +51,45 @@ class SolverManager:
                                 if board.cell_states[row][col] == CellState.REVEALED else None
                                 for col in range(board.width)] for row in range(board.height)]
 
-        return SolverBoardView(board.height, board.width, board.cell_states, visible_mine_numbers)
+        # セル状態はコピーを持たせる（差分更新するので盤面と共有しない）
+        cell_states = [list(row) for row in board.cell_states]
+
+        return SolverBoardView(board.height, board.width, cell_states, visible_mine_numbers, board.mine_count)
+
+    def get_board_view(self, board: MinesweeperBoard) -> SolverBoardView:
+        """盤面に対応するSolverBoardViewを取得
+
+        同じ盤面なら前回のビューに盤面の変化配信の差分だけを反映し、
+        別の盤面に切り替わった場合や変化を取りこぼした場合は作り直す
+
+        Args:
+            board: MinesweeperBoardインスタンス
+
+        Returns:
+            盤面の現在の状態を反映したSolverBoardViewインスタンス
+        """
+        if self._board_view is not None and self._view_board is board:
+            changes = board.change_feed.read(self._view_subscription)
+            if changes is not None:
+                if changes:
+                    revealed_mine_numbers = [(row, col, board.mine_numbers[row][col])
+                                             for row, col, state in changes if state == CellState.REVEALED]
+                    self._board_view.update_changed_cells(changes, revealed_mine_numbers)
+                return self._board_view
+
+        self._release_board_view()
+        self._board_view = self.create_solver_board_view(board)
+        self._view_board = board
+        self._view_subscription = board.change_feed.subscribe()
+        return self._board_view
+
+    def _release_board_view(self):
+        """ビューを捨て、盤面の変化配信の購読をやめる"""
+        if self._view_board is not None:
+            self._view_board.change_feed.unsubscribe(self._view_subscription)
+        self._board_view = None
+        self._view_board = None
+        self._view_subscription = None
 
     def set_solver(self, solver: SolverBase):
         """使用するソルバーを変更
@@ -60,8 +110,7 @@ class SolverManager:
         Args:
             board: マインスイーパーの盤面
         """
-        solver_view = self.create_solver_board_view(board)
-        self.solver.set_board(solver_view)
+        self.solver.set_board(self.get_board_view(board))
         self.solver.find_moves()
 
     def execute_step(self, board: MinesweeperBoard) -> tuple[bool, SolverCommand]:
@@ -74,8 +123,7 @@ class SolverManager:
         Returns:
             (成功フラグ, 実行したコマンド)のタプル
         """
-        solver_view = self.create_solver_board_view(board)
-        self.solver.set_board(solver_view)
+        self.solver.set_board(self.get_board_view(board))
         command = self.solver.get_next_move()
 
         if command.action == SolverAction.NO_MOVE:
@@ -96,9 +144,31 @@ class SolverManager:
 
         return success, command
 
+    def get_guess(self, board: MinesweeperBoard) -> Tuple[SolverCommand, Optional[float]]:
+        """
+        地雷である確率が最も低いマスを掘るコマンドを求める
+
+        同じ確率のマスが複数あれば、周囲のマスが少ない（角・端の）マスを選ぶ
+
+        Args:
+            board: マインスイーパーの盤面
+
+        Returns:
+            (掘るコマンド, そのマスが地雷である確率)のタプル、未発見のマスがなければ(NO_MOVE, None)
+        """
+        view = self.get_board_view(board)
+        probabilities = self.probability_engine.analyze_view(view).get_probabilities()
+        if not probabilities:
+            return SolverCommand.no_move(), None
+
+        lowest = min(probabilities.values())
+        row, col = min((cell for cell, probability in probabilities.items() if probability == lowest),
+                       key=lambda cell: (len(view.get_neighbors(*cell)), cell))
+        return SolverCommand.dig(row, col), lowest
+
     def solve_until_manual_needed(self, board: MinesweeperBoard) -> List[SolverCommand]:
         """
-        解けるところまで全て実行
+        解けるところまで全て実行（allow_guessなら、確実な手がなくなるたびに推測で1マス掘って続ける）
 
         Args:
             board: マインスイーパーの盤面
@@ -116,6 +186,8 @@ class SolverManager:
             # キューにある確定手を全て実行
             batch_executed = []
             while self.solver.has_moves():
+                # 同じバッチで実行した手の結果もビューに反映してから次の手を取り出す
+                self.get_board_view(board)
                 command = self.solver.get_next_move()
 
                 if command.action == SolverAction.NO_MOVE:
@@ -145,7 +217,14 @@ class SolverManager:
                 if board.is_game_over():
                     break
 
-            # このバッチで何も実行されなかった場合は終了
+            # このバッチで何も実行されなかった場合は推測するか終了
+            if not batch_executed and self.allow_guess and not board.is_game_over():
+                command, probability = self.get_guess(board)
+                if command.action == SolverAction.DIG:
+                    board.dig(command.row, command.col)
+                    batch_executed.append(command)
+                    self.guess_count += 1
+                    self.last_guess_probability = probability
             if not batch_executed:
                 break
 
@@ -177,3 +256,7 @@ class SolverManager:
         """ソルバーの状態をリセット"""
         self.solver.reset()
         self.move_history.clear()
+        self.probability_engine.clear_cache()
+        self.guess_count = 0
+        self.last_guess_probability = None
+        self._release_board_view()
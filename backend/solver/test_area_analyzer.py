@@ -9,7 +9,7 @@ import os
 # 親ディレクトリのminesweeperモジュールをインポートするための設定
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from solver.area_analyzer import AreaAnalyzer, Area
+from solver.area_analyzer import AreaAnalyzer, Area, BitArea
 
 
 def test_basic_area_operations():
@@ -260,10 +260,10 @@ def test_constraint_integration():
     area1 = Area(cells, min_mines=0, max_mines=2)
     area2 = Area(cells, min_mines=1, max_mines=1)
     
-    id1 = analyzer._add_area(area1)
+    id1 = analyzer._add_area(analyzer._to_bit_area(area1))
     print(f"エリア1追加: ID={id1}, 制約={analyzer.areas[id1].min_mines}-{analyzer.areas[id1].max_mines}")
     
-    id2 = analyzer._add_area(area2)
+    id2 = analyzer._add_area(analyzer._to_bit_area(area2))
     print(f"エリア2追加: ID={id2}, 制約={analyzer.areas[id2].min_mines}-{analyzer.areas[id2].max_mines}")
     
     if id1 == id2:
@@ -275,6 +275,90 @@ def test_constraint_integration():
     print(f"総エリア数: {analyzer.get_area_count()}")
 
 
+def test_bit_area():
+    """ビットマスク表現のテスト"""
+    print("\n=== ビットマスク表現テスト ===")
+
+    analyzer = AreaAnalyzer()
+    cells = {(0, 0), (0, 1), (2, 3)}
+    bit_area = analyzer._to_bit_area(Area(cells, min_mines=1, max_mines=2))
+    assert bit_area.size == 3
+    assert analyzer._mask_to_cells(bit_area.mask) == cells
+    assert analyzer._to_area(bit_area) == Area(cells, 1, 2)
+
+    # 同じセル集合は同じマスクになり、マスクからエリアIDを引ける
+    same_cells = analyzer._to_bit_area(Area({(2, 3), (0, 1), (0, 0)}, min_mines=2, max_mines=2))
+    assert same_cells.mask == bit_area.mask
+    area_id = analyzer._add_area(bit_area)
+    assert analyzer._add_area(same_cells) == area_id
+    assert analyzer.areas[area_id] == BitArea(bit_area.mask, 2, 2)
+
+    # 重なり・差分がビット演算と一致する
+    other = analyzer._to_bit_area(Area({(0, 0), (2, 3)}, min_mines=2, max_mines=2))
+    new_areas, safe_mask, mine_mask = analyzer._merge_two_areas(analyzer.areas[area_id], other)
+    print(f"マージ結果: {[analyzer._to_area(area) for area in new_areas]}, "
+          f"安全={analyzer._mask_to_cells(safe_mask)}, 地雷={analyzer._mask_to_cells(mine_mask)}")
+    assert analyzer._mask_to_cells(mine_mask) == {(0, 0), (2, 3)}
+    assert analyzer._mask_to_cells(safe_mask) == {(0, 1)}
+
+
+def test_compaction():
+    """削除済みエリアの詰め直しテスト"""
+    print("\n=== エリアID詰め直しテスト ===")
+
+    analyzer = AreaAnalyzer()
+    for col in range(0, 20, 2):
+        analyzer.add_constraint_area(Area({(0, col), (0, col + 1)}, min_mines=1, max_mines=1))
+    for col in range(0, 10, 2):
+        analyzer.apply_known_cells({(0, col)}, set())  # 隣のセルが地雷と確定してエリアが消える
+
+    assert analyzer.get_area_count() == 5
+    assert sum(1 for area in analyzer.areas if area is None) == 5
+
+    analyzer.compact()
+    assert len(analyzer.areas) == analyzer.get_area_count() == analyzer.next_area_id == 5
+    assert None not in analyzer.areas
+
+    # 詰め直した後も辞書が正しいエリアを指している
+    for cell, area_ids in analyzer.cell_to_areas.items():
+        for area_id in area_ids:
+            assert cell in analyzer._to_area(analyzer.areas[area_id]).cells
+    area = Area({(0, 10), (0, 11)}, min_mines=1, max_mines=1)
+    assert analyzer._find_same_cell_area(analyzer._to_bit_area(area)) is not None
+    safe_cells, mine_cells = analyzer.apply_known_cells(set(), {(0, 10)})
+    assert safe_cells == {(0, 11)}
+    print(f"詰め直し後エリア数: {analyzer.get_area_count()}")
+
+
+def test_chained_merges():
+    """マージでできたエリア同士の連鎖的なマージのテスト"""
+    print("\n=== 連鎖マージテスト ===")
+
+    p = Area({(0, 1), (0, 2)}, min_mines=1, max_mines=1)
+    r = Area({(0, 3), (0, 4), (0, 5)}, min_mines=1, max_mines=1)
+    q = Area({(0, 1), (0, 2), (0, 3), (0, 4)}, min_mines=2, max_mines=2)
+
+    # q と p から {(0, 3), (0, 4)} に地雷1個が分かり、それと r から (0, 5) が安全と分かる
+    analyzer = AreaAnalyzer()
+    analyzer.add_constraint_area(p)
+    analyzer.add_constraint_area(r)
+    safe_cells, mine_cells = analyzer.add_constraint_area(q)
+    print(f"安全={safe_cells}, 地雷={mine_cells}, マージ数={analyzer.last_merge_count}")
+    assert safe_cells == {(0, 5)}
+    assert analyzer.last_merge_count > 0
+
+    # マージ数の上限に達したら、残りは次の呼び出しで処理される
+    analyzer = AreaAnalyzer(max_merges_per_call=1)
+    analyzer.add_constraint_area(p)
+    analyzer.add_constraint_area(r)
+    found_safe, _ = analyzer.add_constraint_area(q)
+    assert analyzer.has_pending_work()
+    while analyzer.has_pending_work():
+        safe_cells, _ = analyzer.propagate()
+        found_safe |= safe_cells
+    assert found_safe == {(0, 5)}
+
+
 if __name__ == "__main__":
     test_basic_area_operations()
     test_area_analyzer_basic()
@@ -286,4 +370,7 @@ if __name__ == "__main__":
     test_edge_cases()
     test_area_id_management()
     test_constraint_integration()
+    test_bit_area()
+    test_compaction()
+    test_chained_merges()
     print("\n=== 全テスト完了 ===")
@@ -0,0 +1,97 @@
+"""
+完全列挙ソルバーのテスト
+"""
+
+import sys
+import os
+import random
+
+# 親ディレクトリのminesweeperモジュールをインポートするための設定
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from minesweeper import MinesweeperBoard, GameState
+from solver.area_analyzer import Area
+from solver.brute_force import consistent_mine_layouts, hidden_cells
+from solver.exact_solver import ExactSolver
+from solver.probability import enumerate_solutions, split_components
+from solver.solver_manager import SolverManager
+
+
+def brute_force_certain_cells(view):
+    """未発見のマスへの地雷の置き方を全て試して、確実に安全・地雷のセルを求める（比較用）"""
+    hidden = set(hidden_cells(view))
+    possible_mine = set()
+    possible_safe = set()
+    for mines in consistent_mine_layouts(view):
+        possible_mine.update(mines)
+        possible_safe.update(hidden.difference(mines))
+    return hidden - possible_mine, hidden - possible_safe
+
+
+def test_enumerate_solutions():
+    """1-2-1の形の数え上げテスト"""
+    print("=== 数え上げテスト ===")
+
+    # 1 2 1 の下の3マス: 左右が地雷、中央が安全の1通りだけ
+    constraints = [Area({(1, 0), (1, 1)}, 1, 1), Area({(1, 0), (1, 1), (1, 2)}, 2, 2), Area({(1, 1), (1, 2)}, 1, 1)]
+    solutions = enumerate_solutions(constraints, deadline=float("inf"))
+    assert solutions.solution_counts == {2: 1}
+    counts = dict(zip(solutions.cells, solutions.mine_counts[2]))
+    assert counts == {(1, 0): 1, (1, 1): 0, (1, 2): 1}
+
+    # 共通のセルがない制約は別の成分になる
+    assert len(split_components(constraints + [Area({(5, 5), (5, 6)}, 1, 1)])) == 2
+
+
+def test_matches_brute_force():
+    """小さい盤面で、総当たりで求めた確実なセルと一致するテスト"""
+    print("\n=== 総当たりとの比較テスト ===")
+
+    random.seed(1)
+    checked = 0
+    for _ in range(60):
+        board = MinesweeperBoard(4, 5, 5)
+        board.dig(random.randrange(4), random.randrange(5))
+        if board.is_game_over():
+            continue
+        view = SolverManager.create_solver_board_view(board)
+
+        solver = ExactSolver()
+        solver.set_board(view)
+        solver.logical_solver.find_moves()  # 境界の連結成分を作る
+        assert solver._find_certain_cells() == brute_force_certain_cells(view)
+        checked += 1
+    print(f"{checked}盤面を比較しました")
+    assert checked > 0
+
+
+def test_budget_fallback():
+    """時間の上限を超えたら盤面全体の地雷数は使わずに進めるテスト"""
+    print("\n=== 上限超過時のフォールバックテスト ===")
+
+    random.seed(2)
+    board = MinesweeperBoard(16, 30, 99)
+    board.dig(8, 15)
+    manager = SolverManager(ExactSolver(time_budget=0.0, max_component_cells=4))
+    manager.solve_until_manual_needed(board)
+    assert board.get_game_state() != GameState.LOST
+
+
+def test_exact_solver_on_board():
+    """推測なしで進めるだけなので、地雷を踏むことはないテスト"""
+    print("\n=== 完全列挙ソルバーで盤面を解くテスト ===")
+
+    random.seed(3)
+    for _ in range(5):
+        board = MinesweeperBoard(16, 16, 40)
+        board.dig(8, 8)
+        manager = SolverManager(ExactSolver())
+        manager.solve_until_manual_needed(board)
+        assert board.get_game_state() != GameState.LOST
+
+
+if __name__ == "__main__":
+    test_enumerate_solutions()
+    test_matches_brute_force()
+    test_budget_fallback()
+    test_exact_solver_on_board()
@@ -0,0 +1,68 @@
+"""
+境界の連結成分分解のテスト
+"""
+
+import sys
+import os
+
+# 親ディレクトリのminesweeperモジュールをインポートするための設定
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solver.area_analyzer import Area
+from solver.frontier import FrontierDecomposition
+
+
+def test_components_split_and_merge():
+    """離れた制約は別の成分になり、つなぐ制約が来たら1つにまとまるテスト"""
+    print("=== 連結成分の分割・統合テスト ===")
+
+    frontier = FrontierDecomposition()
+    frontier.add_constraint((0, 0), Area({(1, 0), (1, 1)}, min_mines=1, max_mines=1))
+    frontier.add_constraint((0, 9), Area({(1, 8), (1, 9)}, min_mines=1, max_mines=1))
+    assert len(frontier.get_components()) == 2
+
+    # 片方の成分のセルが確定しても、もう片方の成分は変化しない
+    left = frontier.components[frontier.cell_to_component[(1, 0)]]
+    right = frontier.components[frontier.cell_to_component[(1, 9)]]
+    right_version = right.version
+    safe_cells, mine_cells = frontier.apply_known_cells({(1, 0)}, set())
+    assert mine_cells == {(1, 1)}
+    assert right.version == right_version
+    assert not left.cells
+
+    # 2つの成分にまたがる制約で1つにまとまり、まとめた成分で確定が進む
+    frontier.add_constraint((0, 5), Area({(1, 4), (1, 5)}, min_mines=1, max_mines=1))
+    safe_cells, mine_cells = frontier.add_constraint(
+        (2, 5), Area({(1, 4), (1, 5), (1, 8), (1, 9)}, min_mines=2, max_mines=2))
+    print(f"成分数: {len(frontier.components)}, 安全={safe_cells}, 地雷={mine_cells}")
+    assert len(frontier.components) == 2
+    assert frontier.cell_to_component[(1, 4)] == frontier.cell_to_component[(1, 9)]
+    assert safe_cells == set() and mine_cells == set()
+
+    component = frontier.components[frontier.cell_to_component[(1, 4)]]
+    assert component.cells == {(1, 4), (1, 5), (1, 8), (1, 9)}
+    assert set(component.constraints) == {(0, 5), (0, 9), (2, 5)}
+
+
+def test_merged_component_keeps_known_cells():
+    """まとめた成分が、まとめられた側の既知セルを引き継ぐテスト"""
+    print("\n=== 統合時の既知セル引き継ぎテスト ===")
+
+    frontier = FrontierDecomposition()
+    frontier.add_constraint((0, 0), Area({(1, 0), (1, 1)}, min_mines=1, max_mines=1))
+    frontier.add_constraint((0, 1), Area({(1, 0), (1, 1), (1, 2)}, min_mines=1, max_mines=1))  # (1, 2)は安全
+    frontier.add_constraint((3, 3), Area({(2, 3), (2, 4)}, min_mines=1, max_mines=1))
+    frontier.add_constraint((3, 4), Area({(2, 3), (2, 4), (2, 5)}, min_mines=1, max_mines=1))
+    frontier.add_constraint((3, 5), Area({(2, 4), (2, 5), (2, 6)}, min_mines=1, max_mines=1))
+
+    # (1, 2) はまだ掘っていないが安全と分かっている。(1, 2) と (2, 3) をつなぐ制約で
+    # 「(1, 2), (2, 3) に地雷1個」なら (2, 3) が地雷と分かる
+    safe_cells, mine_cells = frontier.add_constraint((2, 2), Area({(1, 2), (2, 3)}, min_mines=1, max_mines=1))
+    print(f"安全={safe_cells}, 地雷={mine_cells}")
+    assert (2, 3) in mine_cells
+    assert (2, 4) in safe_cells
+
+
+if __name__ == "__main__":
+    test_components_split_and_merge()
+    test_merged_component_keeps_known_cells()
@@ -12,7 +12,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from minesweeper import MinesweeperBoard, GameState
 from solver.solver_manager import SolverManager
 from solver.logical_solver import LogicalSolver
-from solver.solver_command import SolverAction
+from solver.solver_command import SolverAction, SolverCommand
+from solver.solver_board_view import SolverBoardView
+from minesweeper import CellState
 
 
 def test_logical_solver():
@@ -101,6 +103,70 @@ def test_logical_solver():
     print("ゲーム終了")
 
 
+def test_action_queue_dedup():
+    print("\n=== 行動キューの重複排除テスト ===")
+
+    solver = LogicalSolver()
+    solver.set_board(SolverManager.create_solver_board_view(MinesweeperBoard(40, 40, 0)))
+
+    # 同じ行動を何度追加してもキューには1つだけ入る（追加順は保たれる）
+    for _ in range(3):
+        for row in range(40):
+            for col in range(40):
+                solver._add_to_queue(SolverCommand.dig(row, col))
+    solver._add_to_queue(SolverCommand.flag(0, 0))
+    assert len(solver.action_queue) == 40 * 40 + 1
+    assert solver.get_next_move() == SolverCommand.dig(0, 0)
+
+    # 取り出した行動は再び追加できる
+    solver._add_to_queue(SolverCommand.dig(0, 0))
+    assert solver.action_queue[-1] == SolverCommand.dig(0, 0)
+
+    # コマンドは変更不可でハッシュ可能
+    assert len({SolverCommand.dig(1, 2), SolverCommand.dig(1, 2), SolverCommand.flag(1, 2)}) == 2
+    try:
+        SolverCommand.dig(1, 2).row = 3
+        assert False, "コマンドが変更できてしまいました"
+    except AttributeError:
+        pass
+    print(f"キューの長さ: {len(solver.action_queue)}")
+
+
+def test_area_analyzer_mode():
+    print("\n=== エリア解析モードのテスト ===")
+
+    # 1-2-1 の形: 1マスずつの規則では何も確定しないが、エリアの重なりから確定する
+    #   1 2 1
+    #   . . .
+    R, H = CellState.REVEALED, CellState.HIDDEN
+    cell_states = [[R, R, R], [H, H, H]]
+    visible_mine_numbers = [[1, 2, 1], [None, None, None]]
+
+    solver = LogicalSolver()
+    solver.set_board(SolverBoardView(2, 3, [list(row) for row in cell_states], visible_mine_numbers))
+    solver.find_moves()
+    assert not solver.action_queue
+
+    solver = LogicalSolver(use_area_analyzer=True)
+    solver.set_board(SolverBoardView(2, 3, [list(row) for row in cell_states], visible_mine_numbers))
+    solver.find_moves()
+    commands = set(solver.action_queue)
+    assert commands == {SolverCommand.flag(1, 0), SolverCommand.dig(1, 1), SolverCommand.flag(1, 2)}
+    print(f"確定した行動: {sorted((c.action.value, c.row, c.col) for c in commands)}")
+
+
+def test_area_analyzer_mode_on_board():
+    print("\n=== エリア解析モードで盤面を解くテスト ===")
+
+    # 推測なしで進めるだけなので、地雷を踏むことはない
+    for _ in range(5):
+        board = MinesweeperBoard(16, 16, 40)
+        board.dig(8, 8)
+        manager = SolverManager(LogicalSolver(use_area_analyzer=True))
+        manager.solve_until_manual_needed(board)
+        assert board.get_game_state() != GameState.LOST
+
+
 def display_board(board: MinesweeperBoard, show_mines: bool = False):
     """盤面を表示（CLI用）"""
     height, width = board.height, board.width
@@ -146,3 +212,6 @@ def get_cell_display_char(cell_info, show_mines: bool = False):
 
 if __name__ == "__main__":
     test_logical_solver()
+    test_action_queue_dedup()
+    test_area_analyzer_mode()
+    test_area_analyzer_mode_on_board()
@@ -0,0 +1,108 @@
+"""
+地雷確率エンジンのテスト
+"""
+
+import sys
+import os
+import random
+from fractions import Fraction
+
+# 親ディレクトリのminesweeperモジュールをインポートするための設定
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from minesweeper import MinesweeperBoard, GameState, CellState
+from solver.area_analyzer import Area
+from solver.brute_force import consistent_mine_layouts, hidden_cells
+from solver.probability import ProbabilityEngine, enumerate_solutions
+from solver.solver_manager import SolverManager
+
+
+def brute_force_probabilities(view):
+    """未発見のマスへの地雷の置き方を全て試して、各マスが地雷である確率を求める（比較用）"""
+    total = 0
+    mine_counts = dict.fromkeys(hidden_cells(view), 0)
+    for mines in consistent_mine_layouts(view):
+        total += 1
+        for cell in mines:
+            mine_counts[cell] += 1
+    return {cell: Fraction(count, total) for cell, count in mine_counts.items()}
+
+
+def test_grouped_enumeration():
+    """同じ制約の組に属するセルをまとめて数えるテスト"""
+    print("=== グループ化した数え上げテスト ===")
+
+    # 5マスに地雷2個: 10通りで、各マスは4通りで地雷
+    solutions = enumerate_solutions([Area({(0, c) for c in range(5)}, 2, 2)], deadline=float("inf"))
+    assert solutions.solution_counts == {2: 10}
+    assert solutions.mine_counts[2] == [4] * 5
+
+    # 左の2マスに1個、全体の4マスに2個: 右の2マスにも1個なので 2×2=4通り
+    constraints = [Area({(0, 0), (0, 1)}, 1, 1), Area({(0, 0), (0, 1), (0, 2), (0, 3)}, 2, 2)]
+    solutions = enumerate_solutions(constraints, deadline=float("inf"))
+    assert solutions.solution_counts == {2: 4}
+    assert solutions.mine_counts[2] == [2, 2, 2, 2]
+
+
+def test_matches_brute_force():
+    """小さい盤面で、総当たりで求めた確率と一致するテスト"""
+    print("\n=== 総当たりとの比較テスト ===")
+
+    random.seed(4)
+    engine = ProbabilityEngine()
+    checked = 0
+    for _ in range(40):
+        board = MinesweeperBoard(4, 5, 6)
+        board.dig(random.randrange(4), random.randrange(5))
+        if board.is_game_over():
+            continue
+        view = SolverManager.create_solver_board_view(board)
+
+        result = engine.analyze_view(view)
+        assert result.exact
+        expected = brute_force_probabilities(view)
+        assert {cell: result.probability(cell) for cell in expected} == expected
+        checked += 1
+    print(f"{checked}盤面を比較しました")
+    assert checked > 0
+
+
+def test_estimate_when_over_budget():
+    """上限を超えた成分があれば、概算の確率を返すテスト"""
+    print("\n=== 上限超過時の概算テスト ===")
+
+    random.seed(5)
+    board = MinesweeperBoard(16, 30, 99)
+    board.dig(8, 15)
+    view = SolverManager.create_solver_board_view(board)
+
+    result = ProbabilityEngine(max_component_cells=0).analyze_view(view)
+    probabilities = result.get_probabilities()
+    hidden_count = sum(row.count(CellState.HIDDEN) for row in view.cell_states)
+    assert not result.exact
+    assert len(probabilities) == hidden_count
+    assert all(0.0 <= probability <= 1.0 for probability in probabilities.values())
+
+
+def test_guess_mode():
+    """推測ありのモードでは、ゲームが終わるまで進めるテスト"""
+    print("\n=== 推測ありのモードのテスト ===")
+
+    random.seed(6)
+    wins = 0
+    for _ in range(10):
+        board = MinesweeperBoard(9, 9, 10)
+        board.dig(4, 4)
+        manager = SolverManager(allow_guess=True)
+        manager.solve_until_manual_needed(board)
+        assert board.is_game_over()
+        wins += board.get_game_state() == GameState.WON
+    print(f"10ゲーム中{wins}勝")
+    assert wins > 0
+
+
+if __name__ == "__main__":
+    test_grouped_enumeration()
+    test_matches_brute_force()
+    test_estimate_when_over_budget()
+    test_guess_mode()
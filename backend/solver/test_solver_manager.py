@@ -0,0 +1,69 @@
+"""
+ソルバー統合管理（SolverManager）のテスト
+"""
+
+import sys
+import os
+
+# 親ディレクトリのminesweeperモジュールをインポートするための設定
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from minesweeper import MinesweeperBoard, CellState
+from compact_board import CompactMinesweeperBoard
+from solver.solver_manager import SolverManager
+from solver.solver_command import SolverAction
+
+
+def assert_view_matches_board(manager: SolverManager, board: MinesweeperBoard):
+    """差分更新したビューが作り直したビューと一致するか確認"""
+    view = manager.get_board_view(board)
+    fresh = SolverManager.create_solver_board_view(board)
+    assert view.cell_states == fresh.cell_states
+    assert view.visible_mine_numbers == fresh.visible_mine_numbers
+
+
+def test_incremental_board_view():
+    """ソルバーの手・手動の操作どちらの変化もビューに差分で反映される"""
+    print("=== ビュー差分更新テスト ===")
+
+    for board_class in (MinesweeperBoard, CompactMinesweeperBoard):
+        board = board_class(16, 16, 40)
+        manager = SolverManager()
+        board.dig(8, 8)
+
+        view = manager.get_board_view(board)
+        steps = 0
+        while not board.is_game_over():
+            manager.analyze_board(board)
+            success, command = manager.execute_step(board)
+            if command.action == SolverAction.NO_MOVE:
+                break
+            steps += 1
+            assert_view_matches_board(manager, board)
+
+        # 手動でフラグを立てて外しても追従する
+        for row in range(board.height):
+            for col in range(board.width):
+                if board.cell_states[row][col] == CellState.HIDDEN and not board.is_game_over():
+                    board.toggle_flag(row, col)
+                    assert_view_matches_board(manager, board)
+                    board.toggle_flag(row, col)
+                    assert_view_matches_board(manager, board)
+                    break
+
+        # 同じ盤面の間はビューを作り直さない
+        assert manager.get_board_view(board) is view
+        # ビューのセル状態は盤面と共有しない
+        assert view.cell_states is not board.cell_states
+        print(f"{board_class.__name__}: {steps}手を差分更新で追従")
+
+    # 別の盤面に切り替えたら作り直す
+    other = MinesweeperBoard(9, 9, 10)
+    other.dig(4, 4)
+    assert manager.get_board_view(other) is not view
+    assert_view_matches_board(manager, other)
+
+
+if __name__ == "__main__":
+    test_incremental_board_view()
+    print("\n=== テスト完了 ===")
@@ -0,0 +1,98 @@
+"""
+Web API（api.py）のテスト
+FastAPIのTestClientはhttpxが必要（requirements.txtには含めていない開発用の依存）
+"""
+from fastapi.testclient import TestClient
+
+import api
+from compact_board import CompactMinesweeperBoard
+
+
+def new_game(client: TestClient) -> str:
+    """初級の盤面でゲームを作ってIDを返す"""
+    response = client.post("/api/new-game", json={"height": 9, "width": 9, "mines": 10})
+    assert response.status_code == 200
+    return response.json()["game_id"]
+
+
+def test_delta_responses():
+    """差分応答はこの手で変化したマスと版番号だけを返し、版がずれていれば全体を返す"""
+    print("=== 差分応答のテスト ===")
+
+    with TestClient(api.app) as client:
+        response = client.post("/api/new-game", json={"height": 9, "width": 9, "mines": 10, "seed": 1})
+        game_id = response.json()["game_id"]
+        board = api.game_sessions.get(game_id)
+
+        response = client.post("/api/dig", json={"game_id": game_id, "row": 4, "col": 4, "delta": True,
+                                                 "version": 0}).json()
+        assert response["board_data"] is None
+        assert response["version"] == board.get_version() == 1
+        revealed = board.get_last_revealed_cells()
+        assert sorted((cell["row"], cell["col"]) for cell in response["changed_cells"]) == sorted(revealed)
+        for cell in response["changed_cells"]:
+            assert cell["revealed"]
+            assert cell["number"] == board.mine_numbers[cell["row"]][cell["col"]]
+
+        # フラグの切り替えはそのマスだけを返す
+        row, col = next((r, c) for r in range(9) for c in range(9) if board.get_cell_info(r, c)['is_hidden'])
+        response = client.post("/api/flag", json={"game_id": game_id, "row": row, "col": col, "delta": True,
+                                                  "version": 1}).json()
+        assert response["version"] == board.get_version() == 2
+        assert response["changed_cells"] == [
+            {"revealed": False, "flagged": True, "mine": False, "number": 0, "row": row, "col": col}]
+
+        # 版がずれていれば全体スナップショットを返す
+        response = client.post("/api/flag", json={"game_id": game_id, "row": row, "col": col, "delta": True,
+                                                  "version": 1}).json()
+        assert response["changed_cells"] is None
+        assert response["version"] == board.get_version() == 3
+        assert not response["board_data"][row][col]["flagged"]
+    print("差分・全体の切り替えOK")
+
+
+def test_websocket_rejects_invalid_messages():
+    """JSONでないテキストやオブジェクトでない値にはエラーを返し、接続は閉じない"""
+    print("\n=== WebSocketの無効なメッセージのテスト ===")
+
+    with TestClient(api.app) as client:
+        game_id = new_game(client)
+        with client.websocket_connect(f"/ws/game/{game_id}") as websocket:
+            assert websocket.receive_json()["type"] == "snapshot"
+
+            for text in ("not json", "[1, 2]", '"dig"', '{"type": "dig"}'):
+                websocket.send_text(text)
+                reply = websocket.receive_json()
+                assert reply["type"] == "error"
+                assert reply["detail"].startswith("無効なメッセージ")
+
+            # エラーの後も同じ接続で手を進められる
+            websocket.send_json({"type": "flag", "row": 0, "col": 0})
+            reply = websocket.receive_json()
+            assert reply["type"] == "update"
+            assert [(cell["row"], cell["col"]) for cell in reply["changed_cells"]] == [(0, 0)]
+
+
+def test_compact_board_switch():
+    """MINESWEEPER_COMPACT_BOARDを有効にすると省メモリ版の盤面でゲームを進める"""
+    print("\n=== 省メモリ版の盤面の切り替えテスト ===")
+
+    api.COMPACT_BOARD = True
+    try:
+        with TestClient(api.app) as client:
+            game_id = new_game(client)
+            board = api.game_sessions.get(game_id)
+            assert isinstance(board, CompactMinesweeperBoard)
+
+            response = client.post("/api/dig", json={"game_id": game_id, "row": 4, "col": 4})
+            assert response.status_code == 200
+            assert response.json()["board_data"][4][4]["revealed"]
+    finally:
+        api.COMPACT_BOARD = False
+
+
+if __name__ == "__main__":
+    test_delta_responses()
+    test_websocket_rejects_invalid_messages()
+    test_compact_board_switch()
+    print("\n=== テスト完了 ===")
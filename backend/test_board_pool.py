@@ -0,0 +1,100 @@
+"""
+地雷配置の事前生成プール（BoardPool）のテスト
+"""
+import numpy as np
+
+from minesweeper import MinesweeperBoard, GameState
+from compact_board import CompactMinesweeperBoard, count_adjacent_mines
+from board_pool import BoardPool
+
+
+def test_take_compatible_layout():
+    """クリック位置の周囲3x3に地雷がない配置を作り、使った周囲の大きさのプールだけが減る"""
+    print("=== 配置の取り出しテスト ===")
+
+    pool = BoardPool([(9, 9, 10), (20, 24, 99)], capacity=16)
+    assert pool.refill() == 2 * 3 * 16  # 盤面サイズごとに角・辺・内側
+    assert not pool.needs_refill()
+
+    for row, col in ((0, 0), (4, 4), (8, 8), (0, 4)):
+        layout = pool.take(9, 9, 10, row, col)
+        assert layout is not None
+        mines, numbers = layout
+        assert int(mines.sum()) == 10
+        assert not mines[max(row - 1, 0):row + 2, max(col - 1, 0):col + 2].any()
+        assert (numbers == count_adjacent_mines(mines)).all()
+
+    stats = pool.get_stats()
+    assert stats["hits"] == 4
+    assert stats["pooled"]["9x9/10"] == {"4": 14, "6": 15, "9": 15}
+    assert stats["pooled"]["20x24/99"] == {"4": 16, "6": 16, "9": 16}
+    assert pool.needs_refill()
+
+    # プールしていない盤面サイズ
+    assert pool.take(5, 5, 3, 2, 2) is None
+    assert pool.get_stats()["unpooled_sizes"] == 1
+    print(f"統計: {pool.get_stats()}")
+
+
+def test_uniform_outside_window():
+    """周囲3x3以外のマスには一様に地雷が置かれる"""
+    print("\n=== 配置の分布テスト ===")
+
+    pool = BoardPool([(5, 5, 3)], capacity=2000)
+    pool.refill()
+    counts = np.zeros((5, 5), dtype=np.int64)
+    for _ in range(2000):
+        counts += pool.take(5, 5, 3, 2, 2)[0]
+
+    assert not counts[1:4, 1:4].any()
+    outside = np.ones((5, 5), dtype=np.bool_)
+    outside[1:4, 1:4] = False
+    expected = 2000 * 3 / 16
+    assert (abs(counts[outside] - expected) < expected * 0.25).all()
+
+
+def test_miss_when_empty():
+    """使える抽出がなければNoneで、盤面は通常どおり生成する"""
+    print("\n=== プールが空のときのテスト ===")
+
+    pool = BoardPool([(9, 9, 10)], capacity=1)
+    assert pool.take(9, 9, 10, 4, 4) is None
+    assert pool.get_stats()["misses"] == 1
+    pool.refill()
+    assert pool.take(9, 9, 10, 4, 4) is not None
+    assert pool.take(9, 9, 10, 5, 5) is None  # 内側用は使い切った
+    assert pool.take(9, 9, 10, 0, 0) is not None
+
+    # 地雷数が多すぎて置けない周囲の大きさはプールしない
+    dense = BoardPool([(5, 5, 20)], capacity=4)
+    assert dense.refill() == 4
+    assert dense.take(5, 5, 20, 2, 2) is None
+    assert int(dense.take(5, 5, 20, 0, 0)[0].sum()) == 20
+
+
+def test_apply_layout_to_boards():
+    """取り出した配置を設定した盤面は、その配置のまま遊べる"""
+    print("\n=== 配置の設定テスト ===")
+
+    pool = BoardPool([(16, 16, 40)], capacity=32)
+    for board_class in (MinesweeperBoard, CompactMinesweeperBoard):
+        pool.refill()
+        layout = pool.take(16, 16, 40, 8, 8)
+        assert layout is not None
+        board = board_class(16, 16, 40)
+        board.consistency_check = True
+        board.toggle_flag(0, 0)  # 初手前のフラグもカウンタに反映される
+        board.apply_mine_layout(*layout)
+        assert board.dig(8, 8)
+        board.verify_counters()
+
+        assert (np.array(board.mines, dtype=np.bool_) == layout[0]).all()
+        assert (np.array(board.mine_numbers) == layout[1]).all()
+        assert board.get_game_state() != GameState.LOST
+
+        try:
+            board.apply_mine_layout(*layout)
+            assert False, "最初の一手の後に配置を設定できてしまう"
+        except ValueError:
+            pass
+    print("盤面への設定OK")
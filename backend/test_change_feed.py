@@ -0,0 +1,76 @@
+"""
+変化配信（ChangeFeed）のテスト
+"""
+from minesweeper import MinesweeperBoard, CellState
+from change_feed import ChangeFeed
+
+
+def test_subscribers_read_since_cursor():
+    """購読者はそれぞれ前回以降の変化だけを受け取り、全員が読んだ分は捨てられる"""
+    print("=== 購読者ごとの読み取りテスト ===")
+
+    feed = ChangeFeed()
+    feed.append("購読前")  # 購読者がいないので記録されない
+    assert feed.pending_count() == 0
+
+    fast = feed.subscribe()
+    slow = feed.subscribe()
+    feed.extend(["a", "b"])
+    assert feed.read(fast) == ["a", "b"]
+    feed.append("c")
+    assert feed.read(fast) == ["c"]
+    assert feed.read(fast) == []
+    assert feed.pending_count() == 3  # slowが未読
+
+    assert feed.read(slow) == ["a", "b", "c"]
+    assert feed.pending_count() == 0
+
+    feed.unsubscribe(slow)
+    feed.append("d")
+    assert feed.read(fast) == ["d"]
+    print("OK")
+
+
+def test_gap_detection():
+    """上限を超えて取りこぼした購読者・invalidate後の購読者にはNoneを返す"""
+    print("\n=== 取りこぼし検出テスト ===")
+
+    feed = ChangeFeed(max_entries=3)
+    lagging = feed.subscribe()
+    feed.extend(range(5))
+    assert feed.pending_count() == 3
+    assert feed.read(lagging) is None
+    feed.append(5)
+    assert feed.read(lagging) == [5]
+
+    feed.append(6)
+    feed.invalidate()
+    assert feed.read(lagging) is None
+    assert feed.read(lagging) == []
+    print("OK")
+
+
+def test_board_publishes_changes():
+    """盤面は掘ったマスとフラグの切り替えを配信する"""
+    print("\n=== 盤面の変化配信テスト ===")
+
+    board = MinesweeperBoard(16, 16, 40)  # 初手で勝たない大きさ
+    subscriber = board.change_feed.subscribe()
+    board.dig(8, 8)
+    changes = board.change_feed.read(subscriber)
+    assert [(row, col) for row, col, _ in changes] == board.get_last_revealed_cells()
+    assert all(state == CellState.REVEALED for _, _, state in changes)
+
+    hidden = next((row, col) for row in range(16) for col in range(16)
+                  if board.cell_states[row][col] == CellState.HIDDEN)
+    board.toggle_flag(*hidden)
+    board.toggle_flag(*hidden)
+    assert board.change_feed.read(subscriber) == [(*hidden, CellState.FLAGGED), (*hidden, CellState.HIDDEN)]
+    print("OK")
+
+
+if __name__ == "__main__":
+    test_subscribers_read_since_cursor()
+    test_gap_detection()
+    test_board_publishes_changes()
+    print("\n=== テスト完了 ===")
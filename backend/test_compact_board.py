@@ -0,0 +1,175 @@
+"""
+省メモリ版盤面（CompactMinesweeperBoard）のテスト
+"""
+import random
+
+import numpy as np
+
+from minesweeper import MinesweeperBoard, CellState, GameState
+from compact_board import CompactMinesweeperBoard, count_adjacent_mines
+
+
+def _play_same_game(moves, height=9, width=9, mine_count=10, seed=0):
+    """同じ地雷配置で両方の盤面に同じ手を打つ"""
+    boards = []
+    for board_class in (MinesweeperBoard, CompactMinesweeperBoard):
+        board = board_class(height, width, mine_count)
+        random.seed(seed)
+        for action, row, col in moves:
+            if action == 'dig':
+                board.dig(row, col)
+            else:
+                board.toggle_flag(row, col)
+        boards.append(board)
+    return boards
+
+
+def test_same_behavior_as_list_board():
+    """リスト版と同じ手順で同じ盤面になるか"""
+    print("=== リスト版との一致テスト ===")
+
+    moves = [('flag', 0, 0), ('dig', 4, 4), ('flag', 0, 0), ('flag', 8, 8), ('dig', 0, 8)]
+    list_board, compact_board = _play_same_game(moves)
+
+    assert compact_board.get_board_data() == list_board.get_board_data()
+    assert compact_board.get_remaining_mines() == list_board.get_remaining_mines()
+    assert compact_board.get_game_state() == list_board.get_game_state()
+    print(f"ゲーム状態: {compact_board.get_game_state().name}, 残り地雷数: {compact_board.get_remaining_mines()}")
+
+
+def test_moves_match_list_board():
+    """配列を直接読み書きする掘る・フラグの処理が、一手ごとにリスト版と同じ結果になるか"""
+    print("\n=== 一手ごとのリスト版との一致テスト ===")
+
+    for label_zero in (False, True):
+        list_board = MinesweeperBoard(30, 30, 150, seed=7)
+        compact_board = CompactMinesweeperBoard(30, 30, 150, label_zero_regions=label_zero, seed=7)
+        for board in (list_board, compact_board):
+            board.consistency_check = True
+
+        rng = random.Random(label_zero)
+        cells = [(row, col) for row in range(30) for col in range(30)]
+        rng.shuffle(cells)
+        for row, col in cells:
+            if list_board.is_game_over():
+                break
+            # 地雷はたまにしか掘らず、ゲームを長く続ける
+            actions = ["toggle_flag"] if rng.random() < 0.2 else []
+            if list_board.first_click or not list_board.mines[row][col] or rng.random() < 0.1:
+                actions.append("dig")
+            for action in actions:
+                assert getattr(compact_board, action)(row, col) == getattr(list_board, action)(row, col)
+                assert sorted(compact_board.get_last_revealed_cells()) == sorted(list_board.get_last_revealed_cells())
+                assert compact_board.get_version() == list_board.get_version()
+                assert compact_board.get_remaining_mines() == list_board.get_remaining_mines()
+
+        assert compact_board.get_board_data() == list_board.get_board_data()
+        assert compact_board.get_game_state() == list_board.get_game_state()
+    print("30x30盤面で一致")
+
+
+def test_cell_states_view():
+    """cell_states[row][col] 形式の読み書き"""
+    print("\n=== セル状態ビューテスト ===")
+
+    board = CompactMinesweeperBoard(5, 5, 3)
+    board.toggle_flag(1, 2)
+
+    assert board.cell_states[1][2] == CellState.FLAGGED
+    assert board.cell_states[0][0] == CellState.HIDDEN
+    assert board.cell_states[1][:3] == [CellState.HIDDEN, CellState.HIDDEN, CellState.FLAGGED]
+    assert len(board.cell_states) == 5 and len(board.cell_states[0]) == 5
+
+    board.cell_states[0][0] = CellState.REVEALED
+    assert board.get_cell_info(0, 0)['is_revealed']
+    print("ビュー経由の読み書きOK")
+
+
+def test_win_and_lose():
+    """勝敗判定"""
+    print("\n=== 勝敗判定テスト ===")
+
+    board = CompactMinesweeperBoard(5, 5, 1)
+    board.dig(2, 2)
+    mine_row, mine_col = [(r, c) for r in range(5) for c in range(5) if board.mines[r][c]][0]
+    for row in range(5):
+        for col in range(5):
+            if (row, col) != (mine_row, mine_col):
+                board.dig(row, col)
+    assert board.get_game_state() == GameState.WON
+
+    board = CompactMinesweeperBoard(5, 5, 1)
+    board.dig(2, 2)
+    mine_row, mine_col = [(r, c) for r in range(5) for c in range(5) if board.mines[r][c]][0]
+    assert board.dig(mine_row, mine_col) is False
+    assert board.get_game_state() == GameState.LOST
+    print("勝利・敗北ともに判定OK")
+
+
+def test_count_adjacent_mines():
+    """一括計算した周囲の地雷数がループ版と一致するか"""
+    print("\n=== 周囲の地雷数一括計算テスト ===")
+
+    board = MinesweeperBoard(12, 17, 40)
+    board.dig(6, 8)
+    vectorized = count_adjacent_mines(np.array(board.mines))
+
+    assert vectorized.tolist() == board.mine_numbers
+    print("12x17盤面で一致")
+
+
+def test_zero_region_lookup():
+    """0の領域の一括展開がスタック展開と同じマスを開くか"""
+    print("\n=== 0の領域一括展開テスト ===")
+
+    for seed in range(5):
+        random.seed(seed)
+        stack_board = CompactMinesweeperBoard(30, 40, 60)
+        stack_board.dig(15, 20)
+        random.seed(seed)
+        region_board = CompactMinesweeperBoard(30, 40, 60, label_zero_regions=True)
+        region_board.dig(15, 20)
+
+        assert sorted(region_board.get_last_revealed_cells()) == sorted(stack_board.get_last_revealed_cells())
+        assert region_board.get_board_data() == stack_board.get_board_data()
+
+    # 領域内にフラグがある場合はスタック展開にフォールバックする
+    board = CompactMinesweeperBoard(20, 20, 1, label_zero_regions=True)
+    board.toggle_flag(10, 10)
+    board.dig(0, 0)
+    assert board.cell_states[10][10] == CellState.FLAGGED
+    safe_hidden_count = 20 * 20 - 1 - (0 if board.mines[10][10] else 1)
+    assert len(board.get_last_revealed_cells()) == safe_hidden_count
+    print("一括展開の結果がスタック展開と一致")
+
+
+def test_large_flood_fill():
+    """広い0の領域でも再帰上限に引っかからないか"""
+    print("\n=== 大きな領域の展開テスト ===")
+
+    board = MinesweeperBoard(200, 200, 1)
+    board.dig(0, 0)
+    revealed = board.get_last_revealed_cells()
+    print(f"200x200盤面で{len(revealed)}マス展開")
+    assert len(revealed) == 200 * 200 - 1
+
+
+def test_storage_size():
+    """50x50盤面のデータサイズ"""
+    print("\n=== 格納サイズテスト ===")
+
+    board = CompactMinesweeperBoard(50, 50, 500)
+    print(f"50x50盤面: {board.get_storage_bytes()}バイト")
+    assert board.get_storage_bytes() == 50 * 50 * 3
+
+
+if __name__ == "__main__":
+    test_same_behavior_as_list_board()
+    test_moves_match_list_board()
+    test_cell_states_view()
+    test_win_and_lose()
+    test_count_adjacent_mines()
+    test_zero_region_lookup()
+    test_large_flood_fill()
+    test_storage_size()
+    print("\n=== テスト完了 ===")
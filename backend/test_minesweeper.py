@@ -0,0 +1,130 @@
+"""
+MinesweeperBoardのテスト
+"""
+import random
+
+from minesweeper import MinesweeperBoard, GameState, generate_mine_positions
+from compact_board import CompactMinesweeperBoard
+
+
+def _play_random_moves(board: MinesweeperBoard, rng: random.Random, max_moves: int = 200):
+    """ランダムに掘る・フラグを切り替える"""
+    for _ in range(max_moves):
+        row, col = rng.randrange(board.height), rng.randrange(board.width)
+        if rng.random() < 0.3:
+            board.toggle_flag(row, col)
+        else:
+            board.dig(row, col)
+        if board.is_game_over():
+            break
+
+
+def test_counters_match_full_scan():
+    """カウンタが全体スキャンと一致し続けるか（整合性チェックモード）"""
+    print("=== カウンタ整合性テスト ===")
+
+    for board_class in (MinesweeperBoard, CompactMinesweeperBoard):
+        for seed in range(20):
+            rng = random.Random(seed)
+            random.seed(seed)
+            board = board_class(10, 12, 15)
+            board.consistency_check = True
+
+            # 初手前のフラグもカウンタに反映される
+            board.toggle_flag(0, 0)
+            _play_random_moves(board, rng)
+
+            board.verify_counters()
+            assert board.get_remaining_mines() == board.mine_count - board._scan_counters()[1]
+        print(f"{board_class.__name__}: 20ゲームで不整合なし")
+
+
+def test_seeded_generation():
+    """シードを指定すれば、共有の乱数の状態に関係なく同じ最初の一手で同じ盤面になる"""
+    print("\n=== シード付き盤面生成テスト ===")
+
+    positions = generate_mine_positions(16, 30, 99, 8, 15, seed=42)
+    random.seed(1)
+    assert generate_mine_positions(16, 30, 99, 8, 15, seed=42) == positions
+    assert generate_mine_positions(16, 30, 99, 8, 15, seed=43) != positions
+    assert generate_mine_positions(16, 30, 99, 0, 0, seed=42) != positions
+    assert all(abs(row - 8) > 1 or abs(col - 15) > 1 for row, col in positions)
+
+    for board_class in (MinesweeperBoard, CompactMinesweeperBoard):
+        random.seed(2)
+        board = board_class(16, 30, 99, seed=42)
+        board.dig(8, 15)
+        assert sorted((row, col) for row in range(16) for col in range(30) if board.mines[row][col]) == sorted(positions)
+    print("シード付き生成OK")
+
+
+def test_mine_indices_skip_first_click_window():
+    """除外する3x3（端では切り詰め）を飛ばして、重複なく地雷を置く"""
+    print("\n=== 地雷配置の除外テスト ===")
+
+    for height, width, row, col in ((5, 7, 0, 0), (5, 7, 4, 6), (5, 7, 2, 3), (1, 9, 0, 4)):
+        window = {(r, c) for r in range(row - 1, row + 2) for c in range(col - 1, col + 2)
+                  if 0 <= r < height and 0 <= c < width}
+        available = height * width - len(window)
+        for seed in range(20):
+            positions = generate_mine_positions(height, width, available, row, col, seed=seed)
+            # 全ての候補に置いたら、除外以外の全マスがちょうど1回ずつ選ばれる
+            assert sorted(positions) == sorted({(r, c) for r in range(height) for c in range(width)} - window)
+        try:
+            generate_mine_positions(height, width, available + 1, row, col, seed=0)
+            assert False, "地雷数が多すぎるのにエラーにならない"
+        except ValueError:
+            pass
+    print("除外・重複なしOK")
+
+
+def test_win_by_counters():
+    """未発見の安全なマスがなくなったら勝利"""
+    print("\n=== カウンタによる勝利判定テスト ===")
+
+    board = MinesweeperBoard(6, 6, 3)
+    board.consistency_check = True
+    board.dig(0, 0)
+    cells = [(row, col) for row in range(6) for col in range(6)]
+    for row, col in cells:
+        if board.mines[row][col]:
+            board.toggle_flag(row, col)
+    for row, col in cells:
+        if not board.mines[row][col]:
+            board.dig(row, col)
+
+    assert board.get_game_state() == GameState.WON
+    assert board.get_remaining_mines() == 0
+    print("勝利判定OK")
+
+
+def test_version_and_revealed_cells():
+    """版番号は盤面が変化した手でだけ進み、変化したマスが取得できるか"""
+    print("\n=== 版番号テスト ===")
+
+    board = MinesweeperBoard(8, 8, 6)
+    assert board.get_version() == 0
+
+    board.dig(4, 4)
+    assert board.get_version() == 1
+    assert (4, 4) in board.get_last_revealed_cells()
+
+    # 発見済みのマスを掘っても・フラグを立てようとしても変化なし
+    board.dig(4, 4)
+    board.toggle_flag(4, 4)
+    assert board.get_version() == 1
+    assert board.get_last_revealed_cells() == []
+
+    hidden = [(r, c) for r in range(8) for c in range(8) if board.get_cell_info(r, c)['is_hidden']]
+    board.toggle_flag(*hidden[0])
+    assert board.get_version() == 2
+    print(f"版番号: {board.get_version()}")
+
+
+if __name__ == "__main__":
+    test_counters_match_full_scan()
+    test_seeded_generation()
+    test_mine_indices_skip_first_click_window()
+    test_win_by_counters()
+    test_version_and_revealed_cells()
+    print("\n=== テスト完了 ===")
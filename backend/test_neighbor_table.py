@@ -0,0 +1,48 @@
+"""
+近傍テーブルのテスト
+"""
+import copy
+import pickle
+
+from minesweeper import MinesweeperBoard
+from neighbor_table import get_neighbor_table
+
+
+def test_neighbors_match_bounds_check():
+    """近傍が範囲チェック付きの素朴な計算と一致するか"""
+    print("=== 近傍テーブル整合性テスト ===")
+
+    for height, width in ((5, 7), (1, 4), (1, 1)):
+        table = get_neighbor_table(height, width)
+        for row in range(height):
+            for col in range(width):
+                expected = [(row + dr, col + dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1)
+                            if (dr, dc) != (0, 0) and 0 <= row + dr < height and 0 <= col + dc < width]
+                assert list(table.neighbors(row, col)) == expected
+
+                index = row * width + col
+                flat = [r * width + c for r, c in expected]
+                assert list(table.neighbor_indices(index)) == flat
+        assert len(table.offsets) == height * width + 1
+    print("5x7・1x4・1x1盤面の全マスで一致")
+
+
+def test_table_is_shared():
+    """同じサイズの盤面でテーブルが共有されるか"""
+    print("\n=== 近傍テーブル共有テスト ===")
+
+    board1 = MinesweeperBoard(9, 9, 10)
+    board2 = MinesweeperBoard(9, 9, 10)
+    assert board1._neighbor_table is board2._neighbor_table
+    assert board1._get_neighbors(4, 4) is board2._get_neighbors(4, 4)
+
+    # コピー・pickleしても共有テーブルを指す
+    assert copy.deepcopy(board1)._neighbor_table is board1._neighbor_table
+    assert pickle.loads(pickle.dumps(board1))._neighbor_table is board1._neighbor_table
+    print("共有OK")
+
+
+if __name__ == "__main__":
+    test_neighbors_match_bounds_check()
+    test_table_is_shared()
+    print("\n=== テスト完了 ===")
@@ -0,0 +1,101 @@
+"""
+推測なしで解ける盤面の生成（NoGuessGenerator）のテスト
+"""
+import os
+import signal
+
+from minesweeper import MinesweeperBoard, GameState
+from board_snapshot import encode_board, decode_board
+from no_guess import NoGuessGenerator, is_solvable_without_guess
+from simulation import create_solver
+from solver.solver_manager import SolverManager
+
+
+def test_found_seed_is_solvable():
+    """見つかったシードの盤面は、最初の一手から推測なしで最後まで解ける"""
+    print("=== 解けるシードの生成テスト ===")
+
+    generator = NoGuessGenerator(workers=1)
+    for row, col in ((0, 0), (4, 4), (8, 3)):
+        seed = generator.find_seed(9, 9, 10, row, col, base_seed=row * 100 + col)
+        assert seed is not None
+
+        board = MinesweeperBoard(9, 9, 10, seed=seed)
+        board.dig(row, col)
+        manager = SolverManager(create_solver("area"))
+        manager.solve_until_manual_needed(board)
+        assert board.get_game_state() == GameState.WON
+        assert manager.guess_count == 0
+
+    stats = generator.get_stats()
+    assert stats["found"] == 3
+    assert stats["candidates"] >= 3
+    print(f"統計: {stats}")
+
+
+def test_rejects_guess_boards():
+    """推測が必要な候補は捨て、候補の順で最初に解けるシードを返す"""
+    print("\n=== 推測が必要な盤面の除外テスト ===")
+
+    seeds = range(40)
+    solvable = [seed for seed in seeds if is_solvable_without_guess(20, 24, 99, 10, 12, seed)]
+    assert solvable and len(solvable) < len(seeds)  # 上級は推測が必要な盤面も多い
+
+    generator = NoGuessGenerator(workers=1)
+    assert generator.find_seed(20, 24, 99, 10, 12, base_seed=0) == solvable[0]
+    assert generator.get_stats()["candidates"] == solvable[0] + 1
+
+
+def test_cache_and_timeout():
+    """キャッシュしたシードは一度だけ返し、時間内に見つからなければNone"""
+    print("\n=== キャッシュと時間切れのテスト ===")
+
+    generator = NoGuessGenerator(workers=1, cache_size=1)
+    assert generator.warm(9, 9, 10, 4, 4, count=2) == 2
+    first = generator.find_seed(9, 9, 10, 4, 4)
+    second = generator.find_seed(9, 9, 10, 4, 4)
+    assert first != second
+    assert generator.get_stats()["cache_hits"] == 2
+    assert generator.get_stats()["cached_seeds"] == 0
+
+    # 上限を超えた最初の一手の位置は、最も長く使われていないものから捨てる
+    generator.warm(9, 9, 10, 0, 0, count=1)
+    generator.warm(9, 9, 10, 8, 8, count=1)
+    assert generator.get_stats()["cached_seeds"] == 1
+
+    assert generator.find_seed(20, 24, 99, 10, 12, timeout=0) is None
+    assert generator.get_stats()["timeouts"] == 1
+
+
+def test_recovers_from_broken_pool():
+    """ワーカープロセスが落ちたらNoneを返してプロセスプールを捨て、次の呼び出しで作り直す"""
+    print("\n=== ワーカープロセスが落ちたときのテスト ===")
+
+    generator = NoGuessGenerator(workers=2)
+    try:
+        assert generator.find_seed(9, 9, 10, 4, 4, base_seed=0) is not None
+        broken_executor = generator._executor
+        process = next(iter(broken_executor._processes.values()))
+        os.kill(process.pid, signal.SIGKILL)
+        process.join()
+
+        # キャッシュに入った(4, 4)のシードを使わないよう、別の位置で探す
+        assert generator.find_seed(9, 9, 10, 0, 0, base_seed=100) is None
+        assert generator.get_stats()["broken_pools"] == 1
+        assert generator._executor is None
+
+        assert generator.find_seed(9, 9, 10, 8, 8, base_seed=200) is not None
+        assert generator._executor is not broken_executor
+    finally:
+        generator.close()
+
+
+def test_snapshot_keeps_no_guess():
+    """推測なしの指定は最初の一手の前のスナップショットにも残る"""
+    print("\n=== スナップショットのテスト ===")
+
+    board = MinesweeperBoard(9, 9, 10, no_guess=True)
+    restored = decode_board(encode_board(board))
+    assert restored.no_guess
+    assert restored.seed is None
+    assert not decode_board(encode_board(MinesweeperBoard(9, 9, 10))).no_guess
@@ -0,0 +1,256 @@
+"""
+盤面スナップショットとSQLiteセッションバックエンドのテスト
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from minesweeper import MinesweeperBoard, CellState, GameState
+from compact_board import CompactMinesweeperBoard
+from board_snapshot import encode_board, decode_board, _HEADERS
+from session_backend import SQLiteSessionBackend, SessionConflictError, SessionBusyError
+from session_store import SessionStore
+
+
+def assert_same_board(a: MinesweeperBoard, b: MinesweeperBoard):
+    """2つの盤面が同じ状態か確認"""
+    assert type(a) is type(b)
+    assert (a.height, a.width, a.mine_count) == (b.height, b.width, b.mine_count)
+    assert a.first_click == b.first_click
+    assert a.game_state == b.game_state
+    assert a.get_version() == b.get_version()
+    assert a.get_remaining_mines() == b.get_remaining_mines()
+    assert a.get_board_data() == b.get_board_data()
+    assert a._scan_counters() == (b._hidden_safe_count, b._flag_count)
+
+
+def play_some_moves(board: MinesweeperBoard):
+    """最初の一手と安全なマスのフラグ切り替えで盤面を進める"""
+    board.dig(board.height // 2, board.width // 2)
+    for row in range(board.height):
+        for col in range(board.width):
+            if board.cell_states[row][col] == CellState.HIDDEN:
+                board.toggle_flag(row, col)
+                return
+
+
+def test_snapshot_round_trip():
+    """どちらの盤面も初手前・ゲーム中の状態をそのまま復元できる"""
+    print("=== スナップショット往復テスト ===")
+
+    for board_class in (MinesweeperBoard, CompactMinesweeperBoard):
+        fresh = board_class(9, 13, 20)
+        fresh.toggle_flag(0, 0)
+        assert_same_board(fresh, decode_board(encode_board(fresh)))
+
+        board = board_class(9, 13, 20)
+        play_some_moves(board)
+        data = encode_board(board)
+        restored = decode_board(data)
+        assert_same_board(board, restored)
+
+        # 復元した盤面でゲームを続けられる
+        assert restored.game_state == GameState.PLAYING
+        print(f"{board_class.__name__}: {len(data)} バイト")
+
+
+def test_snapshot_keeps_seed():
+    """初手前に保存しても、シードがあれば復元後に同じ盤面が生成される"""
+    print("\n=== スナップショットのシードテスト ===")
+
+    for board_class in (MinesweeperBoard, CompactMinesweeperBoard):
+        board = board_class(9, 13, 20, seed=7)
+        restored = decode_board(encode_board(board))
+        assert restored.seed == 7
+        board.dig(4, 6)
+        restored.dig(4, 6)
+        assert_same_board(board, restored)
+        assert [list(row) for row in board.mines] == [list(row) for row in restored.mines]
+
+    # 形式バージョン1（シードなし）のスナップショットも読める
+    board = MinesweeperBoard(9, 13, 20)
+    play_some_moves(board)
+    data = encode_board(board)
+    header = _HEADERS[1].pack(*_HEADERS[2].unpack_from(data)[:8])
+    header = header[:4] + bytes([1]) + header[5:]
+    restored = decode_board(header + data[_HEADERS[2].size:])
+    assert restored.seed is None
+    assert_same_board(board, restored)
+    print("シードの保存・旧形式の読み込みOK")
+
+
+def test_sqlite_write_behind():
+    """保存はflushまで書き込まれず、その間もloadで最新の盤面が見える"""
+    print("\n=== SQLiteライトビハインドテスト ===")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sessions.db")
+        backend = SQLiteSessionBackend(path)
+
+        board = CompactMinesweeperBoard(9, 9, 10)
+        play_some_moves(board)
+        backend.save("game", board)
+        assert backend.get_stats()["stored_sessions"] == 0
+        assert backend.load("game") is board
+
+        backend.flush()
+        assert backend.get_stats()["stored_sessions"] == 1
+        assert backend.get_stats()["pending_writes"] == 0
+        backend.close()
+
+        # 別の接続（再起動後）から読み込める
+        reopened = SQLiteSessionBackend(path)
+        assert_same_board(board, reopened.load("game"))
+
+        reopened.delete("game")
+        assert reopened.load("game") is None
+        reopened.close()
+        print("書き込み待ちの参照・再起動後の読み込みOK")
+
+
+def test_write_behind_chunks():
+    """書き込みはwrite_chunk_size件ずつコミットし、書き込み中も読み出しは書き込み用の接続を待たない"""
+    print("\n=== 書き込みの分割と読み出しの並行テスト ===")
+
+    with tempfile.TemporaryDirectory() as directory:
+        backend = SQLiteSessionBackend(os.path.join(directory, "sessions.db"), write_chunk_size=2)
+        for index in range(5):
+            backend.save(f"game{index}", MinesweeperBoard(9, 9, 10))
+        backend.flush()
+        assert backend.get_stats()["flushes"] == 3
+        assert backend.get_stats()["stored_sessions"] == 5
+
+        # 書き込み用の接続を使用中（別スレッドで書き込み中）でも読み出しは終わる
+        results = []
+        with backend._write_lock:
+            reader = threading.Thread(target=lambda: results.append(
+                (backend.load("game0"), backend.stored_version("game0"), backend.get_stats()["stored_sessions"])))
+            reader.start()
+            reader.join(timeout=5.0)
+            assert not reader.is_alive(), "読み出しが書き込み用の接続を待っています"
+        board, version, stored = results[0]
+        assert board is not None and version == 0 and stored == 5
+        backend.close()
+        print("分割コミット・書き込み中の読み出しOK")
+
+
+def test_store_with_backend():
+    """追い出したセッションはバックエンドから読み直され、削除はバックエンドにも反映される"""
+    print("\n=== バックエンドつき保管庫テスト ===")
+
+    with tempfile.TemporaryDirectory() as directory:
+        backend = SQLiteSessionBackend(os.path.join(directory, "sessions.db"))
+        store = SessionStore(max_size=1, idle_ttl=100, backend=backend)
+
+        first = MinesweeperBoard(5, 5, 3)
+        play_some_moves(first)
+        store["a"] = first
+        store["b"] = MinesweeperBoard(5, 5, 3)  # aはメモリから追い出される
+        backend.flush()
+
+        assert "a" in store
+        assert_same_board(first, store["a"])
+        assert store.get_stats()["loaded_from_backend"] == 1
+
+        del store["a"]
+        backend.flush()
+        assert "a" not in store
+        print(f"統計: {store.get_stats()}")
+        backend.close()
+
+
+def test_shared_between_workers():
+    """共有バックエンドでは他のワーカーの更新が見え、同じ版からの同時更新は競合になる"""
+    print("\n=== ワーカー間共有テスト ===")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sessions.db")
+        worker_a = SessionStore(backend=SQLiteSessionBackend(path, shared=True))
+        worker_b = SessionStore(backend=SQLiteSessionBackend(path, shared=True))
+
+        worker_a["game"] = MinesweeperBoard(9, 9, 10)
+        assert "game" in worker_b  # 書き込みは即時なのでflush不要
+
+        # aで進めた手がbから見える
+        worker_a["game"].dig(4, 4)
+        worker_a.mark_dirty("game")
+        assert_same_board(worker_a["game"], worker_b["game"])
+        assert worker_b.get_stats()["reloaded_stale"] == 1
+
+        # 同じ版から両方が更新すると、後から保存した方が競合になる
+        play_some_moves(worker_a["game"])
+        play_some_moves(worker_b["game"])
+        worker_a.mark_dirty("game")
+        try:
+            worker_b.mark_dirty("game")
+            assert False, "競合が検出されませんでした"
+        except SessionConflictError:
+            pass
+        assert_same_board(worker_a["game"], worker_b["game"])
+
+        # 削除も他のワーカーに反映される
+        del worker_a["game"]
+        assert "game" not in worker_b
+        print("ワーカー間の更新・競合検出・削除OK")
+
+
+def test_shared_busy_timeout():
+    """共有時に別のプロセスが書き込みロックを持ち続けても、短い時間で打ち切ってSessionBusyErrorにする"""
+    print("\n=== ロック待ちの打ち切りテスト ===")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sessions.db")
+        worker = SessionStore(backend=SQLiteSessionBackend(path, idle_ttl=3600, shared=True, busy_timeout=0.05))
+        worker["game"] = MinesweeperBoard(9, 9, 10)
+        writer = SQLiteSessionBackend(path, busy_timeout=0.05)  # ライトビハインドのワーカー
+        writer.save("other", MinesweeperBoard(9, 9, 10))
+
+        other = sqlite3.connect(path, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")  # 別のプロセスの書き込み中
+        try:
+            # WALなので読み込み（版番号の確認）はロック中でもできる
+            board = worker.get("game")
+            board.dig(4, 4)
+            start = time.perf_counter()
+            try:
+                worker.mark_dirty("game")
+                assert False, "ロック待ちが打ち切られませんでした"
+            except SessionBusyError:
+                pass
+            assert time.perf_counter() - start < 1.0
+
+            # 期限切れの削除・書き込み待ちの保存もSessionBusyErrorになり、統計（読み込みのみ）は取れる
+            for operation in (worker.sweep, writer.flush):
+                try:
+                    operation()
+                    assert False, "ロック待ちが打ち切られませんでした"
+                except SessionBusyError:
+                    pass
+            assert worker.get_stats()["backend"]["stored_sessions"] == 1
+        finally:
+            other.execute("ROLLBACK")
+            other.close()
+
+        # 書き込めなかったスナップショットは読み込めて、次のflushで書き込まれる
+        assert writer.pending_count() == 1
+        assert writer.load("other") is not None
+        writer.flush()
+        assert writer.pending_count() == 0
+        assert worker.get("other") is not None
+
+        # 保存できなかった変更は捨て、保存済みの盤面から読み込み直す
+        assert worker.get("game").first_click
+        assert worker.get_stats()["backend"]["busy_timeouts"] == 2
+        print("ロック待ちの打ち切りOK")
+
+
+if __name__ == "__main__":
+    test_snapshot_round_trip()
+    test_sqlite_write_behind()
+    test_write_behind_chunks()
+    test_store_with_backend()
+    test_shared_between_workers()
+    test_shared_busy_timeout()
+    print("\n=== テスト完了 ===")
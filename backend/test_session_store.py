@@ -0,0 +1,64 @@
+"""
+セッション保管庫（SessionStore）のテスト
+"""
+from minesweeper import MinesweeperBoard
+from session_store import SessionStore
+
+
+class FakeClock:
+    """テスト用の手動で進める時計"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction():
+    """上限を超えたら最も長く使われていないセッションから追い出す"""
+    print("=== LRU追い出しテスト ===")
+
+    evicted = []
+    store = SessionStore(max_size=2, idle_ttl=100, on_evict=evicted.append, clock=FakeClock())
+    store["a"] = MinesweeperBoard(5, 5, 3)
+    store["b"] = MinesweeperBoard(5, 5, 3)
+    store["a"]  # aを参照したのでbが最も古くなる
+    store["c"] = MinesweeperBoard(5, 5, 3)
+
+    assert "a" in store and "c" in store
+    assert "b" not in store
+    assert evicted == ["b"]
+    assert store.get_stats()["evicted_lru"] == 1
+    print(f"統計: {store.get_stats()}")
+
+
+def test_idle_ttl():
+    """放置期限切れのセッションは見えなくなり、sweepで削除される"""
+    print("\n=== 放置期限テスト ===")
+
+    clock = FakeClock()
+    store = SessionStore(max_size=10, idle_ttl=60, clock=clock)
+    store["old"] = MinesweeperBoard(5, 5, 3)
+    clock.now = 50
+    store["new"] = MinesweeperBoard(5, 5, 3)
+
+    clock.now = 100
+    assert store.sweep() == 1
+    assert "old" not in store and "new" in store
+
+    # 参照すると期限が延びる
+    clock.now = 105
+    store["new"]
+    clock.now = 160
+    assert "new" in store
+    clock.now = 300
+    assert "new" not in store
+    assert store.get_stats()["expired_ttl"] == 2
+    print(f"統計: {store.get_stats()}")
+
+
+if __name__ == "__main__":
+    test_lru_eviction()
+    test_idle_ttl()
+    print("\n=== テスト完了 ===")
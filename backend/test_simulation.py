@@ -0,0 +1,43 @@
+"""
+ソルバーの一括シミュレーションのテスト
+"""
+from minesweeper import GameState
+from simulation import play_game, run_simulation, summarize
+
+
+def test_play_game_is_reproducible():
+    """同じシードなら同じ結果になる"""
+    print("=== 再現性テスト ===")
+
+    first = play_game("初級", 7)
+    second = play_game("初級", 7)
+    assert (first.state, first.moves, first.guesses) == (second.state, second.moves, second.guesses)
+    assert first.state != GameState.PLAYING  # 推測ありなら最後まで進む
+    print(f"結果: {first}")
+
+
+def test_summarize():
+    """プリセットごとに集計され、推測なしでは地雷を踏まない"""
+    print("\n=== 集計テスト ===")
+
+    stats = summarize(run_simulation(["初級", "中級"], 6, solver_name="area", allow_guess=False,
+                                     workers=1, chunk_size=4))
+    assert set(stats) == {"初級", "中級"}
+    for preset_stats in stats.values():
+        assert preset_stats.games == 6
+        assert preset_stats.losses == 0
+        assert preset_stats.guesses_per_game == 0
+    print(f"初級: 勝率 {stats['初級'].win_rate:.1%}, 中級: 勝率 {stats['中級'].win_rate:.1%}")
+
+
+def test_process_pool_matches_single_process():
+    """プロセスプールで解いても、結果（順不同）は1プロセスのときと同じ"""
+    print("\n=== プロセスプールテスト ===")
+
+    def key(result):
+        return result.preset, result.seed, result.state, result.moves, result.guesses
+
+    single = sorted(map(key, run_simulation(["初級"], 8, workers=1, chunk_size=3)))
+    pooled = sorted(map(key, run_simulation(["初級"], 8, workers=2, chunk_size=3)))
+    assert pooled == single
+    assert [seed for _, seed, *_ in single] == list(range(8))
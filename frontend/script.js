@@ -7,6 +7,8 @@ class WebMinesweeper {
         this.timerInterval = null;
         this.gameStarted = false;
         this.gameState = 'PLAYING'; // ゲーム状態を追跡
+        this.version = 0; // 手元の盤面の版番号（差分応答の取りこぼし検出用）
+        this.cellElements = []; // [row][col] → セル要素
 
         this.initializeEventListeners();
     }
@@ -63,6 +65,7 @@ class WebMinesweeper {
             const data = await response.json();
             this.gameId = data.game_id;
             this.gameState = 'PLAYING'; // ゲーム状態をリセット
+            this.version = data.version;
             this.renderBoard(data.board_data);
             this.updateGameInfo(data);
             this.resetTimer();
@@ -80,10 +83,12 @@ class WebMinesweeper {
     renderBoard(boardData) {
         const gameBoard = document.getElementById('game-board');
         gameBoard.innerHTML = '';
+        this.cellElements = [];
 
         for (let row = 0; row < boardData.length; row++) {
             const rowDiv = document.createElement('div');
             rowDiv.className = 'board-row';
+            this.cellElements.push([]);
 
             for (let col = 0; col < boardData[row].length; col++) {
                 const cell = document.createElement('div');
@@ -99,12 +104,56 @@ class WebMinesweeper {
                 cell.addEventListener('contextmenu', (e) => this.handleRightClick(e));
 
                 rowDiv.appendChild(cell);
+                this.cellElements[row].push(cell);
             }
 
             gameBoard.appendChild(rowDiv);
         }
     }
 
+    // 差分応答なら変化したマスだけ書き換え、スナップショットなら盤面を作り直す
+    applyBoardUpdate(response, data, sentVersion) {
+        if (!response.ok) {
+            // 競合（409）・混雑（503）などで手が反映されなかった → 保存されている盤面を取り直す
+            console.warn('Move was not applied:', data.detail);
+            this.refreshBoard();
+            return false;
+        }
+        if (data.version < this.version) return false; // 追い越された古い応答は無視
+
+        if (data.changed_cells) {
+            if (sentVersion !== this.version) {
+                // 送信後に別の応答で盤面が進んでいた → 取りこぼし防止のため全体を取り直す
+                this.refreshBoard();
+                return false;
+            }
+            for (const cellData of data.changed_cells) {
+                this.updateCellDisplay(this.cellElements[cellData.row][cellData.col], cellData);
+            }
+        } else {
+            this.renderBoard(data.board_data);
+        }
+
+        this.version = data.version;
+        return true;
+    }
+
+    async refreshBoard() {
+        try {
+            const response = await fetch(`/api/game/${this.gameId}`);
+            if (!response.ok) return;
+            const data = await response.json();
+            if (data.version < this.version) return;
+
+            this.version = data.version;
+            this.renderBoard(data.board_data);
+            this.updateGameInfo(data);
+            this.updateGameStatus(data);
+        } catch (error) {
+            console.error('Error refreshing board:', error);
+        }
+    }
+
     updateCellDisplay(cell, cellData) {
         cell.className = 'cell';
         cell.textContent = '';
@@ -137,6 +186,7 @@ class WebMinesweeper {
         }
 
         try {
+            const sentVersion = this.version;
             const response = await fetch('/api/dig', {
                 method: 'POST',
                 headers: {
@@ -145,12 +195,14 @@ class WebMinesweeper {
                 body: JSON.stringify({
                     game_id: this.gameId,
                     row: row,
-                    col: col
+                    col: col,
+                    delta: true,
+                    version: sentVersion
                 })
             });
 
             const data = await response.json();
-            this.renderBoard(data.board_data);
+            if (!this.applyBoardUpdate(response, data, sentVersion)) return;
             this.updateGameInfo(data);
             this.updateGameStatus(data);
 
@@ -169,6 +221,7 @@ class WebMinesweeper {
         const col = parseInt(cell.dataset.col);
 
         try {
+            const sentVersion = this.version;
             const response = await fetch('/api/flag', {
                 method: 'POST',
                 headers: {
@@ -177,12 +230,14 @@ class WebMinesweeper {
                 body: JSON.stringify({
                     game_id: this.gameId,
                     row: row,
-                    col: col
+                    col: col,
+                    delta: true,
+                    version: sentVersion
                 })
             });
 
             const data = await response.json();
-            this.renderBoard(data.board_data);
+            if (!this.applyBoardUpdate(response, data, sentVersion)) return;
             this.updateGameInfo(data);
 
         } catch (error) {